@@ -5,7 +5,9 @@
 @Time   :   2025/9/1 13:59
 @Author :   s.qiu@foxmail.com
 """
+import click
 import dotenv
+from celery.signals import worker_init, worker_process_init
 from flask_login import LoginManager
 from flask_migrate import Migrate
 
@@ -13,6 +15,7 @@ from config import Config
 from internal.middleware import Middleware
 from internal.router import Router
 from internal.server import Http
+from internal.service import EmbeddingsService, VectorDatabaseService, WarmupService
 from pkg.sqlalchemy import SQLAlchemy
 from .module import injector
 
@@ -34,5 +37,32 @@ app = Http(
 
 celery = app.extensions["celery"]
 
+
+@worker_init.connect
+def preload_worker(**kwargs):
+    """Celery 主进程在创建子进程前预加载模型 子进程通过写时复制共享模型权重"""
+    embeddings_service = injector.get(EmbeddingsService)
+    if embeddings_service.share_mode == "preload":
+        embeddings_service.preload()
+
+
+@worker_process_init.connect
+def warm_up_worker_process(**kwargs):
+    """Celery 子进程启动后在后台预热 避免首个任务承担模型加载耗时
+    子进程初始化超过 worker_proc_alive_timeout(默认4秒)会被主进程杀掉重建 不能在信号处理中同步加载模型
+    """
+    injector.get(WarmupService).warm_up_in_background()
+
+
+@app.cli.command("migrate-vector-tenants")
+@click.option("--drop-source", is_flag=True, help="迁移完成后删除原共享集合")
+def migrate_vector_tenants(drop_source: bool):
+    """将共享集合中的向量迁移到按知识库划分租户的集合 flask --app app.http.app migrate-vector-tenants"""
+    counts = injector.get(VectorDatabaseService).migrate_to_tenants(drop_source=drop_source)
+    for dataset_id, count in counts.items():
+        click.echo(f"{dataset_id}: {count}")
+    click.echo(f"迁移完成，知识库数量: {len(counts)}，向量数量: {sum(counts.values())}")
+
+
 if __name__ == "__main__":
     app.run(debug=True)
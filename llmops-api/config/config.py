@@ -50,4 +50,11 @@ class Config:
             "task_ignore_result": _get_bool_env("CELERY_TASK_IGNORE_RESULT"),
             "result_expires": int(_get_env("CELERY_RESULT_EXPIRES")),
             "broker_connection_retry_on_startup": _get_bool_env("CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP"),
+            "include": ["internal.schedule.retrieval_schedule"],
+            "beat_schedule": {
+                "flush-retrieval-records": {
+                    "task": "internal.schedule.retrieval_schedule.flush_retrieval_records",
+                    "schedule": float(_get_env("RETRIEVAL_RECORDS_FLUSH_INTERVAL")),
+                },
+            },
         }
@@ -30,4 +30,7 @@ DEFAULT_CONFIG = {
     "CELERY_TASK_IGNORE_RESULT": "False",
     "CELERY_RESULT_EXPIRES": 3600,
     "CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP": "True",
+
+    # 检索记录(查询记录、命中次数)刷写间隔 单位秒
+    "RETRIEVAL_RECORDS_FLUSH_INTERVAL": 10,
 }
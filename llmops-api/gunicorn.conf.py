@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   gunicorn.conf
+@Time   :   2026/10/18 14:20
+@Author :   s.qiu@foxmail.com
+"""
+import os
+
+import dotenv
+
+dotenv.load_dotenv()
+
+# preload 模式下在主进程加载应用与模型 工作进程 fork 后通过写时复制共享模型权重
+preload_app = os.getenv("EMBEDDINGS_SHARE_MODE", "none") == "preload"
+
+
+def when_ready(server):
+    """主进程就绪 创建工作进程前预加载模型"""
+    if preload_app:
+        from app.http.module import injector
+        from internal.service import EmbeddingsService
+
+        injector.get(EmbeddingsService).preload()
+
+
+def post_worker_init(worker):
+    """工作进程 fork 并加载应用后在后台预热 预热完成前 /ready 返回503"""
+    from app.http.module import injector
+    from internal.service import WarmupService
+
+    injector.get(WarmupService).warm_up_in_background()
@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   agent_event_bus
+@Time   :   2026/10/21 09:30
+@Author :   s.qiu@foxmail.com
+"""
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+import weakref
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from queue import Queue
+from typing import Optional
+
+from redis import Redis
+
+from internal.core.agent.entities.queue_entity import AgentThought, QueueEvent
+from internal.entity.cache_entity import AGENT_EVENT_READER_WAKEUP, AGENT_TASK_EVENTS, AGENT_TASK_STOP_CHANNEL
+
+# 支持的事件总线 local: 进程内队列 停止信号通过 Redis 发布订阅推送 redis-stream: Redis Streams 任意进程均可消费并断线续读
+AGENT_EVENT_BUSES = ("local", "redis-stream")
+
+
+class AgentEventChannel(ABC):
+    """单个任务的事件通道 消费者阻塞在本地队列上 由事件、心跳或超时唤醒"""
+
+    @abstractmethod
+    def publish(self, agent_thought: AgentThought) -> None:
+        """发布事件 所有消费者均可收到"""
+        raise NotImplementedError("publish 未实现")
+
+    @abstractmethod
+    def notify(self, agent_thought: AgentThought) -> None:
+        """仅向当前进程中该通道的消费者投递事件(心跳、超时) 不经过 Redis"""
+        raise NotImplementedError("notify 未实现")
+
+    @abstractmethod
+    def get(self, timeout: Optional[float] = None) -> Optional[AgentThought]:
+        """读取下一个事件 未传递 timeout 时一直等待 超时返回 None"""
+        raise NotImplementedError("get 未实现")
+
+    def close(self) -> None:
+        """停止消费"""
+        pass
+
+
+class AgentEventBus(ABC):
+    """智能体事件总线 负责任务事件的发布、消费与停止信号的推送"""
+    # 是否支持断线后携带最后收到的事件id继续读取
+    resumable: bool = False
+
+    @abstractmethod
+    def open(self, task_id: uuid.UUID, last_event_id: Optional[str] = None) -> AgentEventChannel:
+        """打开任务的事件通道 传递 last_event_id 时从该事件之后开始读取"""
+        raise NotImplementedError("open 未实现")
+
+    @abstractmethod
+    def publish_stop(self, task_id: uuid.UUID) -> None:
+        """推送任务停止信号 可在任意进程中调用"""
+        raise NotImplementedError("publish_stop 未实现")
+
+    @classmethod
+    def build_stop_event(cls, task_id: uuid.UUID) -> AgentThought:
+        return AgentThought(id=uuid.uuid4(), task_id=task_id, event=QueueEvent.STOP)
+
+
+class LocalAgentEventChannel(AgentEventChannel):
+    """进程内事件通道"""
+
+    def __init__(self, q: Queue):
+        self._queue = q
+
+    def publish(self, agent_thought: AgentThought) -> None:
+        self._queue.put(agent_thought)
+
+    def notify(self, agent_thought: AgentThought) -> None:
+        self._queue.put(agent_thought)
+
+    def get(self, timeout: Optional[float] = None) -> Optional[AgentThought]:
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class LocalAgentEventBus(AgentEventBus):
+    """进程内事件总线
+    事件通过进程内队列传递 智能体线程与消费者需在同一进程 队列随持有它的队列管理器释放
+    停止信号通过 Redis 发布订阅推送 每个进程仅使用一个订阅线程 将停止事件放入本进程对应任务的队列
+    """
+
+    def __init__(self, redis_client: Redis):
+        self.redis_client = redis_client
+        self._queues: weakref.WeakValueDictionary[str, Queue] = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+        self._subscriber_pid: Optional[int] = None
+
+    def open(self, task_id: uuid.UUID, last_event_id: Optional[str] = None) -> AgentEventChannel:
+        self._ensure_subscriber()
+        with self._lock:
+            q = self._queues.get(str(task_id))
+            if q is None:
+                q = Queue()
+                self._queues[str(task_id)] = q
+        return LocalAgentEventChannel(q)
+
+    def publish_stop(self, task_id: uuid.UUID) -> None:
+        self.redis_client.publish(AGENT_TASK_STOP_CHANNEL, str(task_id))
+
+    def _ensure_subscriber(self) -> None:
+        """启动本进程的停止信号订阅线程 进程 fork 后重新启动"""
+        with self._lock:
+            if self._subscriber_pid == os.getpid():
+                return
+            self._subscriber_pid = os.getpid()
+        threading.Thread(target=self._subscribe_stop, daemon=True).start()
+
+    def _subscribe_stop(self) -> None:
+        """订阅停止信号 连接断开后重新订阅"""
+        while True:
+            try:
+                pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(AGENT_TASK_STOP_CHANNEL)
+                for message in pubsub.listen():
+                    task_id = message["data"].decode("utf-8")
+                    q = self._queues.get(task_id)
+                    if q is not None:
+                        q.put(self.build_stop_event(uuid.UUID(task_id)))
+            except Exception as e:
+                logging.exception(f"智能体停止信号订阅异常，稍后重新订阅，错误信息：{str(e)}")
+                time.sleep(1)
+
+
+class RedisStreamAgentEventChannel(AgentEventChannel):
+    """Redis Streams 事件通道 事件的 Stream 条目id 写入 AgentThought.event_id
+    发布直接写入 Stream 消费时注册到进程内的读取线程 由读取线程投递到本地队列
+    """
+
+    def __init__(self, event_bus: "RedisStreamAgentEventBus", task_id: uuid.UUID, last_event_id: Optional[str]):
+        self.event_bus = event_bus
+        self.key = AGENT_TASK_EVENTS.format(task_id=task_id)
+        self.last_event_id = last_event_id or "0-0"
+        self._queue: Queue[AgentThought] = Queue()
+        self._registered = False
+        self._expire_set = False
+
+    def publish(self, agent_thought: AgentThought) -> None:
+        pipeline = self.event_bus.redis_client.pipeline(transaction=False)
+        pipeline.xadd(
+            self.key,
+            {"data": agent_thought.model_dump_json(exclude={"event_id"}, exclude_defaults=True)},
+            maxlen=int(os.getenv("AGENT_EVENT_STREAM_MAXLEN", 10000)),
+            approximate=True,
+        )
+        # 过期时间只需在首次发布时设置
+        if not self._expire_set:
+            pipeline.expire(self.key, int(os.getenv("AGENT_EVENT_STREAM_TTL", 1800)))
+            self._expire_set = True
+        pipeline.execute()
+
+    def notify(self, agent_thought: AgentThought) -> None:
+        self._queue.put(agent_thought)
+
+    def get(self, timeout: Optional[float] = None) -> Optional[AgentThought]:
+        if not self._registered:
+            self.event_bus.get_reader().register(self)
+            self._registered = True
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self) -> None:
+        if self._registered:
+            self.event_bus.get_reader().unregister(self)
+            self._registered = False
+
+    def deliver(self, entry_id: str, agent_thought: AgentThought) -> None:
+        """读取线程投递事件 跳过已读取过的事件"""
+        if _parse_stream_id(entry_id) <= _parse_stream_id(self.last_event_id):
+            return
+        self.last_event_id = entry_id
+        self._queue.put(agent_thought)
+
+
+class RedisStreamReader:
+    """进程内共享的 Stream 读取线程
+    一次阻塞读取(XREAD)同时等待本进程所有消费中的任务 Stream 空闲的任务不产生任何 Redis 调用
+    新消费者注册时向本进程的唤醒 Stream 写入一条消息 使正在阻塞的读取立即返回并加入新的任务
+    """
+
+    def __init__(self, redis_client: Redis):
+        self.redis_client = redis_client
+        self._channels: dict[str, set[RedisStreamAgentEventChannel]] = {}
+        self._condition = threading.Condition()
+        self._wakeup_key = AGENT_EVENT_READER_WAKEUP.format(reader_id=uuid.uuid4())
+        self._wakeup_id = "0-0"
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def register(self, channel: RedisStreamAgentEventChannel) -> None:
+        with self._condition:
+            self._channels.setdefault(channel.key, set()).add(channel)
+            self._condition.notify()
+
+        pipeline = self.redis_client.pipeline(transaction=False)
+        pipeline.xadd(self._wakeup_key, {"wakeup": 1}, maxlen=1)
+        pipeline.expire(self._wakeup_key, 3600)
+        pipeline.execute()
+
+    def unregister(self, channel: RedisStreamAgentEventChannel) -> None:
+        with self._condition:
+            channels = self._channels.get(channel.key)
+            if channels is not None:
+                channels.discard(channel)
+                if not channels:
+                    del self._channels[channel.key]
+
+    def _run(self) -> None:
+        block = int(os.getenv("AGENT_EVENT_READER_BLOCK", 60)) * 1000
+        while True:
+            # 没有消费者时等待注册 每个 Stream 从其消费者中最早的事件id之后读取
+            with self._condition:
+                while not self._channels:
+                    self._condition.wait()
+                streams = {
+                    key: min((channel.last_event_id for channel in channels), key=_parse_stream_id)
+                    for key, channels in self._channels.items()
+                }
+            streams[self._wakeup_key] = self._wakeup_id
+
+            try:
+                result = self.redis_client.xread(streams, count=100, block=block)
+            except Exception as e:
+                logging.exception(f"智能体事件读取失败，稍后重试，错误信息：{str(e)}")
+                time.sleep(1)
+                continue
+
+            for key, entries in result or []:
+                key = key.decode("utf-8")
+                if key == self._wakeup_key:
+                    self._wakeup_id = entries[-1][0].decode("utf-8")
+                    continue
+
+                with self._condition:
+                    channels = list(self._channels.get(key, ()))
+                for entry_id, fields in entries:
+                    entry_id = entry_id.decode("utf-8")
+                    agent_thought = AgentThought.model_validate_json(fields[b"data"])
+                    agent_thought.event_id = entry_id
+                    for channel in channels:
+                        channel.deliver(entry_id, agent_thought)
+
+
+class RedisStreamAgentEventBus(AgentEventBus):
+    """Redis Streams 事件总线
+    每个任务的事件写入独立的 Stream 过期后自动删除 智能体线程与消费者可在不同进程
+    消费者断线后可携带最后收到的事件id重新打开通道 从该事件之后继续读取 停止信号作为 STOP 事件直接写入 Stream
+    """
+    resumable = True
+
+    def __init__(self, redis_client: Redis):
+        self.redis_client = redis_client
+        self._reader: Optional[RedisStreamReader] = None
+        self._reader_pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def open(self, task_id: uuid.UUID, last_event_id: Optional[str] = None) -> AgentEventChannel:
+        return RedisStreamAgentEventChannel(self, task_id, last_event_id)
+
+    def publish_stop(self, task_id: uuid.UUID) -> None:
+        self.open(task_id).publish(self.build_stop_event(task_id))
+
+    def get_reader(self) -> RedisStreamReader:
+        """获取进程内的读取线程 进程 fork 后重新创建"""
+        with self._lock:
+            if self._reader is None or self._reader_pid != os.getpid():
+                self._reader = RedisStreamReader(self.redis_client)
+                self._reader_pid = os.getpid()
+            return self._reader
+
+
+def _parse_stream_id(entry_id: str) -> tuple[int, int]:
+    """Stream 条目id 转换为可比较的元组"""
+    milliseconds, _, sequence = entry_id.partition("-")
+    return int(milliseconds), int(sequence or 0)
+
+
+@lru_cache(maxsize=None)
+def get_agent_event_bus() -> AgentEventBus:
+    """根据环境变量 AGENT_EVENT_BUS 获取进程内共享的事件总线"""
+    from app.http.module import injector
+
+    name = os.getenv("AGENT_EVENT_BUS", "local")
+    if name not in AGENT_EVENT_BUSES:
+        raise ValueError(f"不支持的智能体事件总线: {name}")
+
+    redis_client = injector.get(Redis)
+    if name == "redis-stream":
+        return RedisStreamAgentEventBus(redis_client)
+    return LocalAgentEventBus(redis_client)
@@ -5,42 +5,57 @@
 @Time   :   2026/1/25 21:22
 @Author :   s.qiu@foxmail.com
 """
-import queue
-import time
+import json
+import os
 import uuid
-from queue import Queue
-from typing import Generator
+from typing import Generator, Optional
 
 from redis import Redis
 
 from internal.core.agent.entities.queue_entity import AgentThought, QueueEvent
+from internal.entity.cache_entity import AGENT_TASK_META
 from internal.entity.conversation_entity import InvokeFrom
+from .agent_event_bus import AgentEventBus, AgentEventChannel, get_agent_event_bus
+from .timer_wheel import get_timer_wheel
+
+# 结束监听的事件类型
+LISTEN_END_EVENTS = (QueueEvent.STOP, QueueEvent.ERROR, QueueEvent.TIMEOUT, QueueEvent.AGENT_END)
+
+# 监听心跳间隔、监听超时时长(秒)
+LISTEN_PING_INTERVAL = 10
+LISTEN_TIMEOUT = 600
 
 
 class AgentQueueManager:
-    """智能体 队列管理器"""
+    """智能体 队列管理器 事件的发布与消费通过可替换的事件总线完成"""
     user_id: uuid.UUID
     invoke_from: InvokeFrom
     redis_client: Redis
-    _queues: dict[str, Queue]
-
-    def __init__(self, user_id: uuid.UUID, invoke_from: InvokeFrom):
-        """初始化智能体队列管理器"""
+    event_bus: AgentEventBus
+    _channels: dict[str, AgentEventChannel]
+
+    def __init__(
+            self,
+            user_id: uuid.UUID,
+            invoke_from: InvokeFrom,
+            redis_client: Optional[Redis] = None,
+            event_bus: Optional[AgentEventBus] = None,
+    ):
+        """初始化智能体队列管理器 未传递 redis_client、event_bus 时使用全局实例"""
         self.user_id = user_id
         self.invoke_from = invoke_from
-        self._queues = {}
+        self._channels = {}
 
         # 内部初始化 redis_client
-        from app.http.module import injector
-        self.redis_client = injector.get(Redis)
+        if redis_client is None:
+            from app.http.module import injector
+            redis_client = injector.get(Redis)
+        self.redis_client = redis_client
+        self.event_bus = event_bus or get_agent_event_bus()
 
     def publish(self, task_id: uuid.UUID, agent_thought: AgentThought) -> None:
-        """发布事件到队列"""
-        self.queue(task_id).put(agent_thought)
-
-        # 判断是否为需要停止监听的事件类型
-        if agent_thought.event in [QueueEvent.STOP, QueueEvent.ERROR, QueueEvent.TIMEOUT, QueueEvent.AGENT_END]:
-            self.stop_listen(task_id)
+        """发布事件到事件总线"""
+        self.channel(task_id).publish(agent_thought)
 
     def publish_error(self, task_id: uuid.UUID, error) -> None:
         self.publish(task_id, AgentThought(
@@ -50,65 +65,67 @@ class AgentQueueManager:
             observation=str(error)
         ))
 
-    def _is_stopped(self, task_id: uuid.UUID) -> bool:
-        """监听是否停止"""
-        task_stopped_cache_key = self.generate_task_stopped_cache_key(task_id)
-        result = self.redis_client.get(task_stopped_cache_key)
-
-        if result is not None:
-            return True
-        return False
-
-    def stop_listen(self, task_id: uuid.UUID) -> None:
-        """停止监听队列"""
-        self.queue(task_id).put(None)
-
-    def queue(self, task_id: uuid.UUID) -> Queue:
-        """获取对应的任务队列信息"""
-        q = self._queues.get(str(task_id))
-        # 如果队列中不存在 创建队列并添加缓存键
-        if not q:
+    def channel(self, task_id: uuid.UUID, last_event_id: Optional[str] = None) -> AgentEventChannel:
+        """获取对应任务的事件通道"""
+        channel = self._channels.get(str(task_id))
+        # 如果通道不存在 打开通道并添加缓存键
+        if not channel:
             # 根据类型生成缓存键
             user_prefix = "account" if self.invoke_from in [InvokeFrom.WEB_APP, InvokeFrom.DEBUGGER] else "end-user"
             # 设置缓存 代表任务已经开始
             self.redis_client.setex(self.generate_task_belong_cache_key(task_id), 1800,
                                     f"{user_prefix}-{str(self.user_id)}")
-            q = Queue()
-            self._queues[str(task_id)] = q
-        return q
-
-    def listen(self, task_id: uuid.UUID) -> Generator:
-        """监听队列"""
-        # 记录超时时间、开始时间、最后一次PING通时间
-        listen_timeout = 600
-        start_time = time.time()
-        last_ping_time = 0
-
-        # 监听队列是否存在
-        while True:
-            try:
-                item = self.queue(task_id).get(timeout=1)
-                if item is None:
-                    break
+            channel = self.event_bus.open(task_id, last_event_id)
+            self._channels[str(task_id)] = channel
+        return channel
+
+    def listen(self, task_id: uuid.UUID, last_event_id: Optional[str] = None) -> Generator:
+        """监听事件 传递 last_event_id 时从该事件之后继续读取(需事件总线支持)
+        仅在收到事件时唤醒 心跳与超时由进程内共享的时间轮投递到当前消费者 停止信号由事件总线推送 空闲时不访问 Redis
+        """
+        channel = self.channel(task_id, last_event_id)
+
+        # 每十秒发送一次PING事件 保持心跳 超过监听时长后发送超时事件
+        timer_wheel = get_timer_wheel()
+        heartbeat = timer_wheel.schedule(
+            LISTEN_PING_INTERVAL,
+            lambda: channel.notify(AgentThought(id=uuid.uuid4(), task_id=task_id, event=QueueEvent.PING)),
+            interval=LISTEN_PING_INTERVAL,
+        )
+        deadline = timer_wheel.schedule(
+            LISTEN_TIMEOUT,
+            lambda: channel.notify(AgentThought(id=uuid.uuid4(), task_id=task_id, event=QueueEvent.TIMEOUT)),
+        )
+
+        try:
+            while True:
+                item = channel.get()
                 yield item
-            except queue.Empty:
-                continue
-            finally:
-                # 获取数据总耗时
-                elapsed_time = time.time() - start_time
-
-                # 每十秒发送一次PING事件 保持心跳
-                if elapsed_time // 10 > last_ping_time:
-                    self.publish(task_id, AgentThought(id=uuid.uuid4(), task_id=task_id, event=QueueEvent.PING))
-                    last_ping_time = elapsed_time // 10
+                if item.event in LISTEN_END_EVENTS:
+                    break
+        finally:
+            heartbeat.cancel()
+            deadline.cancel()
+            channel.close()
+
+    def set_task_meta(self, task_id: uuid.UUID, meta: dict) -> None:
+        """记录任务的元数据(会话id、消息id等) 断线续读时用于填充事件 与事件流同时过期"""
+        self.redis_client.setex(
+            AGENT_TASK_META.format(task_id=task_id),
+            int(os.getenv("AGENT_EVENT_STREAM_TTL", 1800)),
+            json.dumps(meta),
+        )
 
-                # 是否超时 添加超时事件
-                if elapsed_time >= listen_timeout:
-                    self.publish(task_id, AgentThought(id=uuid.uuid4(), task_id=task_id, event=QueueEvent.TIMEOUT))
+    @classmethod
+    def get_task_meta(cls, task_id: uuid.UUID, invoke_from: InvokeFrom, user_id: uuid.UUID) -> Optional[dict]:
+        """获取任务的元数据 任务不存在、已过期或不属于该用户时返回 None"""
+        from app.http.module import injector
+        redis_client = injector.get(Redis)
+        if not cls.is_task_owner(redis_client, task_id, invoke_from, user_id):
+            return None
 
-                # 是否停止 添加停止时间
-                if self._is_stopped(task_id):
-                    self.publish(task_id, AgentThought(id=uuid.uuid4(), task_id=task_id, event=QueueEvent.STOP))
+        meta = redis_client.get(AGENT_TASK_META.format(task_id=task_id))
+        return json.loads(meta) if meta else None
 
     @classmethod
     def set_stop_flag(cls, task_id: uuid.UUID, invoke_from: InvokeFrom, user_id: uuid.UUID) -> None:
@@ -116,26 +133,25 @@ class AgentQueueManager:
         # 获取 redis_client
         from app.http.module import injector
         redis_client = injector.get(Redis)
+        if not cls.is_task_owner(redis_client, task_id, invoke_from, user_id):
+            return
+
+        # 推送停止信号 监听该任务的消费者收到后结束监听
+        get_agent_event_bus().publish_stop(task_id)
+
+    @classmethod
+    def is_task_owner(cls, redis_client: Redis, task_id: uuid.UUID, invoke_from: InvokeFrom, user_id: uuid.UUID) -> bool:
+        """判断正在执行的任务是否属于该用户"""
         # 获取当前正在执行的任务键
         result = redis_client.get(cls.generate_task_belong_cache_key(task_id))
         if not result:
-            return
+            return False
 
         # 计算对应缓存结果
         user_prefix = "account" if invoke_from in [InvokeFrom.WEB_APP, InvokeFrom.DEBUGGER] else "end-user"
-        if result.decode("utf-8") != f"{user_prefix}-{str(user_id)}":
-            return
-
-        # 生成停止键标识
-        stopped_cache_key = cls.generate_task_stopped_cache_key(task_id)
-        redis_client.setex(stopped_cache_key, 600, 1)
+        return result.decode("utf-8") == f"{user_prefix}-{str(user_id)}"
 
     @classmethod
     def generate_task_belong_cache_key(cls, task_id: uuid.UUID) -> str:
         """生成任务专属的缓存键"""
         return f"generate_task_belong:{str(task_id)}"
-
-    @classmethod
-    def generate_task_stopped_cache_key(cls, task_id: uuid.UUID) -> str:
-        """生成任务已停止的缓存键"""
-        return f"generate_task_stopped:{str(task_id)}"
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   benchmark
+@Time   :   2026/10/21 16:10
+@Author :   s.qiu@foxmail.com
+"""
+import queue
+import threading
+import time
+import uuid
+from queue import Queue
+from typing import Callable, Optional
+
+from redis import Redis
+
+from internal.core.agent.entities.queue_entity import AgentThought, QueueEvent
+from internal.entity.conversation_entity import InvokeFrom
+from .agent_event_bus import AgentEventBus, LocalAgentEventBus, RedisStreamAgentEventBus
+from .agent_queue_manager import AgentQueueManager
+
+# 消费者启动后等待全部进入监听再开始统计(秒)
+WARMUP_SECONDS = 2
+
+# 单个消费者: (task_id, 结束信号, 事件间隔) 事件间隔为 None 时空闲监听
+Listener = Callable[[uuid.UUID, threading.Event, Optional[float]], None]
+
+
+def benchmark_agent_listen(
+        redis_client: Redis,
+        streams: int = 100,
+        duration: float = 60,
+        event_interval: float = 0.2,
+) -> dict:
+    """并发监听 streams 个任务 统计每个任务每分钟产生的 Redis 命令数
+    对比原实现(每秒唤醒并查询停止标记)与两种事件总线 分为空闲监听与每 event_interval 秒推送一个事件两种场景
+    命令数通过 INFO commandstats 统计 需使用没有其他客户端的 Redis 实例
+    """
+    listeners: dict[str, Listener] = {
+        "legacy": _legacy_listener(redis_client),
+        "local": _event_bus_listener(redis_client, LocalAgentEventBus(redis_client)),
+        "redis-stream": _event_bus_listener(redis_client, RedisStreamAgentEventBus(redis_client)),
+    }
+    return {
+        "streams": streams,
+        "duration_seconds": duration,
+        "idle_ops_per_stream_minute": {
+            name: _run_listeners(redis_client, listener, streams, duration, None)
+            for name, listener in listeners.items()
+        },
+        "streaming_ops_per_stream_minute": {
+            name: _run_listeners(redis_client, listener, streams, duration, event_interval)
+            for name, listener in listeners.items()
+        },
+    }
+
+
+def _run_listeners(
+        redis_client: Redis,
+        listener: Listener,
+        streams: int,
+        duration: float,
+        event_interval: Optional[float],
+) -> float:
+    """启动并发消费者 统计 duration 秒内每个任务每分钟的 Redis 命令数"""
+    stop_event = threading.Event()
+    threads = [
+        threading.Thread(target=listener, args=(uuid.uuid4(), stop_event, event_interval), daemon=True)
+        for _ in range(streams)
+    ]
+    for thread in threads:
+        thread.start()
+
+    time.sleep(WARMUP_SECONDS)
+    before = _count_commands(redis_client)
+    time.sleep(duration)
+    after = _count_commands(redis_client)
+
+    stop_event.set()
+    for thread in threads:
+        thread.join()
+    return (after - before) / streams / (duration / 60)
+
+
+def _count_commands(redis_client: Redis) -> int:
+    """Redis 实例累计执行的命令数 不计入统计本身使用的 INFO"""
+    stats = redis_client.info("commandstats")
+    return sum(stat["calls"] for name, stat in stats.items() if name != "cmdstat_info")
+
+
+def _publish_events(
+        publish: Callable[[AgentThought], None],
+        task_id: uuid.UUID,
+        stop_event: threading.Event,
+        event_interval: Optional[float],
+) -> None:
+    """模拟智能体线程 按间隔推送消息事件 结束信号置位后推送结束事件"""
+    while not stop_event.wait(event_interval):
+        publish(AgentThought(id=uuid.uuid4(), task_id=task_id, event=QueueEvent.AGENT_MESSAGE, answer="LLMOps"))
+    publish(AgentThought(id=uuid.uuid4(), task_id=task_id, event=QueueEvent.AGENT_END))
+
+
+def _legacy_listener(redis_client: Redis) -> Listener:
+    """原监听实现 每秒唤醒一次 每次唤醒及每个事件后均查询一次停止标记"""
+
+    def listen(task_id: uuid.UUID, stop_event: threading.Event, event_interval: Optional[float]) -> None:
+        q = Queue()
+        threading.Thread(target=_publish_events, args=(q.put, task_id, stop_event, event_interval), daemon=True).start()
+
+        listen_start_time = time.time()
+        last_ping_time = 0
+        while True:
+            try:
+                item = q.get(timeout=1)
+                if item.event == QueueEvent.AGENT_END:
+                    break
+            except queue.Empty:
+                pass
+            finally:
+                elapsed_time = time.time() - listen_start_time
+                if elapsed_time // 10 > last_ping_time:
+                    q.put(AgentThought(id=uuid.uuid4(), task_id=task_id, event=QueueEvent.PING))
+                    last_ping_time = elapsed_time // 10
+                redis_client.get(f"generate_task_stopped:{str(task_id)}")
+
+    return listen
+
+
+def _event_bus_listener(redis_client: Redis, event_bus: AgentEventBus) -> Listener:
+    """事件驱动的监听实现"""
+
+    def listen(task_id: uuid.UUID, stop_event: threading.Event, event_interval: Optional[float]) -> None:
+        queue_manager = AgentQueueManager(uuid.uuid4(), InvokeFrom.DEBUGGER, redis_client, event_bus)
+        channel = queue_manager.channel(task_id)
+        threading.Thread(
+            target=_publish_events, args=(channel.publish, task_id, stop_event, event_interval), daemon=True,
+        ).start()
+        for _ in queue_manager.listen(task_id):
+            pass
+
+    return listen
+
+
+if __name__ == "__main__":
+    # python -m internal.core.agent.agents.benchmark [并发任务数] [统计时长(秒)]
+    import json
+    import os
+    import sys
+
+    import dotenv
+
+    dotenv.load_dotenv()
+
+    client = Redis(
+        host=os.getenv("REDIS_HOST", "localhost"),
+        port=int(os.getenv("REDIS_PORT", 6379)),
+        username=os.getenv("REDIS_USERNAME") or None,
+        password=os.getenv("REDIS_PASSWORD") or None,
+        db=int(os.getenv("REDIS_DB", 0)),
+    )
+    result = benchmark_agent_listen(
+        client,
+        streams=int(sys.argv[1]) if len(sys.argv) > 1 else 100,
+        duration=float(sys.argv[2]) if len(sys.argv) > 2 else 60,
+    )
+    print(json.dumps(result, ensure_ascii=False, indent=2))
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   timer_wheel
+@Time   :   2026/10/21 15:20
+@Author :   s.qiu@foxmail.com
+"""
+import logging
+import math
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Callable, Optional
+
+
+class Timer:
+    """时间轮中的定时任务"""
+    __slots__ = ("callback", "interval", "rounds", "slot", "cancelled", "_wheel")
+
+    def __init__(self, wheel: "TimerWheel", callback: Callable[[], None], interval: Optional[float]):
+        self.callback = callback
+        self.interval = interval
+        self.rounds = 0
+        self.slot: Optional[int] = None
+        self.cancelled = False
+        self._wheel = wheel
+
+    def cancel(self) -> None:
+        """取消定时任务 立即从所在槽位移除 时间轮不再持有回调及其引用的对象"""
+        self.cancelled = True
+        self._wheel.cancel(self)
+
+
+class TimerWheel:
+    """哈希时间轮
+    进程内所有定时任务共用一个线程 每个刻度推进一个槽位并执行到期的任务 新增与取消均为 O(1)
+    没有定时任务时线程等待 不占用CPU 回调在时间轮线程中执行 需快速返回(如向队列中放入事件)
+    """
+
+    def __init__(self, tick: float = 0.5, slot_count: int = 128):
+        """构造函数 传递刻度时长(秒)与槽位数量"""
+        self._tick = tick
+        self._slots: list[set[Timer]] = [set() for _ in range(slot_count)]
+        self._cursor = 0
+        self._count = 0
+        self._condition = threading.Condition()
+        self._pid: Optional[int] = None
+
+    def schedule(self, delay: float, callback: Callable[[], None], interval: Optional[float] = None) -> Timer:
+        """添加定时任务 delay 秒后执行回调 传递 interval 时此后每隔 interval 秒重复执行"""
+        timer = Timer(self, callback, interval)
+        with self._condition:
+            self._ensure_started()
+            self._add(timer, delay)
+            self._count += 1
+            self._condition.notify()
+        return timer
+
+    def cancel(self, timer: Timer) -> None:
+        """从槽位中移除定时任务 已到期或 fork 前添加的任务不在槽位中 无需处理"""
+        with self._condition:
+            if timer.slot is not None and timer in self._slots[timer.slot]:
+                self._slots[timer.slot].remove(timer)
+                self._count -= 1
+            timer.slot = None
+
+    def __len__(self) -> int:
+        """槽位中的定时任务数量"""
+        return self._count
+
+    def _add(self, timer: Timer, delay: float) -> None:
+        """按刻度数放入对应槽位 超过一圈的部分记为需等待的圈数"""
+        ticks = max(1, math.ceil(delay / self._tick))
+        timer.rounds = (ticks - 1) // len(self._slots)
+        timer.slot = (self._cursor + ticks) % len(self._slots)
+        self._slots[timer.slot].add(timer)
+
+    def _ensure_started(self) -> None:
+        """启动时间轮线程 进程 fork 后清空继承的定时任务并重新启动"""
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._slots = [set() for _ in range(len(self._slots))]
+        self._count = 0
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self) -> None:
+        next_tick = time.monotonic()
+        while True:
+            with self._condition:
+                while self._count == 0:
+                    self._condition.wait()
+                    next_tick = time.monotonic()
+
+            next_tick += self._tick
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+            # 推进槽位 取出到期任务 周期任务重新放入
+            due = []
+            with self._condition:
+                self._cursor = (self._cursor + 1) % len(self._slots)
+                slot = self._slots[self._cursor]
+                for timer in list(slot):
+                    if timer.rounds > 0:
+                        timer.rounds -= 1
+                    else:
+                        slot.remove(timer)
+                        due.append(timer)
+                for timer in due:
+                    if timer.interval:
+                        self._add(timer, timer.interval)
+                    else:
+                        timer.slot = None
+                        self._count -= 1
+
+            for timer in due:
+                # 取出后、执行前被取消的任务不再执行
+                if timer.cancelled:
+                    continue
+                try:
+                    timer.callback()
+                except Exception as e:
+                    logging.exception(f"时间轮定时任务执行出错，错误信息：{str(e)}")
+
+
+@lru_cache(maxsize=None)
+def get_timer_wheel() -> TimerWheel:
+    """获取进程内共享的时间轮"""
+    return TimerWheel()
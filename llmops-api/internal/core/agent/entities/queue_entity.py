@@ -32,6 +32,7 @@ class AgentThought(BaseModel):
     """智能体推理观察输出内容"""
     id: UUID  # 事件对应的id，同一个事件的id是一样的
     task_id: UUID  # 任务id
+    event_id: str = ""  # 事件总线中的事件id，断线重连时从该事件之后继续读取
 
     # 事件的推理与观察
     event: QueueEvent
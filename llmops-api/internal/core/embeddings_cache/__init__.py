@@ -0,0 +1,12 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   __init__.py
+@Time   :   2026/10/18 09:30
+@Author :   s.qiu@foxmail.com
+"""
+from .embeddings_cache import EmbeddingsCache
+
+__all__ = [
+    "EmbeddingsCache",
+]
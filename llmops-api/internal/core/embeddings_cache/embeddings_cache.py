@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   embeddings_cache
+@Time   :   2026/10/18 09:30
+@Author :   s.qiu@foxmail.com
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from hashlib import sha256
+from typing import Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from redis import Redis
+
+# 每写入多少条缓存检查一次容量上限
+TRIM_INTERVAL = 100
+
+# 每次检查容量时扫描的访问记录数量 逐步清理键已不存在(如被 Redis 内存淘汰)的访问记录
+TRIM_SCAN_COUNT = 1000
+
+# 每查询多少条文本输出一次命中统计
+METRICS_LOG_INTERVAL = 10000
+
+
+class EmbeddingsCache(Embeddings):
+    """向量缓存层
+    文档与query的嵌入均经过该缓存: 进程内LRU(仅query) -> Redis -> 底层嵌入模型
+    缓存键由 模型id+文本hash 组成，向量以 float16/float32 二进制存储，Redis中的条目带有TTL并按最近访问时间限制总数
+    """
+
+    def __init__(
+            self,
+            embeddings: Embeddings,
+            redis_client: Redis,
+            model_id: str,
+            namespace: str = "embeddings",
+            ttl: int = 7 * 24 * 3600,
+            max_size: int = 1000000,
+            local_max_size: int = 1024,
+            dtype: str = "float16",
+    ):
+        """构造函数 传递底层嵌入模型、Redis客户端以及缓存参数"""
+        self._embeddings = embeddings
+        self._redis_client = redis_client
+        self._prefix = f"{namespace}:{model_id}:{dtype}"
+        self._lru_key = f"{self._prefix}:lru"
+        self._ttl = ttl
+        self._max_size = max_size
+        self._local_max_size = local_max_size
+        self._dtype = np.dtype(dtype)
+
+        # 进程内LRU 用于重复的检索query
+        self._local_cache: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._write_count = 0
+        self._scan_cursor = 0
+
+        # 命中统计
+        self._counters = {
+            "local_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+        }
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """嵌入文档列表 仅未命中缓存的文本会提交给底层模型"""
+        if not texts:
+            return []
+
+        keys = [self._key(text) for text in texts]
+        unique_keys = list(dict.fromkeys(keys))
+        cached = dict(zip(unique_keys, self._redis_client.mget(unique_keys)))
+
+        vectors = {key: self._decode(value) for key, value in cached.items() if value is not None}
+        missing_keys = [key for key in unique_keys if key not in vectors]
+        self._count(redis_hits=len(vectors), misses=len(missing_keys))
+
+        if missing_keys:
+            key_texts = dict(zip(keys, texts))
+            missing_vectors = self._embeddings.embed_documents([key_texts[key] for key in missing_keys])
+            vectors.update(zip(missing_keys, missing_vectors))
+            self._set_many(dict(zip(missing_keys, missing_vectors)))
+
+        self._touch([key for key in unique_keys if key not in missing_keys])
+        return [vectors[key] for key in keys]
+
+    def embed_query(self, text: str) -> list[float]:
+        """嵌入检索query 优先读取进程内LRU"""
+        key = self._key(text)
+        vector = self._get_local(key)
+        if vector is not None:
+            self._count(local_hits=1)
+            return vector
+
+        value = self._redis_client.get(key)
+        if value is not None:
+            self._count(redis_hits=1)
+            vector = self._decode(value)
+            self._touch([key])
+        else:
+            self._count(misses=1)
+            vector = self._embeddings.embed_query(text)
+            self._set_many({key: vector})
+
+        self._set_local(key, vector)
+        return vector
+
+    @property
+    def metrics(self) -> dict:
+        """缓存命中统计"""
+        with self._lock:
+            counters = dict(self._counters)
+        total = sum(counters.values())
+        return {
+            **counters,
+            "hit_rate": (counters["local_hits"] + counters["redis_hits"]) / total if total else 0,
+            "local_size": len(self._local_cache),
+        }
+
+    def _key(self, text: str) -> str:
+        """生成缓存键"""
+        return f"{self._prefix}:{sha256(text.encode()).hexdigest()}"
+
+    def _encode(self, vector: list[float]) -> bytes:
+        """向量编码为紧凑的二进制"""
+        return np.asarray(vector, dtype=self._dtype).tobytes()
+
+    def _decode(self, value: bytes) -> list[float]:
+        """二进制解码为向量"""
+        return np.frombuffer(value, dtype=self._dtype).astype(np.float32).tolist()
+
+    def _get_local(self, key: str) -> Optional[list[float]]:
+        """读取进程内LRU"""
+        with self._lock:
+            vector = self._local_cache.get(key)
+            if vector is not None:
+                self._local_cache.move_to_end(key)
+            return vector
+
+    def _set_local(self, key: str, vector: list[float]) -> None:
+        """写入进程内LRU 超出容量时淘汰最久未使用的条目"""
+        with self._lock:
+            self._local_cache[key] = vector
+            self._local_cache.move_to_end(key)
+            while len(self._local_cache) > self._local_max_size:
+                self._local_cache.popitem(last=False)
+
+    def _set_many(self, vectors: dict[str, list[float]]) -> None:
+        """批量写入Redis并记录访问时间"""
+        now = time.time()
+        pipeline = self._redis_client.pipeline(transaction=False)
+        for key, vector in vectors.items():
+            pipeline.set(key, self._encode(vector), ex=self._ttl)
+        pipeline.zadd(self._lru_key, {key: now for key in vectors})
+        pipeline.execute()
+
+        with self._lock:
+            self._write_count += len(vectors)
+            need_trim = self._write_count >= TRIM_INTERVAL
+            if need_trim:
+                self._write_count = 0
+        if need_trim:
+            self._trim()
+
+    def _touch(self, keys: list[str]) -> None:
+        """更新命中条目的访问时间并延长TTL 使条目的过期时间与访问记录保持一致"""
+        if not keys:
+            return
+        now = time.time()
+        pipeline = self._redis_client.pipeline(transaction=False)
+        pipeline.zadd(self._lru_key, {key: now for key in keys})
+        for key in keys:
+            pipeline.expire(key, self._ttl)
+        pipeline.execute()
+
+    def _trim(self) -> None:
+        """清理已过期或已不存在条目的访问记录 并按最近访问时间淘汰超出容量上限的条目"""
+        self._redis_client.zremrangebyscore(self._lru_key, 0, time.time() - self._ttl)
+
+        # 每次从上次的游标继续扫描一部分访问记录 删除键已不存在的记录 避免其占用容量上限
+        self._scan_cursor, members = self._redis_client.zscan(self._lru_key, self._scan_cursor, count=TRIM_SCAN_COUNT)
+        if members:
+            keys = [key for key, _ in members]
+            pipeline = self._redis_client.pipeline(transaction=False)
+            for key in keys:
+                pipeline.exists(key)
+            missing = [key for key, exists in zip(keys, pipeline.execute()) if not exists]
+            if missing:
+                self._redis_client.zrem(self._lru_key, *missing)
+
+        overflow = self._redis_client.zcard(self._lru_key) - self._max_size
+        if overflow > 0:
+            evicted = [key for key, _ in self._redis_client.zpopmin(self._lru_key, overflow)]
+            if evicted:
+                self._redis_client.delete(*evicted)
+
+    def _count(self, **kwargs) -> None:
+        """累加命中统计 每查询 METRICS_LOG_INTERVAL 条文本输出一次统计"""
+        with self._lock:
+            total = sum(self._counters.values())
+            for name, value in kwargs.items():
+                self._counters[name] += value
+            need_log = total // METRICS_LOG_INTERVAL != (total + sum(kwargs.values())) // METRICS_LOG_INTERVAL
+        if need_log:
+            logging.info(f"向量缓存统计指标：{self.metrics}")
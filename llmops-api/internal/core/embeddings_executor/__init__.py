@@ -0,0 +1,12 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   __init__.py
+@Time   :   2026/10/17 22:10
+@Author :   s.qiu@foxmail.com
+"""
+from .embeddings_executor import EmbeddingsExecutor
+
+__all__ = [
+    "EmbeddingsExecutor",
+]
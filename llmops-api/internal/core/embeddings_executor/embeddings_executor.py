@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   embeddings_executor
+@Time   :   2026/10/17 22:10
+@Author :   s.qiu@foxmail.com
+"""
+import itertools
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+from langchain_core.embeddings import Embeddings
+
+# 请求优先级 检索query优先于文档片段 避免检索被大批量索引任务阻塞
+QUERY_PRIORITY = 0
+DOCUMENT_PRIORITY = 1
+
+
+class EmbeddingsExecutor(Embeddings):
+    """批量嵌入执行器
+    汇总所有线程(索引任务、检索query)提交的文本 由单个工作线程按token预算组成批次 在同一个模型实例上执行嵌入
+    """
+
+    def __init__(
+            self,
+            embeddings: Embeddings,
+            token_counter: Callable[[str], int],
+            max_batch_tokens: int = 8192,
+            max_batch_size: int = 64,
+            max_wait_ms: int = 5,
+    ):
+        """构造函数 传递底层嵌入模型、token计数函数以及批次参数"""
+        self._embeddings = embeddings
+        self._token_counter = token_counter
+        self._max_batch_tokens = max_batch_tokens
+        self._max_batch_size = max_batch_size
+        self._max_wait = max_wait_ms / 1000
+
+        self._queue: queue.PriorityQueue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+        # 统计指标
+        self._metrics_lock = threading.Lock()
+        self._started_at = time.time()
+        self._chunk_count = 0
+        self._batch_count = 0
+        self._token_count = 0
+        self._busy_seconds = 0.0
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """嵌入文档片段列表 阻塞直到所在批次执行完成"""
+        return [future.result() for future in self.submit_documents(texts)]
+
+    def submit_documents(self, texts: list[str], priority: int = DOCUMENT_PRIORITY) -> list[Future]:
+        """提交文本列表但不等待结果 调用方可按自身的延迟预算等待 超时后取消的Future不会再进入批次"""
+        return [self._submit(text, priority) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        """嵌入检索query 以更高优先级进入批次"""
+        return self._submit(text, QUERY_PRIORITY).result()
+
+    @property
+    def metrics(self) -> dict:
+        """执行器统计指标 涵盖吞吐量(chunks/sec)与批次填充率"""
+        with self._metrics_lock:
+            elapsed = max(time.time() - self._started_at, 1e-6)
+            return {
+                "chunk_count": self._chunk_count,
+                "batch_count": self._batch_count,
+                "chunks_per_second": self._chunk_count / elapsed,
+                "busy_chunks_per_second": self._chunk_count / self._busy_seconds if self._busy_seconds else 0,
+                "avg_batch_size": self._chunk_count / self._batch_count if self._batch_count else 0,
+                "avg_batch_fill": (
+                    self._token_count / (self._batch_count * self._max_batch_tokens) if self._batch_count else 0
+                ),
+                "queue_size": self._queue.qsize(),
+            }
+
+    def _submit(self, text: str, priority: int) -> Future:
+        """提交单条文本到队列 返回对应的Future"""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((priority, next(self._sequence), text, self._token_counter(text), future))
+        return future
+
+    def _ensure_worker(self) -> None:
+        """启动工作线程 进程fork后线程不会被继承 需要在子进程中重新启动"""
+        if self._worker is not None and self._worker.is_alive() and self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive() and self._worker_pid == os.getpid():
+                return
+            if self._worker_pid != os.getpid():
+                self._queue = queue.PriorityQueue()
+            self._worker_pid = os.getpid()
+            self._worker = threading.Thread(target=self._run, name="embeddings-executor", daemon=True)
+            self._worker.start()
+
+    def _run(self) -> None:
+        """工作线程 按token预算循环组装批次并执行嵌入"""
+        while True:
+            batch = [self._queue.get()]
+            batch_tokens = batch[0][3]
+            deadline = time.monotonic() + self._max_wait
+
+            # 在等待窗口内继续收集文本 直到达到token预算或批次上限
+            while len(batch) < self._max_batch_size and batch_tokens < self._max_batch_tokens:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if batch_tokens + item[3] > self._max_batch_tokens:
+                    # 超出预算的文本放回队列 保持原有顺序进入下一批次
+                    self._queue.put(item)
+                    break
+                batch.append(item)
+                batch_tokens += item[3]
+
+            self._execute(batch, batch_tokens)
+
+    def _execute(self, batch: list[tuple], batch_tokens: int) -> None:
+        """执行单个批次的嵌入并回填结果"""
+        # 跳过调用方已取消的请求
+        batch = [item for item in batch if item[4].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        batch_tokens = sum(item[3] for item in batch)
+
+        start_at = time.perf_counter()
+        try:
+            vectors = self._embeddings.embed_documents([item[2] for item in batch])
+        except Exception as e:
+            logging.exception(f"批量嵌入执行失败，批次大小: {len(batch)}，错误信息：{str(e)}")
+            for item in batch:
+                item[4].set_exception(e)
+            return
+
+        for item, vector in zip(batch, vectors):
+            item[4].set_result(vector)
+
+        with self._metrics_lock:
+            self._chunk_count += len(batch)
+            self._batch_count += 1
+            self._token_count += min(batch_tokens, self._max_batch_tokens)
+            self._busy_seconds += time.perf_counter() - start_at
+            batch_count = self._batch_count
+
+        if batch_count % 100 == 0:
+            logging.info(f"嵌入执行器统计指标：{self.metrics}")
@@ -0,0 +1,14 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   __init__.py
+@Time   :   2026/10/18 16:05
+@Author :   s.qiu@foxmail.com
+"""
+from .server import EmbeddingsSidecarServer
+from .sidecar_embeddings import SidecarEmbeddings
+
+__all__ = [
+    "EmbeddingsSidecarServer",
+    "SidecarEmbeddings",
+]
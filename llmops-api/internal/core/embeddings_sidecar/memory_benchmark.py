@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   memory_benchmark
+@Time   :   2026/10/18 16:05
+@Author :   s.qiu@foxmail.com
+"""
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+SHARE_MODES = ("none", "preload", "sidecar")
+
+
+def read_memory(pid: int) -> dict:
+    """读取进程内存占用(MB) rss: 常驻内存 pss: 按共享进程数均摊后的内存 uss: 进程独占内存"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                values[parts[0][:-1]] = int(parts[1]) / 1024
+    return {
+        "rss_mb": round(values.get("Rss", 0), 1),
+        "pss_mb": round(values.get("Pss", 0), 1),
+        "uss_mb": round(values.get("Private_Clean", 0) + values.get("Private_Dirty", 0), 1),
+    }
+
+
+def _worker(ready, done) -> None:
+    """模拟工作进程 完成预热(加载模型并执行一次批次)后等待采样"""
+    from app.http.module import injector
+    from internal.service import EmbeddingsService
+
+    injector.get(EmbeddingsService).warm_up()
+    ready.set()
+    done.wait()
+
+
+def measure(mode: str, workers: int) -> dict:
+    """按指定共享模式fork多个工作进程 统计每个工作进程(以及嵌入服务进程)的内存占用"""
+    os.environ["EMBEDDINGS_SHARE_MODE"] = mode
+    sidecar = None
+    if mode == "sidecar":
+        socket_path = os.path.join(tempfile.mkdtemp(), "embeddings.sock")
+        os.environ["EMBEDDINGS_SIDECAR_SOCKET"] = socket_path
+        sidecar = subprocess.Popen([sys.executable, "-m", "internal.core.embeddings_sidecar.server"])
+        while not os.path.exists(socket_path):
+            time.sleep(0.5)
+
+    from app.http.module import injector
+    from internal.service import EmbeddingsService
+
+    if mode == "preload":
+        injector.get(EmbeddingsService).preload()
+
+    context = multiprocessing.get_context("fork")
+    done = context.Event()
+    processes = []
+    for _ in range(workers):
+        ready = context.Event()
+        process = context.Process(target=_worker, args=(ready, done))
+        process.start()
+        processes.append((process, ready))
+
+    for _, ready in processes:
+        ready.wait()
+
+    worker_memory = [read_memory(process.pid) for process, _ in processes]
+    result = {
+        "mode": mode,
+        "workers": worker_memory,
+        "avg_rss_mb": round(sum(m["rss_mb"] for m in worker_memory) / workers, 1),
+        "avg_pss_mb": round(sum(m["pss_mb"] for m in worker_memory) / workers, 1),
+        "parent": read_memory(os.getpid()),
+    }
+    if sidecar is not None:
+        result["sidecar"] = read_memory(sidecar.pid)
+
+    done.set()
+    for process, _ in processes:
+        process.join()
+    if sidecar is not None:
+        sidecar.terminate()
+        sidecar.wait()
+
+    # 总占用以 PSS 计 共享页按进程均摊 可直接相加
+    result["total_pss_mb"] = round(
+        sum(m["pss_mb"] for m in worker_memory)
+        + result["parent"]["pss_mb"]
+        + result.get("sidecar", {}).get("pss_mb", 0),
+        1,
+    )
+    return result
+
+
+if __name__ == "__main__":
+    # python -m internal.core.embeddings_sidecar.memory_benchmark [workers] [mode ...]
+    import dotenv
+
+    dotenv.load_dotenv()
+
+    args = sys.argv[1:]
+    if len(args) >= 2 and args[0] == "--measure":
+        # 子进程 在干净的进程中测量单个模式
+        print(json.dumps(measure(args[1], int(args[2]))))
+        sys.exit(0)
+
+    worker_count = int(args[0]) if args else 4
+    modes = args[1:] or list(SHARE_MODES)
+    results = []
+    for share_mode in modes:
+        output = subprocess.run(
+            [sys.executable, "-m", "internal.core.embeddings_sidecar.memory_benchmark", "--measure", share_mode,
+             str(worker_count)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    print(json.dumps(results, ensure_ascii=False, indent=2))
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   protocol
+@Time   :   2026/10/18 16:05
+@Author :   s.qiu@foxmail.com
+"""
+import json
+import socket
+import struct
+
+import numpy as np
+
+# 请求类型
+KIND_DOCUMENTS = 0
+KIND_QUERY = 1
+
+# 响应状态
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+# 请求头: 类型(1字节) + 负载长度(4字节) 负载为 JSON 编码的文本列表
+REQUEST_HEADER = struct.Struct(">BI")
+
+# 响应头: 状态(1字节) + 行数(4字节) + 维度(4字节) + 负载长度(4字节)
+# 成功时负载为 float32 矩阵 失败时负载为 utf-8 错误信息
+RESPONSE_HEADER = struct.Struct(">BIII")
+
+
+def recv_exact(sock: socket.socket, size: int) -> bytes:
+    """从套接字读取指定长度的数据"""
+    chunks = []
+    while size > 0:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("嵌入服务连接已关闭")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def send_request(sock: socket.socket, kind: int, texts: list[str]) -> None:
+    """发送嵌入请求"""
+    payload = json.dumps(texts, ensure_ascii=False).encode("utf-8")
+    sock.sendall(REQUEST_HEADER.pack(kind, len(payload)) + payload)
+
+
+def recv_request(sock: socket.socket) -> tuple[int, list[str]]:
+    """读取嵌入请求"""
+    kind, length = REQUEST_HEADER.unpack(recv_exact(sock, REQUEST_HEADER.size))
+    return kind, json.loads(recv_exact(sock, length).decode("utf-8"))
+
+
+def send_vectors(sock: socket.socket, vectors: list[list[float]]) -> None:
+    """发送嵌入结果"""
+    matrix = np.asarray(vectors, dtype=np.float32)
+    rows, dim = (matrix.shape[0], matrix.shape[1]) if matrix.ndim == 2 else (0, 0)
+    payload = matrix.tobytes()
+    sock.sendall(RESPONSE_HEADER.pack(STATUS_OK, rows, dim, len(payload)) + payload)
+
+
+def send_error(sock: socket.socket, error: str) -> None:
+    """发送错误信息"""
+    payload = error.encode("utf-8")
+    sock.sendall(RESPONSE_HEADER.pack(STATUS_ERROR, 0, 0, len(payload)) + payload)
+
+
+def recv_vectors(sock: socket.socket) -> list[list[float]]:
+    """读取嵌入结果 服务端返回错误时抛出 RuntimeError"""
+    status, rows, dim, length = RESPONSE_HEADER.unpack(recv_exact(sock, RESPONSE_HEADER.size))
+    payload = recv_exact(sock, length)
+    if status != STATUS_OK:
+        raise RuntimeError(f"嵌入服务执行失败: {payload.decode('utf-8')}")
+    return np.frombuffer(payload, dtype=np.float32).reshape(rows, dim).tolist()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   server
+@Time   :   2026/10/18 16:05
+@Author :   s.qiu@foxmail.com
+"""
+import logging
+import os
+import socketserver
+
+from langchain_core.embeddings import Embeddings
+
+from .protocol import KIND_QUERY, recv_request, send_error, send_vectors
+
+
+class _EmbeddingsRequestHandler(socketserver.BaseRequestHandler):
+    """单条连接的请求处理 每条连接一个线程 连接上的请求串行处理"""
+
+    def handle(self) -> None:
+        embeddings: Embeddings = self.server.embeddings
+        while True:
+            try:
+                kind, texts = recv_request(self.request)
+            except (ConnectionError, OSError):
+                return
+
+            try:
+                if kind == KIND_QUERY:
+                    vectors = [embeddings.embed_query(texts[0])]
+                else:
+                    vectors = embeddings.embed_documents(texts)
+            except Exception as e:
+                logging.exception(f"嵌入服务执行失败，错误信息：{str(e)}")
+                send_error(self.request, str(e))
+                continue
+            send_vectors(self.request, vectors)
+
+
+class EmbeddingsSidecarServer(socketserver.ThreadingUnixStreamServer):
+    """嵌入服务 在本机以 Unix 套接字对外提供嵌入能力
+    所有连接的请求提交到同一个嵌入实例(通常为批量执行器) 从而在多个工作进程间共享模型并统一组批
+    """
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, embeddings: Embeddings):
+        """构造函数 清理残留的套接字文件后监听"""
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        self.embeddings = embeddings
+        super().__init__(socket_path, _EmbeddingsRequestHandler)
+        os.chmod(socket_path, 0o660)
+
+
+if __name__ == "__main__":
+    # python -m internal.core.embeddings_sidecar.server
+    import dotenv
+
+    dotenv.load_dotenv()
+
+    # 服务进程本身在本地加载模型
+    os.environ["EMBEDDINGS_SHARE_MODE"] = "none"
+    logging.basicConfig(level=logging.INFO)
+
+    from app.http.module import injector
+    from internal.service import EmbeddingsService
+
+    embeddings_service = injector.get(EmbeddingsService)
+    embeddings_service.warm_up()
+
+    socket_path = os.getenv("EMBEDDINGS_SIDECAR_SOCKET", "/tmp/llmops-embeddings.sock")
+    with EmbeddingsSidecarServer(socket_path, embeddings_service.embeddings_executor) as server:
+        logging.info(f"嵌入服务已启动，监听: {socket_path}")
+        server.serve_forever()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   sidecar_embeddings
+@Time   :   2026/10/18 16:05
+@Author :   s.qiu@foxmail.com
+"""
+import os
+import socket
+import threading
+
+from langchain_core.embeddings import Embeddings
+
+from .protocol import KIND_DOCUMENTS, KIND_QUERY, recv_vectors, send_request
+
+
+class SidecarEmbeddings(Embeddings):
+    """嵌入服务客户端
+    通过 Unix 套接字调用本机的嵌入服务进程 多个工作进程共享同一份模型 由服务端统一组批执行
+    """
+
+    def __init__(self, socket_path: str, timeout: float = 60):
+        """构造函数 传递套接字路径与单次请求超时时间"""
+        self._socket_path = socket_path
+        self._timeout = timeout
+        # 每个线程独立持有一条连接 请求在连接上串行收发
+        self._local = threading.local()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        return self._request(KIND_DOCUMENTS, texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._request(KIND_QUERY, [text])[0]
+
+    def _request(self, kind: int, texts: list[str]) -> list[list[float]]:
+        """发送请求并等待结果 连接异常时重建连接重试一次"""
+        for attempt in range(2):
+            sock = self._connection()
+            try:
+                send_request(sock, kind, texts)
+                return recv_vectors(sock)
+            except (ConnectionError, socket.timeout, OSError):
+                self._close()
+                if attempt == 1:
+                    raise
+
+    def _connection(self) -> socket.socket:
+        """获取当前线程的连接 进程fork后不复用父进程的连接"""
+        sock = getattr(self._local, "sock", None)
+        if sock is not None and self._local.pid == os.getpid():
+            return sock
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self._timeout)
+        sock.connect(self._socket_path)
+        self._local.sock = sock
+        self._local.pid = os.getpid()
+        return sock
+
+    def _close(self) -> None:
+        """关闭当前线程的连接"""
+        sock = getattr(self._local, "sock", None)
+        if sock is not None and self._local.pid == os.getpid():
+            sock.close()
+        self._local.sock = None
@@ -6,5 +6,6 @@
 @Author :   s.qiu@foxmail.com
 """
 from .file_extractor import FileExtractor
+from .parse_cache import ParseCache
 
-__all__ = ['FileExtractor']
+__all__ = ['FileExtractor', 'ParseCache']
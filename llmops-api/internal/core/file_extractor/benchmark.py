@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   benchmark
+@Time   :   2026/10/19 18:10
+@Author :   s.qiu@foxmail.com
+"""
+import multiprocessing
+import resource
+import time
+from pathlib import Path
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from internal.core.parallel_extractor import PARALLEL_EXTENSIONS, parallel_lazy_load
+from .file_extractor import FileExtractor
+
+
+def _extract(file_path: str, streaming: bool, result_queue: multiprocessing.Queue) -> None:
+    """子进程函数 解析并分割文件 统计耗时与进程峰值内存"""
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
+    start_at = time.perf_counter()
+
+    if streaming:
+        # 流式: 逐页/元素解析并分割 不保留解析结果
+        document_count, segment_count = 0, 0
+        for lc_document in FileExtractor.lazy_load_from_file(file_path):
+            document_count += 1
+            segment_count += len(text_splitter.split_documents([lc_document]))
+    else:
+        # 一次性: 完整解析结果保存在内存中后统一分割
+        lc_documents = FileExtractor.load_from_file(file_path)
+        document_count = len(lc_documents)
+        segment_count = len(text_splitter.split_documents(lc_documents))
+
+    result_queue.put({
+        "wall_time_s": time.perf_counter() - start_at,
+        # Linux 下 ru_maxrss 单位为 KB
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "documents": document_count,
+        "segments": segment_count,
+    })
+
+
+def benchmark_file_extraction(file_paths: list[str]) -> dict:
+    """对比每个文件一次性解析与流式解析的耗时与峰值内存 每次测量使用独立的子进程 按文件类型汇总"""
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    for file_path in file_paths:
+        file_result = {"file_type": Path(file_path).suffix.lower(), "size_mb": Path(file_path).stat().st_size / 1024 ** 2}
+        for mode, streaming in (("eager", False), ("streaming", True)):
+            result_queue = context.Queue()
+            process = context.Process(target=_extract, args=(file_path, streaming, result_queue))
+            process.start()
+            file_result[mode] = result_queue.get()
+            process.join()
+        results[file_path] = file_result
+
+    return results
+
+
+def _raise_pool_unavailable():
+    """并行吞吐统计不允许降级为串行解析 否则结果会被误记为并行数据"""
+    raise RuntimeError("进程池无法启动，无法统计并行解析吞吐")
+
+
+def benchmark_parallel_extraction(corpus_dir: str) -> dict:
+    """对比语料目录下各类型文件串行解析与并行解析的吞吐(MB/s、文档数/s) 按文件类型汇总"""
+    file_paths = sorted(str(path) for path in Path(corpus_dir).iterdir() if path.is_file())
+
+    def run(parallel: bool) -> dict:
+        stats = {}
+        for file_path in file_paths:
+            file_type = Path(file_path).suffix.lower()
+            start_at = time.perf_counter()
+            if parallel and file_type in PARALLEL_EXTENSIONS:
+                document_count = sum(1 for _ in parallel_lazy_load(file_path, _raise_pool_unavailable))
+            else:
+                document_count = sum(1 for _ in FileExtractor._get_loader(file_path).lazy_load())
+            elapsed = time.perf_counter() - start_at
+
+            type_stats = stats.setdefault(file_type, {"files": 0, "size_mb": 0, "documents": 0, "elapsed_s": 0})
+            type_stats["files"] += 1
+            type_stats["size_mb"] += Path(file_path).stat().st_size / 1024 ** 2
+            type_stats["documents"] += document_count
+            type_stats["elapsed_s"] += elapsed
+
+        for type_stats in stats.values():
+            type_stats["mb_per_second"] = type_stats["size_mb"] / type_stats["elapsed_s"]
+            type_stats["documents_per_second"] = type_stats["documents"] / type_stats["elapsed_s"]
+        total_size = sum(type_stats["size_mb"] for type_stats in stats.values())
+        total_elapsed = sum(type_stats["elapsed_s"] for type_stats in stats.values())
+        return {"by_type": stats, "mb_per_second": total_size / total_elapsed if total_elapsed else 0}
+
+    # 预热进程池 排除子进程启动与导入耗时
+    for file_path in file_paths:
+        if Path(file_path).suffix.lower() in PARALLEL_EXTENSIONS:
+            sum(1 for _ in parallel_lazy_load(file_path, _raise_pool_unavailable))
+            break
+
+    serial = run(parallel=False)
+    parallel = run(parallel=True)
+    return {
+        "serial": serial,
+        "parallel": parallel,
+        "speedup": parallel["mb_per_second"] / serial["mb_per_second"] if serial["mb_per_second"] else 0,
+    }
+
+
+if __name__ == "__main__":
+    # 峰值内存与耗时: python -m internal.core.file_extractor.benchmark <file> [file ...]
+    # 并行解析吞吐: python -m internal.core.file_extractor.benchmark --parallel <混合类型文件语料目录>
+    import json
+    import sys
+
+    if sys.argv[1:2] == ["--parallel"]:
+        result = benchmark_parallel_extraction(sys.argv[2])
+    else:
+        result = benchmark_file_extraction(sys.argv[1:])
+    print(json.dumps(result, ensure_ascii=False, indent=2))
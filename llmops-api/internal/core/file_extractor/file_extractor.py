@@ -9,8 +9,9 @@
 import os.path
 import tempfile
 from dataclasses import dataclass
+from functools import cached_property
 from pathlib import Path
-from typing import Union
+from typing import Iterator, Optional, Union
 
 import requests
 from injector import inject
@@ -25,10 +26,13 @@ from langchain_community.document_loaders import (
     UnstructuredFileLoader,
     TextLoader,
 )
+from langchain_core.document_loaders import BaseLoader
 from langchain_core.documents import Document as LCDocument
 
 from internal.model import UploadFile
 from internal.service import CosService
+from internal.core.parallel_extractor import parallel_lazy_load, should_parallel_extract
+from .parse_cache import ParseCache
 
 
 @inject
@@ -37,6 +41,16 @@ class FileExtractor:
     """文件提取提，用于将远程文件、upload_file记录加载成LangChain对应的文档或字符串"""
     cos_service: CosService
 
+    @cached_property
+    def parse_cache(self) -> Optional[ParseCache]:
+        """文件解析结果磁盘缓存 相同内容的文件重复导入或按新规则重新分割时跳过下载与解析"""
+        if os.getenv("PARSE_CACHE_ENABLED", "true").lower() != "true":
+            return None
+        return ParseCache(
+            cache_dir=os.getenv("PARSE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "llmops-parse-cache")),
+            max_size=int(os.getenv("PARSE_CACHE_MAX_SIZE", 2 * 1024 ** 3)),
+        )
+
     def load(
             self,
             upload_file: UploadFile,
@@ -44,6 +58,21 @@ class FileExtractor:
             is_unstructured: bool = True,
     ) -> Union[list[LCDocument], str]:
         """加载传入的upload_file记录，返回LangChain文档列表或者字符串"""
+        lc_documents = self.lazy_load(upload_file, is_unstructured)
+        return self._join_text(lc_documents) if return_text else list(lc_documents)
+
+    def lazy_load(self, upload_file: UploadFile, is_unstructured: bool = True) -> Iterator[LCDocument]:
+        """流式加载传入的upload_file记录 逐个返回页面/元素 临时文件在迭代结束或生成器关闭后删除
+        命中解析缓存时直接从缓存读取 未命中时解析结果同时写入缓存
+        """
+        cache_key = None
+        if self.parse_cache is not None and upload_file.hash:
+            cache_key = ParseCache.build_key(upload_file.hash, Path(upload_file.key).suffix, is_unstructured)
+            cached_documents = self.parse_cache.get(cache_key)
+            if cached_documents is not None:
+                yield from cached_documents
+                return
+
         # 1.创建一个临时的文件夹
         with tempfile.TemporaryDirectory() as temp_dir:
             # 2.构建一个临时文件路径
@@ -53,7 +82,10 @@ class FileExtractor:
             self.cos_service.download_file(upload_file.key, file_path)
 
             # 4.从指定的路径中去加载文件
-            return self.load_from_file(file_path, return_text, is_unstructured)
+            lc_documents = self.lazy_load_from_file(file_path, is_unstructured)
+            if cache_key is not None:
+                lc_documents = self.parse_cache.write_through(cache_key, lc_documents)
+            yield from lc_documents
 
     @classmethod
     def load_from_url(cls, url: str, return_text: bool = False) -> Union[list[LCDocument], str]:
@@ -77,28 +109,41 @@ class FileExtractor:
             return_text: bool = False,
             is_unstructured: bool = True,
     ) -> Union[list[LCDocument], str]:
-        """从本地文件中加载数据，返回LangChain文档列表或者字符串"""
-        # 1.获取文件的扩展名
-        delimiter = "\n\n"
+        """从本地文件中加载数据，返回LangChain文档列表或者字符串 文件只解析一次"""
+        lc_documents = cls.lazy_load_from_file(file_path, is_unstructured)
+        return cls._join_text(lc_documents) if return_text else list(lc_documents)
+
+    @classmethod
+    def lazy_load_from_file(cls, file_path: str, is_unstructured: bool = True) -> Iterator[LCDocument]:
+        """从本地文件中流式加载数据 PDF按页、表格按工作表返回 其余文件返回单个文档
+        超过大小阈值的 PDF/xlsx 拆分后在进程池中并行解析
+        """
+        if should_parallel_extract(file_path):
+            return parallel_lazy_load(file_path, lambda: cls._get_loader(file_path, is_unstructured).lazy_load())
+        return cls._get_loader(file_path, is_unstructured).lazy_load()
+
+    @classmethod
+    def _get_loader(cls, file_path: str, is_unstructured: bool = True) -> BaseLoader:
+        """根据不同的文件扩展名去获取不同的加载器"""
         file_extension = Path(file_path).suffix.lower()
 
-        # 2.根据不同的文件扩展名去加载不同的加载器
         if file_extension in [".xlsx", ".xls"]:
-            loader = UnstructuredExcelLoader(file_path)
+            return UnstructuredExcelLoader(file_path, mode="elements")
         elif file_extension == ".pdf":
-            loader = UnstructuredPDFLoader(file_path)
+            return UnstructuredPDFLoader(file_path, mode="paged")
         elif file_extension in [".md", ".markdown"]:
-            loader = UnstructuredMarkdownLoader(file_path)
+            return UnstructuredMarkdownLoader(file_path)
         elif file_extension in [".htm", ".html"]:
-            loader = UnstructuredHTMLLoader(file_path)
+            return UnstructuredHTMLLoader(file_path)
         elif file_extension == ".csv":
-            loader = UnstructuredCSVLoader(file_path)
-        elif file_extension in [".ppt", "pptx"]:
-            loader = UnstructuredPowerPointLoader(file_path)
+            return UnstructuredCSVLoader(file_path)
+        elif file_extension in [".ppt", ".pptx"]:
+            return UnstructuredPowerPointLoader(file_path)
         elif file_extension == ".xml":
-            loader = UnstructuredXMLLoader(file_path)
-        else:
-            loader = UnstructuredFileLoader(file_path) if is_unstructured else TextLoader(file_path)
-        docs = loader.load()
-        # 3.返回加载的文档列表或者文本
-        return delimiter.join([document.page_content for document in loader.load()]) if return_text else loader.load()
+            return UnstructuredXMLLoader(file_path)
+        return UnstructuredFileLoader(file_path) if is_unstructured else TextLoader(file_path)
+
+    @classmethod
+    def _join_text(cls, lc_documents: Iterator[LCDocument]) -> str:
+        """拼接文档列表为文本"""
+        return "\n\n".join(lc_document.page_content for lc_document in lc_documents)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   parse_cache
+@Time   :   2026/10/19 20:30
+@Author :   s.qiu@foxmail.com
+"""
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from hashlib import sha256
+from pathlib import Path
+from typing import Iterator, Optional
+
+from langchain_core.documents import Document as LCDocument
+
+# 加载器版本 修改加载器类型、加载模式或解析参数时需递增 使旧缓存失效
+LOADER_VERSION = 2
+
+# 缓存文件格式: [压缩文档块...][索引: 每个文档块的(偏移, 长度)][尾部: 索引偏移, 文档数量, 魔数]
+# 每个文档单独压缩 读取时通过内存映射按需解压 无需将整个缓存文件读入内存
+_MAGIC = b"LPC1"
+_INDEX_ENTRY = struct.Struct("<QI")
+_TRAILER = struct.Struct("<QI4s")
+
+# 临时文件超过该时长(秒)未更新视为写入进程已退出的残留文件
+_STALE_TEMP_SECONDS = 6 * 3600
+
+
+class ParseCache:
+    """文件解析结果磁盘缓存
+    以 文件hash+加载器版本+加载方式 为键 保存解析得到的文档(页面/元素) 总大小超出上限时按最近使用时间淘汰
+    """
+
+    def __init__(self, cache_dir: str, max_size: int, compress_level: int = 6):
+        """构造函数 传递缓存目录、缓存总大小上限(字节)、压缩级别"""
+        self._cache_dir = Path(cache_dir)
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        self._max_size = max_size
+        self._compress_level = compress_level
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build_key(cls, file_hash: str, file_extension: str, is_unstructured: bool) -> str:
+        """生成缓存键 相同内容的文件使用相同加载器时共用缓存"""
+        payload = f"{file_hash}:{file_extension.lower()}:{is_unstructured}:{LOADER_VERSION}"
+        return sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Iterator[LCDocument]]:
+        """读取缓存 未命中返回 None 命中时返回逐个解压文档的迭代器 缓存文件损坏时删除并视为未命中"""
+        path = self._path(key)
+        try:
+            file = open(path, "rb")
+        except FileNotFoundError:
+            return None
+
+        try:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            index = self._read_index(buffer)
+        except (ValueError, OSError, struct.error) as e:
+            file.close()
+            logging.warning(f"解析缓存文件损坏，删除后重新解析，缓存文件：{path.name}，错误信息：{str(e)}")
+            path.unlink(missing_ok=True)
+            return None
+
+        # 更新访问时间 作为淘汰依据
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return self._read(file, buffer, index)
+
+    def write_through(self, key: str, lc_documents: Iterator[LCDocument]) -> Iterator[LCDocument]:
+        """透传文档迭代器的同时写入缓存 迭代完整结束后缓存才生效 中途关闭则丢弃"""
+        fd, temp_path = tempfile.mkstemp(dir=self._cache_dir, suffix=".tmp")
+        completed = False
+        try:
+            with os.fdopen(fd, "wb") as file:
+                index = []
+                for lc_document in lc_documents:
+                    block = zlib.compress(
+                        json.dumps(
+                            {"page_content": lc_document.page_content, "metadata": lc_document.metadata},
+                            ensure_ascii=False,
+                            default=str,
+                        ).encode(),
+                        self._compress_level,
+                    )
+                    index.append((file.tell(), len(block)))
+                    file.write(block)
+                    yield lc_document
+
+                index_offset = file.tell()
+                for offset, length in index:
+                    file.write(_INDEX_ENTRY.pack(offset, length))
+                file.write(_TRAILER.pack(index_offset, len(index), _MAGIC))
+
+            os.replace(temp_path, self._path(key))
+            completed = True
+        finally:
+            if not completed and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        self._evict()
+
+    def size(self) -> int:
+        """缓存总大小(字节)"""
+        return sum(path.stat().st_size for path in self._cache_dir.glob("*.cache"))
+
+    @classmethod
+    def _read_index(cls, buffer: mmap.mmap) -> list[tuple[int, int]]:
+        """校验尾部与索引 返回每个文档块的(偏移, 长度) 尾部最后写入 写入中断或截断的文件无法通过校验"""
+        if len(buffer) < _TRAILER.size:
+            raise ValueError("解析缓存文件不完整")
+        index_offset, count, magic = _TRAILER.unpack_from(buffer, len(buffer) - _TRAILER.size)
+        if magic != _MAGIC:
+            raise ValueError("解析缓存文件格式错误")
+        if index_offset + count * _INDEX_ENTRY.size != len(buffer) - _TRAILER.size:
+            raise ValueError("解析缓存文件索引与文件大小不一致")
+
+        index = [_INDEX_ENTRY.unpack_from(buffer, index_offset + i * _INDEX_ENTRY.size) for i in range(count)]
+        if any(offset + length > index_offset for offset, length in index):
+            raise ValueError("解析缓存文件索引越界")
+        return index
+
+    @classmethod
+    def _read(cls, file, buffer: mmap.mmap, index: list[tuple[int, int]]) -> Iterator[LCDocument]:
+        """通过内存映射逐个读取并解压文档"""
+        with file, buffer:
+            for offset, length in index:
+                data = json.loads(zlib.decompress(buffer[offset: offset + length]))
+                yield LCDocument(page_content=data["page_content"], metadata=data["metadata"])
+
+    def _evict(self) -> None:
+        """清理残留的临时文件 总大小超出上限时按最近使用时间从旧到新删除缓存文件"""
+        with self._lock:
+            # 解析进程被杀死(超时、内存不足)时临时文件不会被删除 写入中的临时文件持续更新修改时间 不会被清理
+            stale_before = time.time() - _STALE_TEMP_SECONDS
+            for path in self._cache_dir.glob("*.tmp"):
+                try:
+                    if path.stat().st_mtime < stale_before:
+                        path.unlink()
+                        logging.info(f"清理残留的解析缓存临时文件：{path.name}")
+                except FileNotFoundError:
+                    continue
+
+            entries = []
+            for path in self._cache_dir.glob("*.cache"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total_size = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+                if total_size <= self._max_size:
+                    break
+                try:
+                    path.unlink()
+                    total_size -= size
+                except FileNotFoundError:
+                    continue
+                logging.info(f"解析缓存超出上限，淘汰缓存文件：{path.name}")
+
+    def _path(self, key: str) -> Path:
+        return self._cache_dir / f"{key}.cache"
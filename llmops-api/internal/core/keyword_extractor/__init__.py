@@ -0,0 +1,13 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   __init__.py
+@Time   :   2026/10/22 11:20
+@Author :   s.qiu@foxmail.com
+"""
+from .keyword_extractor import extract_keywords, init_extract_worker
+
+__all__ = [
+    "extract_keywords",
+    "init_extract_worker",
+]
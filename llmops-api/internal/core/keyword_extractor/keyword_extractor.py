@@ -0,0 +1,25 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   keyword_extractor
+@Time   :   2026/10/22 11:20
+@Author :   s.qiu@foxmail.com
+"""
+import jieba
+import jieba.analyse
+from jieba.analyse import default_tfidf
+
+from internal.entity.jieba_entity import STOPWORD_SET
+
+
+def init_extract_worker() -> None:
+    """进程池子进程初始化 加载词典并扩展jieba停用词
+    子进程以 spawn 方式启动 只导入本模块 不导入服务层(模型、数据库等)
+    """
+    jieba.initialize()
+    default_tfidf.stop_words = STOPWORD_SET
+
+
+def extract_keywords(text: str, max_keyword_pre_chunk: int) -> list[str]:
+    """子进程中执行的关键词提取函数 需为模块级函数以便序列化"""
+    return jieba.analyse.extract_tags(sentence=text, topK=max_keyword_pre_chunk)
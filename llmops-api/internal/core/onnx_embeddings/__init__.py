@@ -0,0 +1,15 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   __init__.py
+@Time   :   2026/10/18 10:40
+@Author :   s.qiu@foxmail.com
+"""
+from .onnx_embeddings import OnnxEmbeddings, check_equivalence, default_onnx_output_path, export_onnx_model
+
+__all__ = [
+    "OnnxEmbeddings",
+    "check_equivalence",
+    "default_onnx_output_path",
+    "export_onnx_model",
+]
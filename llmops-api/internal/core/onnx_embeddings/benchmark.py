@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   benchmark
+@Time   :   2026/10/18 10:40
+@Author :   s.qiu@foxmail.com
+"""
+import time
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from .onnx_embeddings import EQUIVALENCE_CORPUS
+
+
+def benchmark_embeddings(
+        embeddings: Embeddings,
+        texts: list[str] = None,
+        batch_size: int = 32,
+        rounds: int = 5,
+        query_rounds: int = 50,
+) -> dict:
+    """压测单个嵌入后端 统计批量吞吐(sentences/sec)与单条query延迟的 p50/p99(毫秒)"""
+    texts = texts or EQUIVALENCE_CORPUS * 10
+
+    # 预热 排除首次推理的图优化、内存分配开销
+    embeddings.embed_documents(texts[:batch_size])
+
+    # 批量吞吐
+    batch_latencies = []
+    start_at = time.perf_counter()
+    for _ in range(rounds):
+        for i in range(0, len(texts), batch_size):
+            batch_start_at = time.perf_counter()
+            embeddings.embed_documents(texts[i:i + batch_size])
+            batch_latencies.append(time.perf_counter() - batch_start_at)
+    elapsed = time.perf_counter() - start_at
+
+    # 单条query延迟
+    query_latencies = []
+    for i in range(query_rounds):
+        query_start_at = time.perf_counter()
+        embeddings.embed_query(texts[i % len(texts)])
+        query_latencies.append(time.perf_counter() - query_start_at)
+
+    return {
+        "sentences_per_second": len(texts) * rounds / elapsed,
+        "batch_p50_ms": float(np.percentile(batch_latencies, 50) * 1000),
+        "batch_p99_ms": float(np.percentile(batch_latencies, 99) * 1000),
+        "query_p50_ms": float(np.percentile(query_latencies, 50) * 1000),
+        "query_p99_ms": float(np.percentile(query_latencies, 99) * 1000),
+    }
+
+
+if __name__ == "__main__":
+    # python -m internal.core.onnx_embeddings.benchmark torch onnx onnx-int8
+    import json
+    import sys
+
+    import dotenv
+
+    dotenv.load_dotenv()
+
+    from app.http.module import injector
+    from internal.service import EmbeddingsService
+
+    results = injector.get(EmbeddingsService).benchmark(sys.argv[1:] or None)
+    print(json.dumps(results, ensure_ascii=False, indent=2))
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   onnx_embeddings
+@Time   :   2026/10/18 10:40
+@Author :   s.qiu@foxmail.com
+"""
+import logging
+from pathlib import Path
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+# 等价性校验使用的固定语料 覆盖中英文、长短文本
+EQUIVALENCE_CORPUS = [
+    "你好，世界",
+    "Hello, world!",
+    "LLMOps 平台支持知识库检索、工作流编排以及智能体应用的一站式开发。",
+    "Retrieval augmented generation combines a retriever with a large language model.",
+    "北京是中华人民共和国的首都，也是全国的政治、文化中心。",
+    "The quick brown fox jumps over the lazy dog.",
+    "向量数据库用于存储文本片段的嵌入向量，并支持相似度检索。",
+    "def add(a, b):\n    return a + b",
+    "Das ist ein kurzer deutscher Satz über maschinelles Lernen.",
+    "今天天气不错，适合出去散步。" * 20,
+]
+
+
+def export_onnx_model(model_path: str, output_path: Path, quantize: bool = False) -> Path:
+    """将 transformers 模型导出为 ONNX 格式 可选 int8 动态量化 返回最终模型路径"""
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    output_path.mkdir(parents=True, exist_ok=True)
+    fp32_file = output_path / "model.onnx"
+
+    if not fp32_file.exists():
+        tokenizer = AutoTokenizer.from_pretrained(model_path, trust_remote_code=True, local_files_only=True)
+        model = AutoModel.from_pretrained(model_path, trust_remote_code=True, local_files_only=True).eval()
+
+        class _ClsPooling(torch.nn.Module):
+            """导出包装 仅输出 CLS 位置的隐藏状态 与 sentence-transformers 的池化方式保持一致"""
+
+            def __init__(self, inner: torch.nn.Module):
+                super().__init__()
+                self.inner = inner
+
+            def forward(self, input_ids, attention_mask):
+                return self.inner(input_ids=input_ids, attention_mask=attention_mask).last_hidden_state[:, 0]
+
+        inputs = tokenizer(["ONNX export"], return_tensors="pt")
+        with torch.no_grad():
+            torch.onnx.export(
+                _ClsPooling(model),
+                (inputs["input_ids"], inputs["attention_mask"]),
+                str(fp32_file),
+                input_names=["input_ids", "attention_mask"],
+                output_names=["embeddings"],
+                dynamic_axes={
+                    "input_ids": {0: "batch", 1: "sequence"},
+                    "attention_mask": {0: "batch", 1: "sequence"},
+                    "embeddings": {0: "batch"},
+                },
+                opset_version=17,
+                dynamo=False,
+            )
+        tokenizer.save_pretrained(str(output_path))
+        logging.info(f"ONNX模型导出完成: {fp32_file}")
+
+    if not quantize:
+        return fp32_file
+
+    int8_file = output_path / "model.int8.onnx"
+    if not int8_file.exists():
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(str(fp32_file), str(int8_file), weight_type=QuantType.QInt8)
+        logging.info(f"ONNX模型int8量化完成: {int8_file}")
+    return int8_file
+
+
+def cosine_similarities(reference: list[list[float]], candidate: list[list[float]]) -> list[float]:
+    """逐条计算两组向量的余弦相似度"""
+    a = np.asarray(reference, dtype=np.float32)
+    b = np.asarray(candidate, dtype=np.float32)
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return (a * b).sum(axis=1).tolist()
+
+
+def check_equivalence(
+        reference: Embeddings,
+        candidate: Embeddings,
+        threshold: float = 0.99,
+        texts: list[str] = None,
+) -> tuple[bool, float]:
+    """在固定语料上比较两个嵌入后端 返回是否全部达到阈值以及最小余弦相似度"""
+    texts = texts or EQUIVALENCE_CORPUS
+    similarities = cosine_similarities(reference.embed_documents(texts), candidate.embed_documents(texts))
+    min_similarity = min(similarities)
+    return min_similarity >= threshold, min_similarity
+
+
+class OnnxEmbeddings(Embeddings):
+    """基于 ONNX Runtime 的 CPU 嵌入后端
+    输出 CLS 池化后的 L2 归一化向量 与 HuggingFaceEmbeddings(gte-multilingual-base) 的结果保持一致
+    """
+
+    def __init__(self, model_file: Path, max_length: int = 8192, batch_size: int = 32, num_threads: int = 0):
+        """构造函数 传递ONNX模型文件路径 分词器从模型所在目录加载"""
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads > 0:
+            options.intra_op_num_threads = num_threads
+
+        self._session = ort.InferenceSession(str(model_file), options, providers=["CPUExecutionProvider"])
+        self._tokenizer = AutoTokenizer.from_pretrained(str(Path(model_file).parent), local_files_only=True)
+        self._max_length = max_length
+        self._batch_size = batch_size
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """按批次嵌入文本列表"""
+        vectors = []
+        for i in range(0, len(texts), self._batch_size):
+            vectors.extend(self._embed(texts[i:i + self._batch_size]))
+        return vectors
+
+    def embed_query(self, text: str) -> list[float]:
+        """嵌入单条query"""
+        return self._embed([text])[0]
+
+    def _embed(self, texts: list[str]) -> list[list[float]]:
+        """执行单个批次的推理"""
+        if not texts:
+            return []
+        inputs = self._tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self._max_length,
+            return_tensors="np",
+        )
+        embeddings = self._session.run(
+            ["embeddings"],
+            {
+                "input_ids": inputs["input_ids"].astype(np.int64),
+                "attention_mask": inputs["attention_mask"].astype(np.int64),
+            },
+        )[0]
+        embeddings = embeddings / np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings.tolist()
+
+
+def default_onnx_output_path(base_cache_dir: Path, model_repo_id: str) -> Path:
+    """ONNX模型的默认导出目录 与原始模型缓存目录放在一起"""
+    return base_cache_dir / "onnx" / model_repo_id.replace("/", "--")
+
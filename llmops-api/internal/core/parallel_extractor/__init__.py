@@ -0,0 +1,14 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   __init__.py
+@Time   :   2026/10/22 12:10
+@Author :   s.qiu@foxmail.com
+"""
+from .parallel_extractor import PARALLEL_EXTENSIONS, parallel_lazy_load, should_parallel_extract
+
+__all__ = [
+    "PARALLEL_EXTENSIONS",
+    "parallel_lazy_load",
+    "should_parallel_extract",
+]
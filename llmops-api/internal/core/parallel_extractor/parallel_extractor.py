@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   parallel_extractor
+@Time   :   2026/10/19 22:10
+@Author :   s.qiu@foxmail.com
+"""
+import logging
+import os
+import tempfile
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Iterator
+
+from langchain_community.document_loaders import UnstructuredExcelLoader, UnstructuredPDFLoader
+from langchain_core.documents import Document as LCDocument
+
+from internal.core.process_pool import ProcessPool
+
+# 支持并行解析的文件类型 PDF按页码范围拆分 xlsx按工作表拆分
+PARALLEL_EXTENSIONS = (".pdf", ".xlsx")
+
+
+@lru_cache(maxsize=None)
+def _get_pool() -> ProcessPool:
+    """进程内复用的解析进程池 子进程以 spawn 方式启动 只导入本模块 在 Celery prefork 子进程中同样可用"""
+    return ProcessPool(max_workers=int(os.getenv("PARALLEL_EXTRACTION_WORKERS", os.cpu_count() or 1)))
+
+
+def should_parallel_extract(file_path: str) -> bool:
+    """超过大小阈值的 PDF/xlsx 文件默认并行解析"""
+    if os.getenv("PARALLEL_EXTRACTION_ENABLED", "true").lower() != "true":
+        return False
+    if Path(file_path).suffix.lower() not in PARALLEL_EXTENSIONS:
+        return False
+    return os.path.getsize(file_path) >= int(os.getenv("PARALLEL_EXTRACTION_MIN_SIZE", 5 * 1024 ** 2))
+
+
+def parallel_lazy_load(file_path: str, fallback: Callable[[], Iterator[LCDocument]]) -> Iterator[LCDocument]:
+    """将文件拆分为多个部分在进程池中并行解析 按原有顺序逐个返回页面/工作表 进程池无法启动时使用 fallback 串行解析"""
+    if Path(file_path).suffix.lower() == ".pdf":
+        pages_per_part = max(1, int(os.getenv("PARALLEL_EXTRACTION_PDF_PAGES", 20)))
+        page_count = _get_pdf_page_count(file_path)
+        tasks = [
+            (_load_pdf_pages, file_path, start, min(start + pages_per_part, page_count))
+            for start in range(0, page_count, pages_per_part)
+        ]
+    else:
+        tasks = [(_load_xlsx_sheet, file_path, index, sheet_name)
+                 for index, sheet_name in enumerate(_get_xlsx_sheet_names(file_path))]
+
+    # 只有一个部分时无需经过进程池
+    if len(tasks) <= 1:
+        for func, *args in tasks:
+            yield from func(*args)
+        return
+
+    pool = _get_pool()
+    try:
+        futures = [pool.submit(func, *args) for func, *args in tasks]
+    except (OSError, RuntimeError) as e:
+        # 提交失败时尚未返回任何页面 可直接降级 丢弃进程池后下次重新创建
+        pool.reset()
+        logging.warning(f"进程池启动失败，降级为串行解析，错误信息：{str(e)}")
+        yield from fallback()
+        return
+
+    try:
+        for future in futures:
+            yield from future.result()
+    except BrokenProcessPool:
+        # 子进程异常退出后进程池不可再用 已返回部分页面无法降级 丢弃进程池后抛出异常
+        pool.reset()
+        raise
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def _get_pdf_page_count(file_path: str) -> int:
+    from pypdf import PdfReader
+
+    return len(PdfReader(file_path).pages)
+
+
+def _get_xlsx_sheet_names(file_path: str) -> list[str]:
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True)
+    try:
+        return workbook.sheetnames
+    finally:
+        workbook.close()
+
+
+def _load_pdf_pages(file_path: str, start: int, end: int) -> list[LCDocument]:
+    """子进程函数 将 [start, end) 页写入临时PDF后解析 修正页码与来源"""
+    from pypdf import PdfReader, PdfWriter
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        part_path = os.path.join(temp_dir, f"{start}-{end}.pdf")
+        reader = PdfReader(file_path)
+        writer = PdfWriter()
+        for page in reader.pages[start:end]:
+            writer.add_page(page)
+        with open(part_path, "wb") as file:
+            writer.write(file)
+
+        lc_documents = UnstructuredPDFLoader(part_path, mode="paged").load()
+
+    for lc_document in lc_documents:
+        lc_document.metadata["source"] = file_path
+        lc_document.metadata["page_number"] = lc_document.metadata.get("page_number", 1) + start
+    return lc_documents
+
+
+def _load_xlsx_sheet(file_path: str, index: int, sheet_name: str) -> list[LCDocument]:
+    """子进程函数 将单个工作表的单元格值写入临时xlsx后解析 修正工作表序号与来源"""
+    from openpyxl import Workbook, load_workbook
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        part_path = os.path.join(temp_dir, f"{index}.xlsx")
+        source = load_workbook(file_path, read_only=True, data_only=True)
+        target = Workbook(write_only=True)
+        try:
+            sheet = target.create_sheet(sheet_name)
+            for row in source[sheet_name].iter_rows(values_only=True):
+                sheet.append(row)
+            target.save(part_path)
+        finally:
+            source.close()
+
+        lc_documents = UnstructuredExcelLoader(part_path, mode="elements").load()
+
+    for lc_document in lc_documents:
+        lc_document.metadata["source"] = file_path
+        lc_document.metadata["page_number"] = index + 1
+    return lc_documents
@@ -0,0 +1,13 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   __init__.py
+@Time   :   2026/10/22 11:00
+@Author :   s.qiu@foxmail.com
+"""
+from .process_pool import ProcessPool, allow_child_processes
+
+__all__ = [
+    "ProcessPool",
+    "allow_child_processes",
+]
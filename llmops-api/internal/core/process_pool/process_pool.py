@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   process_pool
+@Time   :   2026/10/22 11:00
+@Author :   s.qiu@foxmail.com
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import process as _mproc, util as _mputil
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+# 修改当前进程配置时加锁 避免并发创建子进程时相互覆盖
+_child_process_lock = threading.Lock()
+
+# 子进程检查父进程是否存活的间隔(秒)
+_PARENT_CHECK_INTERVAL = 1
+
+# 进程池退出钩子的优先级 需高于 multiprocessing 队列关闭发送线程的钩子(10) 否则子进程收不到结束信号
+_SHUTDOWN_EXIT_PRIORITY = 100
+
+
+def _init_worker(parent_pid: int, initializer: Optional[Callable[[], None]]) -> None:
+    """子进程初始化 父进程退出(含被强制杀死)后子进程随之退出 再执行传递的初始化函数
+    spawn 子进程持有任务队列的两端 父进程退出后读取任务不会结束 需主动检查父进程
+    """
+
+    def watch_parent() -> None:
+        while os.getppid() == parent_pid:
+            time.sleep(_PARENT_CHECK_INTERVAL)
+        os._exit(1)
+
+    threading.Thread(target=watch_parent, name="parent-watcher", daemon=True).start()
+    if initializer is not None:
+        initializer()
+
+
+@contextmanager
+def allow_child_processes() -> Iterator[None]:
+    """允许当前进程创建子进程
+    Celery prefork 子进程由 billiard 创建并被设置为 multiprocessing 的当前进程 该进程标记为守护进程(标准库禁止守护进程创建子进程)
+    且认证密钥为 billiard 类型(标准库 spawn 序列化时报错) 创建子进程期间临时替换为标准库可用的配置 结束后恢复
+    """
+    config = multiprocessing.current_process()._config
+    with _child_process_lock:
+        daemon = config.get("daemon")
+        authkey = config.get("authkey")
+        config["daemon"] = False
+        if authkey is not None and not isinstance(authkey, _mproc.AuthenticationString):
+            config["authkey"] = _mproc.AuthenticationString(bytes(authkey))
+        try:
+            yield
+        finally:
+            if daemon is None:
+                config.pop("daemon", None)
+            else:
+                config["daemon"] = daemon
+            if authkey is not None:
+                config["authkey"] = authkey
+
+
+class ProcessPool:
+    """进程内复用的 spawn 进程池
+    子进程使用 spawn 方式启动 不继承父进程中的线程、锁与模型 进程 fork 后重新创建 在 Celery prefork 子进程中同样可用
+    子进程按需在提交任务时创建 提交过程均在 allow_child_processes 中执行
+    进程退出时先关闭进程池(multiprocessing 退出钩子在等待子进程前执行) 父进程被强制杀死时子进程自行退出 不会残留
+    """
+
+    def __init__(self, max_workers: int, initializer: Optional[Callable[[], None]] = None):
+        """构造函数 传递最大子进程数量与子进程初始化函数(需为模块级函数)"""
+        self._max_workers = max_workers
+        self._initializer = initializer
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    def submit(self, fn: Callable, *args: Any) -> Future:
+        with allow_child_processes():
+            return self._get_executor().submit(fn, *args)
+
+    def map(self, fn: Callable, *iterables: Iterable, chunksize: int = 1) -> Iterator:
+        """与 Executor.map 一致 任务在调用时全部提交 返回按顺序产出结果的迭代器"""
+        with allow_child_processes():
+            return self._get_executor().map(fn, *iterables, chunksize=chunksize)
+
+    def reset(self) -> None:
+        """丢弃进程池(如子进程异常退出后进程池不可再用) 下次提交时重新创建"""
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(os.getpid(), self._initializer),
+                )
+                self._pid = os.getpid()
+                # Celery prefork 子进程退出时由 multiprocessing 等待全部子进程结束 需先关闭进程池 否则一直等待
+                _mputil.Finalize(self, _shutdown_executor, args=(self._executor,), exitpriority=_SHUTDOWN_EXIT_PRIORITY)
+            return self._executor
+
+
+def _shutdown_executor(executor: ProcessPoolExecutor) -> None:
+    executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,14 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   __init__.py
+@Time   :   2026/10/19 09:20
+@Author :   s.qiu@foxmail.com
+"""
+from .cross_encoder_scorer import CrossEncoderScorer, decode_pair, encode_pair
+
+__all__ = [
+    "CrossEncoderScorer",
+    "decode_pair",
+    "encode_pair",
+]
@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   cross_encoder_scorer
+@Time   :   2026/10/19 09:20
+@Author :   s.qiu@foxmail.com
+"""
+import json
+
+from langchain_core.embeddings import Embeddings
+
+
+def encode_pair(query: str, text: str) -> str:
+    """批量执行器以字符串为单位组批 将 (query, 候选文本) 编码为单个字符串"""
+    return json.dumps([query, text], ensure_ascii=False)
+
+
+def decode_pair(pair: str) -> tuple[str, str]:
+    """解码 (query, 候选文本)"""
+    query, text = json.loads(pair)
+    return query, text
+
+
+class CrossEncoderScorer(Embeddings):
+    """交叉编码器打分适配器
+    以 Embeddings 接口接入批量嵌入执行器 复用其按token预算组批、单线程推理的机制
+    每个输入为编码后的 (query, 候选文本) 对 输出为仅包含相关性得分的单元素向量
+    """
+
+    def __init__(self, cross_encoder):
+        """构造函数 传递 sentence-transformers CrossEncoder 实例"""
+        self._cross_encoder = cross_encoder
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        scores = self._cross_encoder.predict([decode_pair(text) for text in texts], show_progress_bar=False)
+        return [[float(score)] for score in scores]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
@@ -7,6 +7,8 @@
 """
 
 from .full_text_retriever import FullTextRetriever
+from .hybrid_retriever import HybridRetriever
+from .native_hybrid_retriever import NativeHybridRetriever
 from .semantic_retriever import SemanticRetriever
 
-__all__ = ["FullTextRetriever", "SemanticRetriever"]
+__all__ = ["FullTextRetriever", "HybridRetriever", "NativeHybridRetriever", "SemanticRetriever"]
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   cache_benchmark
+@Time   :   2026/10/18 22:40
+@Author :   s.qiu@foxmail.com
+"""
+import time
+from uuid import UUID
+
+import numpy as np
+
+
+def _percentiles(latencies: list[float]) -> dict:
+    """延迟统计(毫秒)"""
+    return {
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p99_ms": float(np.percentile(latencies, 99) * 1000),
+        "avg_ms": float(np.mean(latencies) * 1000),
+    }
+
+
+def benchmark_retrieval_cache(
+        retrieval_service,
+        dataset_ids: list[UUID],
+        queries: list[str],
+        account_id: UUID,
+        rounds: int = 5,
+        **search_kwargs,
+) -> dict:
+    """对比同一组query在不使用缓存与命中缓存时的检索延迟"""
+
+    def run(use_cache: bool) -> list[float]:
+        latencies = []
+        for _ in range(rounds):
+            for query in queries:
+                start_at = time.perf_counter()
+                retrieval_service.search_in_datasets(
+                    dataset_ids=dataset_ids, query=query, account_id=account_id, use_cache=use_cache, **search_kwargs,
+                )
+                latencies.append(time.perf_counter() - start_at)
+        return latencies
+
+    uncached = _percentiles(run(use_cache=False))
+
+    # 预热缓存 每个query先执行一次
+    for query in queries:
+        retrieval_service.search_in_datasets(
+            dataset_ids=dataset_ids, query=query, account_id=account_id, use_cache=True, **search_kwargs,
+        )
+    cached = _percentiles(run(use_cache=True))
+
+    return {
+        "uncached": uncached,
+        "cached": cached,
+        "p50_speedup": uncached["p50_ms"] / cached["p50_ms"] if cached["p50_ms"] else 0,
+        "cache_metrics": retrieval_service.retrieval_cache_service.metrics(),
+    }
+
+
+if __name__ == "__main__":
+    # python -m internal.core.retrievers.cache_benchmark <account_id> <dataset_id> [strategy] <query> [query ...]
+    import json
+    import sys
+
+    from app.http.app import app
+    from app.http.module import injector
+    from internal.service import RetrievalService
+
+    account, dataset, *rest = sys.argv[1:]
+    strategy = "semantic"
+    if rest and rest[0] in ("semantic", "full_text", "hybrid", "native_hybrid"):
+        strategy, rest = rest[0], rest[1:]
+
+    with app.app_context():
+        result = benchmark_retrieval_cache(
+            injector.get(RetrievalService),
+            dataset_ids=[UUID(dataset)],
+            queries=rest or ["LLMOps"],
+            account_id=UUID(account),
+            retrieval_strategy=strategy,
+        )
+    print(json.dumps(result, ensure_ascii=False, indent=2))
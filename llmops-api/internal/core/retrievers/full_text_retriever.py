@@ -5,15 +5,16 @@
 @Time   :   2026/1/19 10:35
 @Author :   s.qiu@foxmail.com
 """
-from typing import List, Counter
+from typing import List
 from uuid import UUID
 
 from langchain_core.callbacks import CallbackManagerForRetrieverRun
 from langchain_core.documents import Document as LCDocument
 from langchain_core.retrievers import BaseRetriever
 from pydantic import Field
+from sqlalchemy import func, desc
 
-from internal.model import KeywordTable, Segment
+from internal.model import KeywordIndex, Segment
 from internal.service import JiebaService
 from pkg.sqlalchemy import SQLAlchemy
 
@@ -33,25 +34,18 @@ class FullTextRetriever(BaseRetriever):
         # query 执行关键词检索获取 langchain 文档
         keywords = self.jieba_services.extract_keywords(query, 10)
 
-        # 查找知识库关键词表
-        keyword_tables = [
-            keyword_table for keyword_table, in
-            self.db.session.query(KeywordTable).with_entities(KeywordTable.keyword_table).filter(
-                KeywordTable.dataset_id.in_(self.dataset_ids)
-            ).all()
-        ]
-
-        all_ids = []
-        for keyword_table in keyword_tables:
-            for keyword, segment_id in keyword_table.items():
-                if keyword in keywords:
-                    all_ids.extend(segment_id)
-
-        id_counter = Counter(all_ids)
-
-        # 获取频率最高的 K 条数据
+        # 仅读取 query 关键词对应的倒排记录 在数据库中完成命中计数并获取频率最高的 K 条数据
         k = self.search_kwargs.get("k", 4)
-        top_k_ids = id_counter.most_common(k)
+        top_k_ids = []
+        if keywords:
+            hit_count = func.count(KeywordIndex.id).label("hit_count")
+            top_k_ids = [
+                (str(segment_id), freq) for segment_id, freq in
+                self.db.session.query(KeywordIndex.segment_id, hit_count).filter(
+                    KeywordIndex.dataset_id.in_(self.dataset_ids),
+                    KeywordIndex.keyword.in_(keywords),
+                ).group_by(KeywordIndex.segment_id).order_by(desc(hit_count), KeywordIndex.segment_id).limit(k).all()
+            ]
 
         # 检索数据库获取片段列表
         segments = self.db.session.query(Segment).filter(Segment.id.in_([id for id, _ in top_k_ids])).all()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   hybrid_retriever
+@Time   :   2026/10/18 18:30
+@Author :   s.qiu@foxmail.com
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Optional
+
+from flask import Flask
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document as LCDocument
+from langchain_core.retrievers import BaseRetriever
+from pydantic import Field, PrivateAttr
+
+
+class HybridRetriever(BaseRetriever):
+    """混合检索器
+    并发执行多个检索器(每个分支在独立线程及应用上下文中运行) 通过加权倒数排名融合(RRF)合并结果
+    单个分支超时或异常时仅丢弃该分支 退化为其余分支的检索结果 并通过 degraded 标记本次检索结果不完整
+    """
+    flask_app: Flask
+    retrievers: list[BaseRetriever]
+    weights: list[float] = Field(default_factory=list)
+    # RRF 常数 降低排名靠前文档之间的得分差距
+    c: int = 60
+    # 单个分支的超时时间(秒)
+    timeout: float = 3
+    # 相同文档的去重键
+    id_key: str = "segment_id"
+    # 最近一次检索是否有分支被丢弃 检索器按次创建 不在并发检索间共享
+    _degraded: bool = PrivateAttr(default=False)
+
+    @property
+    def degraded(self) -> bool:
+        return self._degraded
+
+    def _get_relevant_documents(
+            self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> list[LCDocument]:
+        """query 并发执行各分支检索并融合结果"""
+        results = self._invoke_retrievers(query, run_manager)
+        self._degraded = any(result is None for result in results)
+        return self.reciprocal_rank_fusion(results)
+
+    def _invoke_retrievers(
+            self, query: str, run_manager: CallbackManagerForRetrieverRun
+    ) -> list[Optional[list[LCDocument]]]:
+        """并发执行各分支检索 超时或异常的分支结果为 None"""
+        executor = ThreadPoolExecutor(max_workers=len(self.retrievers), thread_name_prefix="hybrid-retriever")
+        try:
+            futures = [
+                executor.submit(self._invoke_retriever, retriever, query, run_manager.get_child(tag=f"retriever_{i + 1}"))
+                for i, retriever in enumerate(self.retrievers)
+            ]
+
+            # 所有分支共享同一个截止时间 慢分支不会拖慢整体检索
+            deadline = time.monotonic() + self.timeout
+            results, errors = [], []
+            for retriever, future in zip(self.retrievers, futures):
+                try:
+                    results.append(future.result(timeout=max(deadline - time.monotonic(), 0)))
+                except FutureTimeoutError:
+                    future.cancel()
+                    logging.warning(f"混合检索分支超时，已降级忽略该分支: {type(retriever).__name__}")
+                    results.append(None)
+                except Exception as e:
+                    logging.exception(f"混合检索分支执行失败，已降级忽略该分支: {type(retriever).__name__}，错误信息：{str(e)}")
+                    results.append(None)
+                    errors.append(e)
+        finally:
+            # 不等待超时分支结束 其线程执行完毕后自行退出
+            executor.shutdown(wait=False)
+
+        # 所有分支均失败时向上抛出异常
+        if errors and all(result is None for result in results):
+            raise errors[0]
+        return results
+
+    def _invoke_retriever(self, retriever: BaseRetriever, query: str, callbacks) -> list[LCDocument]:
+        """在独立的应用上下文中执行单个分支检索 确保数据库会话线程隔离"""
+        with self.flask_app.app_context():
+            return retriever.invoke(query, config={"callbacks": callbacks})
+
+    def reciprocal_rank_fusion(self, results: list[Optional[list[LCDocument]]]) -> list[LCDocument]:
+        """按各分支权重执行RRF融合"""
+        weights = self.weights or [1 / len(self.retrievers)] * len(self.retrievers)
+        return reciprocal_rank_fusion(results, weights, c=self.c, id_key=self.id_key)
+
+
+def reciprocal_rank_fusion(
+        results: list[Optional[list[LCDocument]]],
+        weights: Optional[list[float]] = None,
+        c: int = 60,
+        id_key: str = "segment_id",
+) -> list[LCDocument]:
+    """加权RRF融合 仅依赖各列表内的排名 适用于得分不可直接比较的多路结果
+    同一文档保留最先出现列表的元数据与得分 融合得分记录在 rrf_score 未传递 weights 时各列表权重相同
+    """
+    weights = weights or [1] * len(results)
+
+    rrf_scores: dict[str, float] = {}
+    documents: dict[str, LCDocument] = {}
+    for documents_of_branch, weight in zip(results, weights):
+        if not documents_of_branch:
+            continue
+        for rank, document in enumerate(documents_of_branch, start=1):
+            key = document.metadata.get(id_key) or document.page_content
+            rrf_scores[key] = rrf_scores.get(key, 0) + weight / (rank + c)
+            documents.setdefault(key, document)
+
+    sorted_keys = sorted(rrf_scores, key=lambda key: rrf_scores[key], reverse=True)
+    for key in sorted_keys:
+        documents[key].metadata["rrf_score"] = rrf_scores[key]
+    return [documents[key] for key in sorted_keys]
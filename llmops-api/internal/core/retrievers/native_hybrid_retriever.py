@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   native_hybrid_retriever
+@Time   :   2026/10/18 20:10
+@Author :   s.qiu@foxmail.com
+"""
+import logging
+from typing import Optional
+from uuid import UUID
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document as LCDocument
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+from pydantic import Field, PrivateAttr
+from weaviate.classes.query import Filter, MetadataQuery
+from weaviate.collections import Collection
+
+from internal.service.enabled_filter_service import EnabledFilterService
+from .hybrid_retriever import reciprocal_rank_fusion
+
+
+class NativeHybridRetriever(BaseRetriever):
+    """Weaviate 原生混合检索器
+    单次请求中由 Weaviate 同时执行 BM25 与向量检索并完成融合 alpha=1 为纯向量检索 alpha=0 为纯关键词检索
+    tenants 不为 None 时逐个知识库租户检索后按各租户内的排名融合(RRF) 单个租户检索异常时跳过该租户 并通过 degraded 标记本次检索结果不完整
+    enabled_filter 不为 None 时超量召回后按 Redis 禁用集合过滤
+    """
+    dataset_ids: list[UUID]
+    collection: Collection
+    embeddings: Embeddings
+    tenants: Optional[list[str]] = None
+    enabled_filter: Optional[EnabledFilterService] = None
+    text_key: str = "text"
+    search_kwargs: dict = Field(default_factory=dict)
+    # 最近一次检索是否有租户被跳过 检索器按次创建 不在并发检索间共享
+    _degraded: bool = PrivateAttr(default=False)
+
+    @property
+    def degraded(self) -> bool:
+        return self._degraded
+
+    def _get_relevant_documents(
+            self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> list[LCDocument]:
+        """query 执行混合检索"""
+        self._degraded = False
+        k = self.search_kwargs.get("k", 4)
+        vector = self.embeddings.embed_query(query)
+
+        if self.enabled_filter is not None:
+            return self.enabled_filter.overfetch(lambda fetch_k: self._search(query, vector, fetch_k, []), k)
+
+        return self._search(query, vector, k, [
+            Filter.by_property("document_enabled").equal(True),
+            Filter.by_property("segment_enabled").equal(True)
+        ])
+
+    def _search(self, query: str, vector: list[float], k: int, filters: list) -> list[LCDocument]:
+        """执行混合检索 按融合得分降序返回前 k 条"""
+        if self.tenants is None:
+            return self._to_documents(self._hybrid_query(self.collection, query, vector, k, Filter.all_of([
+                Filter.by_property("dataset_id").contains_any([str(dataset_id) for dataset_id in self.dataset_ids]),
+                *filters,
+            ])))
+
+        results, errors = [], []
+        for tenant in self.tenants:
+            try:
+                results.append(self._to_documents(self._hybrid_query(
+                    self.collection.with_tenant(tenant), query, vector, k, Filter.all_of(filters) if filters else None,
+                )))
+            except Exception as e:
+                logging.exception(f"混合检索租户执行失败，已降级忽略该租户: {tenant}，错误信息：{str(e)}")
+                errors.append(e)
+        # 所有租户均失败时向上抛出异常
+        if errors and len(errors) == len(self.tenants):
+            raise errors[0]
+        self._degraded = self._degraded or bool(errors)
+
+        # 融合得分按单次请求内的最大/最小得分归一化 不同租户间不可直接比较 按各租户内的排名执行RRF融合
+        return reciprocal_rank_fusion(results)[:k]
+
+    def _to_documents(self, objects: list) -> list[LCDocument]:
+        """融合得分(相对得分融合 范围0-1)写入文档元数据 过滤低于阈值的结果"""
+        score_threshold = self.search_kwargs.get("score_threshold", 0)
+        lc_documents = []
+        for obj in objects:
+            score = obj.metadata.score or 0
+            if score < score_threshold:
+                continue
+            properties = dict(obj.properties)
+            lc_documents.append(LCDocument(
+                page_content=properties.pop(self.text_key, ""),
+                metadata={**properties, "score": score},
+            ))
+
+        return lc_documents
+
+    def _hybrid_query(self, collection: Collection, query: str, vector: list[float], k: int, filters) -> list:
+        """在指定集合(租户)内执行一次混合检索"""
+        response = collection.query.hybrid(
+            query=query,
+            vector=vector,
+            alpha=self.search_kwargs.get("alpha", 0.5),
+            query_properties=[self.text_key],
+            limit=k,
+            filters=filters,
+            return_metadata=MetadataQuery(score=True),
+        )
+        return response.objects
@@ -5,6 +5,7 @@
 @Time   :   2026/1/19 10:08
 @Author :   s.qiu@foxmail.com
 """
+from typing import Optional
 from uuid import UUID
 
 from langchain_core.callbacks import CallbackManagerForRetrieverRun
@@ -14,11 +15,18 @@ from langchain_weaviate import WeaviateVectorStore
 from pydantic import Field
 from weaviate.classes.query import Filter
 
+from internal.service.enabled_filter_service import EnabledFilterService
+
 
 class SemanticRetriever(BaseRetriever):
-    """相似性/向量 检索器"""
+    """相似性/向量 检索器
+    tenants 不为 None 时向量按知识库存储在各自租户中 逐个租户检索后按得分合并 无需按 dataset_id 过滤
+    enabled_filter 不为 None 时启用状态不在向量数据库中过滤 超量召回后按 Redis 禁用集合过滤
+    """
     dataset_ids: list[UUID]
     vector_store: WeaviateVectorStore
+    tenants: Optional[list[str]] = None
+    enabled_filter: Optional[EnabledFilterService] = None
     search_kwargs: dict = Field(default_factory=dict)
 
     def _get_relevant_documents(
@@ -29,18 +37,40 @@ class SemanticRetriever(BaseRetriever):
         # 最大搜索条件 k 默认 4
         k = self.search_kwargs["k"]
 
-        # 执行相似性检索并获取得分
-        search_result = self.vector_store.similarity_search_with_relevance_scores(
-            query,
-            **{
-                "filters": Filter.all_of([
-                    Filter.by_property("dataset_id").contains_any([str(dataset_id) for dataset_id in self.dataset_ids]),
-                    Filter.by_property("document_enabled").equal(True),
-                    Filter.by_property("segment_enabled").equal(True)
-                ]),
-                **self.search_kwargs
-            }
-        )
+        if self.enabled_filter is not None:
+            return self.enabled_filter.overfetch(lambda fetch_k: self._search(query, fetch_k, []), k)
+
+        return self._search(query, k, [
+            Filter.by_property("document_enabled").equal(True),
+            Filter.by_property("segment_enabled").equal(True)
+        ])
+
+    def _search(self, query: str, k: int, filters: list) -> list[LCDocument]:
+        """执行相似性检索并获取得分 按得分降序返回前 k 条"""
+        search_kwargs = {**self.search_kwargs, "k": k}
+        if self.tenants is None:
+            search_result = self.vector_store.similarity_search_with_relevance_scores(
+                query,
+                **{
+                    "filters": Filter.all_of([
+                        Filter.by_property("dataset_id").contains_any([str(dataset_id) for dataset_id in self.dataset_ids]),
+                        *filters,
+                    ]),
+                    **search_kwargs
+                }
+            )
+        else:
+            search_result = []
+            for tenant in self.tenants:
+                search_result.extend(self.vector_store.similarity_search_with_relevance_scores(
+                    query,
+                    **{
+                        "tenant": tenant,
+                        "filters": Filter.all_of(filters) if filters else None,
+                        **search_kwargs
+                    }
+                ))
+            search_result = sorted(search_result, key=lambda item: item[1], reverse=True)[:k]
 
         if search_result is None or len(search_result) == 0:
             return []
@@ -0,0 +1,14 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   __init__.py
+@Time   :   2026/10/20 10:15
+@Author :   s.qiu@foxmail.com
+"""
+from .text_cleaner import EXTRA_TEXT_CLEANER, TextCleaner, get_process_rule_cleaner
+
+__all__ = [
+    "EXTRA_TEXT_CLEANER",
+    "TextCleaner",
+    "get_process_rule_cleaner",
+]
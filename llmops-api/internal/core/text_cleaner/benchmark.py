@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   benchmark
+@Time   :   2026/10/20 10:15
+@Author :   s.qiu@foxmail.com
+"""
+import random
+import re
+import time
+
+from .text_cleaner import EXTRA_TEXT_CLEANER, get_process_rule_cleaner
+
+DEFAULT_PRE_PROCESS_RULES = [
+    {"id": "remove_extra_space", "enabled": True},
+    {"id": "remove_url_and_email", "enabled": True},
+]
+
+
+def _legacy_clean(text: str) -> str:
+    """原实现 每次清洗执行8次未预编译的正则替换"""
+    text = re.sub(r'<\|', '<', text)
+    text = re.sub(r'\|>', '>', text)
+    text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F\xEF\xBF\xBE]', '', text)
+    text = re.sub('\uFFFE', '', text)
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    text = re.sub(r'[\t\f\r\x20\u00a0\u1680\u180e\u2000-\u200a\u202f\u205f\u3000]{2,}', ' ', text)
+    text = re.sub(r'([a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+)', '', text)
+    text = re.sub(r'https?://[^\s]+', '', text)
+    return text
+
+
+def _compiled_clean(text: str) -> str:
+    """编译后的清洗器 基础清洗+处理规则清洗"""
+    text = EXTRA_TEXT_CLEANER.clean(text)
+    return get_process_rule_cleaner("benchmark", DEFAULT_PRE_PROCESS_RULES).clean(text)
+
+
+def generate_text(size_mb: float, seed: int = 0) -> str:
+    """生成模拟解析结果的测试文本 以中英文段落为主 少量夹杂多余空白、URL、邮箱、控制字符"""
+    random.seed(seed)
+    sentences = [
+        "检索增强生成将外部知识库与大语言模型结合，先召回相关片段再生成回答。",
+        "LLMOps platform manages datasets, documents and segments for retrieval. ",
+        "知识库文档经过解析、清洗、分割、向量化后写入向量数据库。",
+        "Each segment is embedded and stored together with its keywords. ",
+    ]
+    noises = [
+        "\n\n\n\n", "    ", "\t\t", "\u3000\u3000", "<|endoftext|>", "\x00\x0c",
+        " 详见 https://example.com/docs?id=1 ", " contact: support@example.com ",
+    ]
+    target_size = int(size_mb * 1024 ** 2)
+    chunks, size = [], 0
+    while size < target_size:
+        # 每段若干句 段落之间以换行分隔 约每段出现一处噪声
+        paragraph = "".join(random.choice(sentences) for _ in range(random.randint(3, 8)))
+        if random.random() < 0.8:
+            position = random.randint(0, len(paragraph))
+            paragraph = paragraph[:position] + random.choice(noises) + paragraph[position:]
+        chunks.append(paragraph + "\n")
+        size += len(paragraph.encode()) + 1
+    return "".join(chunks)
+
+
+def benchmark_text_cleaner(size_mb: float = 4, rounds: int = 5) -> dict:
+    """对比原实现与编译后的清洗器的吞吐(MB/s) 并校验清洗结果一致"""
+    text = generate_text(size_mb)
+    actual_size_mb = len(text.encode()) / 1024 ** 2
+
+    def run(clean) -> float:
+        start_at = time.perf_counter()
+        for _ in range(rounds):
+            clean(text)
+        return actual_size_mb * rounds / (time.perf_counter() - start_at)
+
+    legacy = run(_legacy_clean)
+    compiled = run(_compiled_clean)
+    return {
+        "size_mb": actual_size_mb,
+        "legacy_mb_per_second": legacy,
+        "compiled_mb_per_second": compiled,
+        "speedup": compiled / legacy,
+        "identical": _legacy_clean(text) == _compiled_clean(text),
+    }
+
+
+if __name__ == "__main__":
+    # python -m internal.core.text_cleaner.benchmark [size_mb]
+    import json
+    import sys
+
+    print(json.dumps(benchmark_text_cleaner(float(sys.argv[1]) if len(sys.argv) > 1 else 4), indent=2))
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   text_cleaner
+@Time   :   2026/10/20 10:15
+@Author :   s.qiu@foxmail.com
+"""
+import json
+import re
+from functools import lru_cache
+from typing import Any, Callable, Optional
+from uuid import UUID
+
+# 邮箱 用户名与域名字符集
+EMAIL_LOCAL_CHARS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_.+-")
+EMAIL_DOMAIN_PATTERN = re.compile(r"[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+")
+
+# 解析后需要删除的控制字符、非字符码位
+EXTRA_TEXT_DELETE_CHARS = (
+    "".join(chr(code) for code in range(0x00, 0x09))
+    + "\x0B\x0C"
+    + "".join(chr(code) for code in range(0x0E, 0x20))
+    + "\x7F\xEF\xBF\xBE\uFFFE"
+)
+
+# 多余空白字符集
+SPACE_CHARS = r"[\t\f\r\x20\u00a0\u1680\u180e\u2000-\u200a\u202f\u205f\u3000]"
+
+CleanStep = Callable[[str], str]
+
+
+class TextCleaner:
+    """编译后的文本清洗器
+    清洗规则在构建时编译为有序的清洗步骤 每个步骤均为一次C层面的扫描(str.replace/预编译正则) 文本中不存在规则的触发字符时跳过该步骤
+    """
+
+    def __init__(self, steps: list[CleanStep]):
+        """构造函数 传递有序的清洗步骤"""
+        self._steps = steps
+
+    def clean(self, text: str) -> str:
+        for step in self._steps:
+            text = step(text)
+        return text
+
+
+def replace_literal(old: str, new: str) -> CleanStep:
+    """固定字符串替换"""
+    return lambda text: text.replace(old, new) if old in text else text
+
+
+def replace_pattern(pattern: str, repl: str, trigger: Optional[str] = None) -> CleanStep:
+    """正则替换 文本中不包含 trigger 时不可能匹配 直接跳过"""
+    compiled = re.compile(pattern)
+    if trigger is None:
+        return lambda text: compiled.sub(repl, text)
+    return lambda text: compiled.sub(repl, text) if trigger in text else text
+
+
+def delete_chars(chars: str) -> CleanStep:
+    """删除字符集合中的字符 CPython 中字符类正则删除比 str.translate 更快(非ASCII文本尤其明显)"""
+    compiled = re.compile(f"[{re.escape(chars)}]")
+    return lambda text: compiled.sub("", text)
+
+
+def remove_emails(text: str) -> str:
+    """删除邮箱 结果与正则 [a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\\.[a-zA-Z0-9-.]+ 替换一致
+    每个匹配都对应唯一的 @ 从 @ 出发向前后扩展 避免正则在每个字母数字位置尝试匹配并回溯
+    """
+    at = text.find("@")
+    if at == -1:
+        return text
+
+    pieces = []
+    pos = 0
+    while at != -1:
+        # 向前扩展用户名 不能越过上一个匹配的结尾
+        start = at
+        while start > pos and text[start - 1] in EMAIL_LOCAL_CHARS:
+            start -= 1
+        domain = EMAIL_DOMAIN_PATTERN.match(text, at + 1) if start < at else None
+        if domain is not None:
+            pieces.append(text[pos:start])
+            pos = domain.end()
+        at = text.find("@", max(at + 1, pos))
+
+    pieces.append(text[pos:])
+    return "".join(pieces)
+
+
+# 解析后的基础清洗 替换特殊标记的竖线并删除控制字符
+EXTRA_TEXT_CLEANER = TextCleaner([
+    replace_literal("<|", "<"),
+    replace_literal("|>", ">"),
+    delete_chars(EXTRA_TEXT_DELETE_CHARS),
+])
+
+# 预处理规则id -> 清洗步骤
+PRE_PROCESS_RULE_STEPS: dict[str, list[CleanStep]] = {
+    # 删除多余空格: 3个及以上换行替换为2个 连续空白字符替换为1个空格
+    # 与 \n{3,}、[...]{2,} 等价 展开为固定前缀后正则引擎可快速定位匹配起点 吞吐提升数倍
+    "remove_extra_space": [
+        replace_pattern(r"\n\n\n+", "\n\n", trigger="\n\n\n"),
+        replace_pattern(SPACE_CHARS + SPACE_CHARS + "+", " "),
+    ],
+    # 删除URL链接及邮箱 邮箱删除后残留的URL前缀不再匹配 因此先删除邮箱
+    "remove_url_and_email": [
+        remove_emails,
+        replace_pattern(r"https?://[^\s]+", "", trigger="://"),
+    ],
+}
+
+
+def get_process_rule_cleaner(process_rule_id: UUID, pre_process_rules: list[dict[str, Any]]) -> TextCleaner:
+    """获取处理规则对应的清洗器 按处理规则id缓存 规则内容变化时重新编译"""
+    return _compile_process_rule(str(process_rule_id), json.dumps(pre_process_rules, sort_keys=True))
+
+
+@lru_cache(maxsize=256)
+def _compile_process_rule(process_rule_id: str, pre_process_rules: str) -> TextCleaner:
+    """按规则顺序组合已启用的预处理规则的清洗步骤"""
+    steps = []
+    for pre_process_rule in json.loads(pre_process_rules):
+        if pre_process_rule["enabled"] is True:
+            steps.extend(PRE_PROCESS_RULE_STEPS.get(pre_process_rule["id"], []))
+    return TextCleaner(steps)
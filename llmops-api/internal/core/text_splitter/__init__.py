@@ -0,0 +1,12 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   __init__.py
+@Time   :   2026/10/20 15:40
+@Author :   s.qiu@foxmail.com
+"""
+from .token_text_splitter import TokenRecursiveTextSplitter
+
+__all__ = [
+    "TokenRecursiveTextSplitter",
+]
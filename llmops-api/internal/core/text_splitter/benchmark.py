@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   benchmark
+@Time   :   2026/10/20 15:40
+@Author :   s.qiu@foxmail.com
+"""
+import time
+from functools import lru_cache
+from typing import Optional
+
+import tiktoken
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from internal.core.text_cleaner import EXTRA_TEXT_CLEANER
+from internal.core.text_cleaner.benchmark import generate_text
+from internal.entity.dataset_entity import DEFAULT_PROCESS_RULE
+from .token_text_splitter import TokenRecursiveTextSplitter
+
+
+def benchmark_text_splitter(
+        texts: list[str],
+        encoding: Optional[tiktoken.Encoding] = None,
+        chunk_size: int = DEFAULT_PROCESS_RULE["rule"]["segment"]["chunk_size"],
+        chunk_overlap: int = DEFAULT_PROCESS_RULE["rule"]["segment"]["chunk_overlap"],
+) -> dict:
+    """对比逐段编码计算长度的原分割器与基于token下标的分割器 统计耗时、块数量、与原分割结果一致的块占比、最大块token数"""
+    encoding = encoding or tiktoken.encoding_for_model("gpt-3.5-turbo")
+    kwargs = {
+        "chunk_size": chunk_size,
+        "chunk_overlap": chunk_overlap,
+        "separators": DEFAULT_PROCESS_RULE["rule"]["segment"]["separators"],
+        "is_separator_regex": True,
+    }
+
+    # 原分割器 与索引构建一致 每个文本分割时缓存token数
+    legacy_chunks, legacy_elapsed = [], 0
+    for text in texts:
+        calculate_token_count = lru_cache(maxsize=None)(lambda query: len(encoding.encode(query)))
+        text_splitter = RecursiveCharacterTextSplitter(length_function=calculate_token_count, **kwargs)
+        start_at = time.perf_counter()
+        legacy_chunks.extend(text_splitter.split_text(text))
+        legacy_elapsed += time.perf_counter() - start_at
+
+    # 预先构建token字符数表 排除一次性的初始化耗时
+    text_splitter = TokenRecursiveTextSplitter(encoding, **kwargs)
+    text_splitter.split_text("LLMOps")
+    chunks, elapsed = [], 0
+    for text in texts:
+        start_at = time.perf_counter()
+        chunks.extend(text_splitter.split_text(text))
+        elapsed += time.perf_counter() - start_at
+
+    legacy_chunk_set = set(legacy_chunks)
+    return {
+        "size_mb": sum(len(text.encode()) for text in texts) / 1024 ** 2,
+        "legacy_seconds": legacy_elapsed,
+        "token_seconds": elapsed,
+        "speedup": legacy_elapsed / elapsed if elapsed else 0,
+        "legacy_chunks": len(legacy_chunks),
+        "token_chunks": len(chunks),
+        "identical_ratio": sum(1 for chunk in chunks if chunk in legacy_chunk_set) / len(chunks) if chunks else 1,
+        "max_chunk_tokens": max((len(encoding.encode(chunk)) for chunk in chunks), default=0),
+    }
+
+
+if __name__ == "__main__":
+    # python -m internal.core.text_splitter.benchmark [文本文件 ...] 未传递文件时使用生成的4MB文本
+    import json
+    import sys
+
+    if len(sys.argv) > 1:
+        texts = []
+        for file_path in sys.argv[1:]:
+            with open(file_path, encoding="utf-8") as file:
+                texts.append(file.read())
+    else:
+        texts = [EXTRA_TEXT_CLEANER.clean(generate_text(4))]
+    print(json.dumps(benchmark_text_splitter(texts), ensure_ascii=False, indent=2))
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   token_text_splitter
+@Time   :   2026/10/20 15:40
+@Author :   s.qiu@foxmail.com
+"""
+import re
+from bisect import bisect_left
+from collections import deque
+from functools import lru_cache
+from itertools import accumulate
+from typing import Any, Callable, Optional
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from tiktoken import Encoding
+
+# UTF-8 后续字节 不单独对应字符
+_UTF8_CONTINUATION_BYTES = bytes(range(0x80, 0xC0))
+
+# 片段在原文中的字符区间 [start, end)
+Span = tuple[int, int]
+
+
+@lru_cache(maxsize=None)
+def get_token_char_lengths(encoding: Encoding) -> list[int]:
+    """每个token id对应的字符数(token字节中非UTF-8后续字节的数量) 多字节字符被拆分到多个token时计入首字节所在的token"""
+    char_lengths = []
+    for token in range(encoding.n_vocab):
+        try:
+            token_bytes = encoding.decode_single_token_bytes(token)
+        except KeyError:
+            token_bytes = b""
+        char_lengths.append(len(token_bytes.translate(None, _UTF8_CONTINUATION_BYTES)))
+    return char_lengths
+
+
+class TokenRecursiveTextSplitter(RecursiveCharacterTextSplitter):
+    """基于token下标的递归文本分割器
+    与 RecursiveCharacterTextSplitter 的分隔符选择、递归拆分、合并与重叠逻辑一致 区别在于长度计算:
+    整个文本只编码一次并记录每个token的起始字符位置 片段长度为起始位置落在片段区间内的token数 无需反复编码候选片段与合并窗口
+    片段边界处的token与单独编码片段时可能相差1-2个 分割结果与逐段编码在容差内一致
+    """
+
+    def __init__(self, encoding: Encoding, **kwargs: Any):
+        """构造函数 传递tiktoken编码器 其余参数与 RecursiveCharacterTextSplitter 一致"""
+        super().__init__(**kwargs)
+        self._encoding = encoding
+        self._compiled_separators: dict[str, re.Pattern] = {}
+
+    def split_text(self, text: str) -> list[str]:
+        # 不保留分隔符时合并需重新插入分隔符 片段不再连续 使用逐段编码的原实现
+        if not self._keep_separator:
+            return super().split_text(text)
+
+        offsets = self._get_token_offsets(text)
+
+        def length(span: Span) -> int:
+            return bisect_left(offsets, span[1]) - bisect_left(offsets, span[0])
+
+        return self._split_span(text, (0, len(text)), self._separators, length)
+
+    def _get_token_offsets(self, text: str) -> list[int]:
+        """编码整个文本 返回每个token的起始字符位置(非递减) 通过token字符数表累加 无需逐个解码token"""
+        char_lengths = get_token_char_lengths(self._encoding)
+        tokens = self._encoding.encode(text, disallowed_special=())
+        return list(accumulate(map(char_lengths.__getitem__, tokens), initial=0))[:-1]
+
+    def _split_span(
+            self,
+            text: str,
+            span: Span,
+            separators: list[str],
+            length: Callable[[Span], int],
+    ) -> list[str]:
+        """递归拆分区间 对应 RecursiveCharacterTextSplitter._split_text"""
+        final_chunks = []
+
+        # 选择区间内出现的第一个分隔符
+        separator = separators[-1]
+        new_separators = []
+        for i, s_ in enumerate(separators):
+            if not s_:
+                separator = s_
+                break
+            if self._get_separator_pattern(s_).search(text, *span):
+                separator = s_
+                new_separators = separators[i + 1:]
+                break
+
+        # 长度小于 chunk_size 的片段合并 其余片段使用后续分隔符继续拆分
+        good_splits = []
+        for split in self._split_span_by_separator(text, span, separator):
+            if length(split) < self._chunk_size:
+                good_splits.append(split)
+            else:
+                if good_splits:
+                    final_chunks.extend(self._merge_spans(text, good_splits, length))
+                    good_splits = []
+                if not new_separators:
+                    final_chunks.append(text[split[0]:split[1]])
+                else:
+                    final_chunks.extend(self._split_span(text, split, new_separators, length))
+        if good_splits:
+            final_chunks.extend(self._merge_spans(text, good_splits, length))
+        return final_chunks
+
+    def _split_span_by_separator(self, text: str, span: Span, separator: str) -> list[Span]:
+        """按分隔符拆分区间 分隔符保留在后一个片段开头(start)或前一个片段结尾(end) 忽略空片段"""
+        start, end = span
+        if not separator:
+            return [(i, i + 1) for i in range(start, end)]
+
+        matches = self._get_separator_pattern(separator).finditer(text, start, end)
+        if self._keep_separator == "end":
+            cuts = [match.end() for match in matches]
+        else:
+            cuts = [match.start() for match in matches]
+        cuts = [start, *cuts, end]
+        return [(cuts[i], cuts[i + 1]) for i in range(len(cuts) - 1) if cuts[i] < cuts[i + 1]]
+
+    def _merge_spans(self, text: str, splits: list[Span], length: Callable[[Span], int]) -> list[str]:
+        """将相邻片段合并为不超过 chunk_size 的块 相邻块保留不超过 chunk_overlap 的重叠 对应 TextSplitter._merge_splits
+        保留分隔符时合并使用的分隔符为空字符串 同一次合并的片段在原文中连续 合并结果即原文切片
+        """
+        docs = []
+        current_doc: deque[tuple[Span, int]] = deque()
+        total = 0
+        for split in splits:
+            len_ = length(split)
+            if total + len_ > self._chunk_size and current_doc:
+                doc = self._join_span(text, current_doc[0][0][0], current_doc[-1][0][1])
+                if doc is not None:
+                    docs.append(doc)
+                while total > self._chunk_overlap or (total + len_ > self._chunk_size and total > 0):
+                    total -= current_doc.popleft()[1]
+            current_doc.append((split, len_))
+            total += len_
+
+        if current_doc:
+            doc = self._join_span(text, current_doc[0][0][0], current_doc[-1][0][1])
+            if doc is not None:
+                docs.append(doc)
+        return docs
+
+    def _join_span(self, text: str, start: int, end: int) -> Optional[str]:
+        doc = text[start:end]
+        if self._strip_whitespace:
+            doc = doc.strip()
+        return doc or None
+
+    def _get_separator_pattern(self, separator: str) -> re.Pattern:
+        pattern = self._compiled_separators.get(separator)
+        if pattern is None:
+            pattern = re.compile(separator if self._is_separator_regex else re.escape(separator))
+            self._compiled_separators[separator] = pattern
+        return pattern
@@ -11,7 +11,7 @@ from pydantic import BaseModel, Field, field_validator
 
 from internal.core.workflow.entities.node_entity import BaseNodeData
 from internal.core.workflow.entities.variable_entity import VariableEntity, VariableValueType, VariableType
-from internal.entity.dataset_entity import RetrievalStrategy
+from internal.entity.dataset_entity import RetrievalStrategy, DEFAULT_HYBRID_ALPHA
 from internal.exception import FailException
 
 
@@ -20,6 +20,7 @@ class RetrievalConfig(BaseModel):
     retrieval_strategy: RetrievalStrategy = RetrievalStrategy.SEMANTIC  # 检索策略
     k: int = 4  # 最大召回数量
     score: float = 0  # 得分阈值
+    alpha: float = DEFAULT_HYBRID_ALPHA  # 原生混合检索的向量检索权重
 
 
 class DatasetRetrievalNodeData(BaseNodeData):
@@ -42,6 +42,11 @@ DEFAULT_APP_CONFIG = {
         "retrieval_strategy": "semantic",
         "k": 10,
         "score": 0.5,
+        "rerank": {
+            "enable": False,
+            "candidates": 50,
+            "budget_ms": 300,
+        },
     },
     "long_term_memory": {
         "enable": False,
@@ -16,3 +16,27 @@ LOCK_KEYWORD_TABLE_UPDATE_KEYWORD_TABLE = "lock:keyword_table:update:keyword_tab
 
 # 文档片段启用状态变更 缓存锁
 LOCK_SEGMENT_UPDATE_ENABLED = "lock:segment:update:enabled_{segment_id}"
+
+# 检索记录刷写 缓存锁
+LOCK_RETRIEVAL_FLUSH_RECORDS = "lock:retrieval:flush:records"
+
+# 检索记录写缓冲 知识库查询记录(列表) 片段命中次数增量(哈希)
+RETRIEVAL_QUERY_BUFFER = "retrieval:buffer:dataset_query"
+RETRIEVAL_HIT_COUNT_BUFFER = "retrieval:buffer:hit_count"
+
+# 检索结果缓存 知识库版本号 缓存键 命中统计
+RETRIEVAL_DATASET_VERSION = "retrieval:dataset_version:{dataset_id}"
+RETRIEVAL_CACHE_KEY = "retrieval:cache:{hash}"
+RETRIEVAL_CACHE_METRICS = "retrieval:cache:metrics"
+
+# 启用状态过滤 知识库下禁用的文档id集合、片段id集合、已加载标记 与 重建/变更锁
+ENABLED_FILTER_DISABLED_DOCUMENTS = "enabled_filter:{dataset_id}:disabled_documents"
+ENABLED_FILTER_DISABLED_SEGMENTS = "enabled_filter:{dataset_id}:disabled_segments"
+ENABLED_FILTER_LOADED = "enabled_filter:{dataset_id}:loaded"
+LOCK_ENABLED_FILTER_UPDATE = "lock:enabled_filter:update_{dataset_id}"
+
+# 智能体事件总线 任务事件流 任务元数据(断线续读时填充事件) 停止信号频道 读取线程唤醒流
+AGENT_TASK_EVENTS = "agent_task_events:{task_id}"
+AGENT_TASK_META = "agent_task_meta:{task_id}"
+AGENT_TASK_STOP_CHANNEL = "agent_task_stop"
+AGENT_EVENT_READER_WAKEUP = "agent_event_reader_wakeup:{reader_id}"
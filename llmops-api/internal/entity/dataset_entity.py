@@ -40,6 +40,11 @@ class RetrievalStrategy(str, Enum):
     FULL_TEXT = "full_text"
     SEMANTIC = "semantic"
     HYBRID = "hybrid"
+    NATIVE_HYBRID = "native_hybrid"
+
+
+# 原生混合检索默认的向量检索权重 1为纯向量检索 0为纯关键词检索
+DEFAULT_HYBRID_ALPHA = 0.5
 
 
 class RetrievalSource(str, Enum):
@@ -15,6 +15,7 @@ from .builtin_app_handler import BuiltinAppHandler
 from .builtin_tool_handler import BuiltinToolHandler
 from .dataset_handler import DatasetHandler
 from .document_handler import DocumentHandler
+from .health_handler import HealthHandler
 from .oauth_handler import OAuthHandler
 from .openapi_handler import OpenApiHandler
 from .segment_handler import SegmentHandler
@@ -37,4 +38,5 @@ __all__ = [
     "ApiKeyHandler",
     "OpenApiHandler",
     "WorkflowHandler",
+    "HealthHandler",
 ]
@@ -292,6 +292,14 @@ class AppHandler:
         self.app_service.stop_debug_chat(app_id, task_id, current_user)
         return success_message("应用会话停止调试成功")
 
+    @login_required
+    def resume_debug_chat(self, app_id: UUID, task_id: UUID):
+        """断线后继续读取应用调试会话事件 从请求头 Last-Event-ID 之后开始"""
+        response = self.app_service.resume_debug_chat(
+            app_id, task_id, request.headers.get("Last-Event-ID"), current_user,
+        )
+        return compact_generate_response(response)
+
     @login_required
     def debug_chat(self, app_id: UUID) -> Generator:
         """应用调试对话"""
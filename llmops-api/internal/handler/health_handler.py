@@ -0,0 +1,28 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   health_handler
+@Time   :   2026/10/18 14:20
+@Author :   s.qiu@foxmail.com
+"""
+from dataclasses import dataclass
+
+from injector import inject
+
+from internal.service import WarmupService
+from pkg.response import success_json, fail_json
+
+
+@inject
+@dataclass
+class HealthHandler:
+    """健康检查处理器"""
+    warmup_service: WarmupService
+
+    def ready(self):
+        """就绪检查 进程预热完成前返回503 供负载均衡/编排系统判断是否可以接收流量"""
+        status = self.warmup_service.status
+        if not status["ready"]:
+            resp, _ = fail_json(status)
+            return resp, 503
+        return success_json(status)
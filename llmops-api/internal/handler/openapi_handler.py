@@ -7,7 +7,9 @@
 """
 
 from dataclasses import dataclass
+from uuid import UUID
 
+from flask import request
 from flask_login import login_required, current_user
 from injector import inject
 
@@ -32,3 +34,9 @@ class OpenApiHandler:
 
         resp = self.openapi_service.chat(req, current_user)
         return compact_generate_response(resp)
+
+    @login_required
+    def resume_chat(self, task_id: UUID):
+        """开放API 断线后继续读取流式对话事件 从请求头 Last-Event-ID 之后开始"""
+        resp = self.openapi_service.resume_chat(task_id, request.headers.get("Last-Event-ID"), current_user)
+        return compact_generate_response(resp)
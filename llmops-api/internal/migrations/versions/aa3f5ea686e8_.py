@@ -0,0 +1,67 @@
+"""keyword inverted index
+
+Revision ID: aa3f5ea686e8
+Revises: eacc38528761
+Create Date: 2026-10-17 21:02:14.385102
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'aa3f5ea686e8'
+down_revision = 'eacc38528761'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('keyword_index',
+    sa.Column('id', sa.UUID(), server_default=sa.text('uuid_generate_v4()'), nullable=False),
+    sa.Column('dataset_id', sa.UUID(), nullable=False),
+    sa.Column('keyword', sa.String(length=255), server_default=sa.text("''::character varying"), nullable=False),
+    sa.Column('segment_id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP(0)'), nullable=False),
+    sa.PrimaryKeyConstraint('id', name='pk_keyword_index_id'),
+    sa.UniqueConstraint('dataset_id', 'keyword', 'segment_id', name='uk_keyword_index_dataset_id_keyword_segment_id')
+    )
+    op.create_index('idx_keyword_index_segment_id', 'keyword_index', ['segment_id'], unique=False)
+
+    # 将原 keyword_table 中每个知识库的 JSONB 关键词表展开为倒排记录
+    op.execute("""
+        INSERT INTO keyword_index (dataset_id, keyword, segment_id)
+        SELECT kt.dataset_id, left(kv.key, 255), (sid.value)::uuid
+        FROM keyword_table AS kt
+        CROSS JOIN LATERAL jsonb_each(kt.keyword_table) AS kv
+        CROSS JOIN LATERAL jsonb_array_elements_text(kv.value) AS sid
+        ON CONFLICT (dataset_id, keyword, segment_id) DO NOTHING
+    """)
+
+    op.drop_table('keyword_table')
+
+
+def downgrade():
+    op.create_table('keyword_table',
+    sa.Column('id', sa.UUID(), server_default=sa.text('uuid_generate_v4()'), nullable=False),
+    sa.Column('dataset_id', sa.UUID(), nullable=False),
+    sa.Column('keyword_table', postgresql.JSONB(astext_type=sa.Text()), server_default=sa.text("'{}'::jsonb"), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP(0)'), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP(0)'), nullable=False),
+    sa.PrimaryKeyConstraint('id', name='pk_keyword_table_id')
+    )
+
+    # 将倒排记录重新聚合为每个知识库一条的 JSONB 关键词表
+    op.execute("""
+        INSERT INTO keyword_table (dataset_id, keyword_table)
+        SELECT postings.dataset_id, jsonb_object_agg(postings.keyword, postings.segment_ids)
+        FROM (
+            SELECT dataset_id, keyword, jsonb_agg(segment_id::text) AS segment_ids
+            FROM keyword_index
+            GROUP BY dataset_id, keyword
+        ) AS postings
+        GROUP BY postings.dataset_id
+    """)
+
+    op.drop_index('idx_keyword_index_segment_id', table_name='keyword_index')
+    op.drop_table('keyword_index')
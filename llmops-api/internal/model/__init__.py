@@ -10,7 +10,7 @@ from .api_key import ApiKey
 from .api_tool import ApiTool, ApiToolProvider
 from .app import App, AppConfig, AppConfigVersion, AppDatasetJoin
 from .conversation import Conversation, Message, MessageAgentThought
-from .dataset import Dataset, Document, Segment, KeywordTable, DatasetQuery, ProcessRule
+from .dataset import Dataset, Document, Segment, KeywordIndex, DatasetQuery, ProcessRule
 from .end_user import EndUser
 from .upload_file import UploadFile
 from .workflow import Workflow, WorkflowResult
@@ -19,7 +19,7 @@ __all__ = [
     "Account", "AccountOAuth",
     "App", "AppConfig", "AppConfigVersion", "AppDatasetJoin",
     "ApiTool", "ApiToolProvider",
-    "Dataset", "Document", "Segment", "KeywordTable", "DatasetQuery", "ProcessRule",
+    "Dataset", "Document", "Segment", "KeywordIndex", "DatasetQuery", "ProcessRule",
     "UploadFile",
     "Conversation", "Message", "MessageAgentThought",
     "ApiKey", "EndUser",
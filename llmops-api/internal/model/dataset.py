@@ -14,6 +14,8 @@ from sqlalchemy import (
     Boolean,
     DateTime,
     PrimaryKeyConstraint,
+    UniqueConstraint,
+    Index,
     text,
     func
 )
@@ -118,6 +120,9 @@ class Document(db.Model):
     position = Column(Integer, nullable=False, server_default=text("1"))
     character_count = Column(Integer, nullable=False, server_default=text("0"))
     token_count = Column(Integer, nullable=False, server_default=text("0"))
+    reused_segment_count = Column(Integer, nullable=False, server_default=text("0"))
+    added_segment_count = Column(Integer, nullable=False, server_default=text("0"))
+    removed_segment_count = Column(Integer, nullable=False, server_default=text("0"))
     processing_started_at = Column(DateTime, nullable=True)
     parsing_completed_at = Column(DateTime, nullable=True)
     splitting_completed_at = Column(DateTime, nullable=True)
@@ -194,22 +199,20 @@ class Segment(db.Model):
         return db.session.query(Document).get(self.document_id)
 
 
-class KeywordTable(db.Model):
-    """关键词表模型"""
-    __tablename__ = "keyword_table"
+class KeywordIndex(db.Model):
+    """关键词倒排索引表模型 每行为一条 关键词->片段 的倒排记录"""
+    __tablename__ = "keyword_index"
     __table_args__ = (
-        PrimaryKeyConstraint("id", name="pk_keyword_table_id"),
+        PrimaryKeyConstraint("id", name="pk_keyword_index_id"),
+        # 唯一约束的前缀同时作为 (dataset_id, keyword) 检索索引使用
+        UniqueConstraint("dataset_id", "keyword", "segment_id", name="uk_keyword_index_dataset_id_keyword_segment_id"),
+        Index("idx_keyword_index_segment_id", "segment_id"),
     )
 
     id = Column(UUID, nullable=False, server_default=text("uuid_generate_v4()"))
     dataset_id = Column(UUID, nullable=False)
-    keyword_table = Column(JSONB, nullable=False, server_default=text("'{}'::jsonb"))
-    updated_at = Column(
-        DateTime,
-        nullable=False,
-        server_default=text('CURRENT_TIMESTAMP(0)'),
-        server_onupdate=text('CURRENT_TIMESTAMP(0)'),
-    )
+    keyword = Column(String(255), nullable=False, server_default=text("''::character varying"))
+    segment_id = Column(UUID, nullable=False)
     created_at = Column(DateTime, nullable=False, server_default=text('CURRENT_TIMESTAMP(0)'))
 
 
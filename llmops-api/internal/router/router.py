@@ -13,7 +13,7 @@ from injector import inject
 from internal.handler import (
     AppHandler, BuiltinAppHandler, BuiltinToolHandler, ApiToolHandler, UploadFileHandler,
     DatasetHandler, DocumentHandler, SegmentHandler, OAuthHandler, AuthHandler, AccountHandler, AIHandler,
-    ApiKeyHandler, OpenApiHandler, WorkflowHandler)
+    ApiKeyHandler, OpenApiHandler, WorkflowHandler, HealthHandler)
 
 
 @inject
@@ -35,6 +35,7 @@ class Router:
     api_key_handler: ApiKeyHandler
     openapi_handler: OpenApiHandler
     workflow_handler: WorkflowHandler
+    health_handler: HealthHandler
 
     def register_router(self, app: Flask):
         """注册路由"""
@@ -45,6 +46,9 @@ class Router:
 
         # 对话接口测试
         bp.add_url_rule("/ping", view_func=self.app_handler.ping)
+
+        # 就绪检查
+        bp.add_url_rule("/ready", view_func=self.health_handler.ready)
         bp.add_url_rule("/apps/<uuid:app_id>/debug", methods=["POST"], view_func=self.app_handler.debug)
 
         # 授权认证
@@ -92,6 +96,8 @@ class Router:
         bp.add_url_rule("/apps/<uuid:app_id>/conversations", methods=["POST"], view_func=self.app_handler.debug_chat)
         bp.add_url_rule("/apps/<uuid:app_id>/conversations/tasks/<uuid:task_id>/stop", methods=["POST"],
                         view_func=self.app_handler.stop_debug_chat)
+        bp.add_url_rule("/apps/<uuid:app_id>/conversations/tasks/<uuid:task_id>/events",
+                        view_func=self.app_handler.resume_debug_chat)
 
         # 内置应用模块
         bp.add_url_rule("/builtin-apps/categories", view_func=self.builtin_app_handler.get_builtin_app_categories)
@@ -183,6 +189,7 @@ class Router:
         bp.add_url_rule("/openapi/api-keys", view_func=self.api_key_handler.get_api_keys_with_page)
         # 开放API会话接口
         openapi_bp.add_url_rule("/openapi/chat", methods=["POST"], view_func=self.openapi_handler.chat)
+        openapi_bp.add_url_rule("/openapi/chat/tasks/<uuid:task_id>/events", view_func=self.openapi_handler.resume_chat)
 
         # 工作流模块
         bp.add_url_rule("/workflows", methods=["POST"], view_func=self.workflow_handler.create_workflow)
@@ -0,0 +1,18 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   retrieval_schedule
+@Time   :   2026/10/18 21:30
+@Author :   s.qiu@foxmail.com
+"""
+from celery import shared_task
+
+
+@shared_task
+def flush_retrieval_records() -> None:
+    """定时将缓冲中的知识库查询记录与片段命中次数刷写到数据库"""
+    from app.http.module import injector
+    from internal.service import RetrievalService
+
+    retrieval_service = injector.get(RetrievalService)
+    retrieval_service.flush_retrieval_records()
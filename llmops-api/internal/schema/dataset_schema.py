@@ -129,6 +129,10 @@ class HitReq(FlaskForm):
     score = FloatField("score", validators=[
         NumberRange(min=0, max=0.99, message="最小匹配度范围在0-0.99")
     ])
+    alpha = FloatField("alpha", validators=[
+        Optional(),
+        NumberRange(min=0, max=1, message="混合检索权重范围在0-1")
+    ])
 
 
 class GetDatasetQueriesResp(Schema):
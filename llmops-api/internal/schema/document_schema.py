@@ -185,6 +185,9 @@ class GetDocumentResp(Schema):
     segment_count = fields.Integer(dump_default=0)
     character_count = fields.Integer(dump_default=0)
     hit_count = fields.Integer(dump_default=0)
+    reused_segment_count = fields.Integer(dump_default=0)
+    added_segment_count = fields.Integer(dump_default=0)
+    removed_segment_count = fields.Integer(dump_default=0)
     position = fields.Integer(dump_default=0)
     enabled = fields.Bool(dump_default=False)
     disabled_at = fields.Integer(dump_default=0)
@@ -202,6 +205,9 @@ class GetDocumentResp(Schema):
             "segment_count": data.segment_count,
             "character_count": data.character_count,
             "hit_count": data.hit_count,
+            "reused_segment_count": data.reused_segment_count,
+            "added_segment_count": data.added_segment_count,
+            "removed_segment_count": data.removed_segment_count,
             "position": data.position,
             "enabled": data.enabled,
             "disabled_at": datetime_to_timestamp(data.disabled_at),
@@ -19,6 +19,7 @@ from .cos_service import CosService
 from .dataset_service import DatasetService
 from .document_service import DocumentService
 from .embeddings_service import EmbeddingsService
+from .enabled_filter_service import EnabledFilterService
 from .indexing_service import IndexingService
 from .jieba_service import JiebaService
 from .jwt_service import JWTService
@@ -26,10 +27,13 @@ from .keyword_table_service import KeywordTableService
 from .oauth_service import OAuthService
 from .openapi_service import OpenApiService
 from .process_rule_service import ProcessRuleService
+from .rerank_service import RerankService
+from .retrieval_cache_service import RetrievalCacheService
 from .retrieval_service import RetrievalService
 from .segment_service import SegmentService
 from .upload_file_service import UploadFileService
 from .vector_database_service import VectorDatabaseService
+from .warmup_service import WarmupService
 from .workflow_service import WorkflowService
 
 __all__ = [
@@ -47,7 +51,10 @@ __all__ = [
     "UploadFileService",
     "DatasetService",
     "RetrievalService",
+    "RetrievalCacheService",
+    "RerankService",
     "EmbeddingsService",
+    "EnabledFilterService",
     "JiebaService",
     "DocumentService",
     "IndexingService",
@@ -59,4 +66,5 @@ __all__ = [
     "ApiKeyService",
     "OpenApiService",
     "WorkflowService",
+    "WarmupService",
 ]
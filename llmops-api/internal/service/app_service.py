@@ -23,13 +23,13 @@ from sqlalchemy import func, desc
 
 from internal.core.agent.agents import FunctionCallAgent, AgentQueueManager
 from internal.core.agent.entities import AgentConfig
-from internal.core.agent.entities.queue_entity import QueueEvent
+from internal.core.agent.entities.queue_entity import AgentThought, QueueEvent
 from internal.core.memory import TokenBufferMemory
 from internal.core.tools.api_tools.providers import ApiProviderManager
 from internal.core.tools.builtin_tools.providers import BuiltinProviderManager
 from internal.entity.app_entity import AppStatus, AppConfigType, DEFAULT_APP_CONFIG
 from internal.entity.conversation_entity import InvokeFrom, MessageStatus
-from internal.entity.dataset_entity import RetrievalSource
+from internal.entity.dataset_entity import RetrievalSource, RetrievalStrategy
 from internal.exception import NotFoundException, ForbiddenException, ValidateErrorException, FailException
 from internal.lib.helper import remove_fields
 from internal.model import App, Account, AppConfigVersion, ApiTool, Dataset, AppConfig, AppDatasetJoin, Message
@@ -316,6 +316,23 @@ class AppService(BaseService):
         self.get_app(app_id, account)
         AgentQueueManager.set_stop_flag(task_id, InvokeFrom.DEBUGGER, account.id)
 
+    def resume_debug_chat(self, app_id: UUID, task_id: UUID, last_event_id: str, account: Account) -> Generator:
+        """断线后继续读取应用指定任务的调试会话事件 从 last_event_id 之后开始 未传递时从头读取"""
+        self.get_app(app_id, account)
+        agent_queue_manager = AgentQueueManager(user_id=account.id, invoke_from=InvokeFrom.DEBUGGER)
+        if not agent_queue_manager.event_bus.resumable:
+            raise FailException("当前事件总线不支持断线续读")
+
+        task_meta = AgentQueueManager.get_task_meta(task_id, InvokeFrom.DEBUGGER, account.id)
+        if task_meta is None:
+            raise NotFoundException("该调试会话任务不存在或已过期")
+
+        def handle_stream() -> Generator:
+            for agent_thought in agent_queue_manager.listen(task_id, last_event_id or None):
+                yield self.build_sse_event(agent_thought, **task_meta)
+
+        return handle_stream()
+
     def debug_chat(self, app_id: UUID, query: str, account: Account) -> Generator:
         """智能体 会话调试"""
 
@@ -361,12 +378,19 @@ class AppService(BaseService):
             review_config=draft_app_config["review_config"],
         ))
 
+        # 事件总线支持断线续读时记录任务元数据 客户端断线后可携带最后收到的事件id继续读取
+        task_id = uuid.uuid4()
+        task_meta = {"conversation_id": str(debug_conversation.id), "message_id": str(message.id)}
+        if agent.agent_queue_manager.event_bus.resumable:
+            agent.agent_queue_manager.set_task_meta(task_id, task_meta)
+
         # 执行智能体
         agent_thoughts = {}
         for agent_thought in agent.stream({
             "messages": [HumanMessage(query)],
             "history": history,
             "long_term_memory": debug_conversation.summary,
+            "task_id": task_id,
         }):
             event_id = str(agent_thought.id)
 
@@ -384,16 +408,7 @@ class AppService(BaseService):
                 else:
                     agent_thoughts[event_id] = agent_thought
 
-            data = {
-                **agent_thought.model_dump(include={
-                    "event", "thought", "observation", "tool", "tool_input", "answer", "latency",
-                }),
-                "id": event_id,
-                "conversation_id": str(debug_conversation.id),
-                "message_id": str(message.id),
-                "task_id": str(agent_thought.task_id),
-            }
-            yield f"event: {agent_thought.event}\ndata: {json.dumps(data)}\n\n"
+            yield self.build_sse_event(agent_thought, **task_meta)
 
         # 将消息以及推理过程添加到数据库记录
         thread = Thread(target=self.conversation_service.save_agent_thoughts, kwargs={
@@ -407,6 +422,21 @@ class AppService(BaseService):
         })
         thread.start()
 
+    @classmethod
+    def build_sse_event(cls, agent_thought: AgentThought, **fields) -> str:
+        """将智能体事件转换为SSE事件 fields 为附加的会话id、消息id等字段"""
+        data = {
+            **agent_thought.model_dump(include={
+                "event", "thought", "observation", "tool", "tool_input", "answer", "latency",
+            }),
+            "id": str(agent_thought.id),
+            **fields,
+            "task_id": str(agent_thought.task_id),
+        }
+        # 事件总线提供事件id时 作为SSE事件id 客户端断线后可据此继续读取
+        sse_id = f"id: {agent_thought.event_id}\n" if agent_thought.event_id else ""
+        return f"{sse_id}event: {agent_thought.event}\ndata: {json.dumps(data)}\n\n"
+
     def _validate_draft_app_config(self, draft_app_config: dict[str, Any], account: Account) -> dict[str, Any]:
         """校验传递的应用草稿配置信息，返回校验后的数据"""
         # 1.校验上传的草稿配置中对应的字段，至少拥有一个可以更新的配置
@@ -534,11 +564,13 @@ class AppService(BaseService):
             # 9.1 判断检索配置非空且类型为字典
             if not retrieval_config or not isinstance(retrieval_config, dict):
                 raise ValidateErrorException("检索配置格式错误")
-            # 9.2 校验检索配置的字段类型
-            if set(retrieval_config.keys()) != {"retrieval_strategy", "k", "score"}:
+            # 9.2 校验检索配置的字段类型 alpha 为原生混合检索的可选权重
+            if not {"retrieval_strategy", "k", "score"} <= set(retrieval_config.keys()) <= {
+                "retrieval_strategy", "k", "score", "alpha", "rerank",
+            }:
                 raise ValidateErrorException("检索配置格式错误")
             # 9.3 校验检索策略是否正确
-            if retrieval_config["retrieval_strategy"] not in ["semantic", "full_text", "hybrid"]:
+            if retrieval_config["retrieval_strategy"] not in [item.value for item in RetrievalStrategy]:
                 raise ValidateErrorException("检测策略格式错误")
             # 9.4 校验最大召回数量
             if not isinstance(retrieval_config["k"], int) or not (0 <= retrieval_config["k"] <= 10):
@@ -546,6 +578,24 @@ class AppService(BaseService):
             # 9.5 校验得分/最小匹配度
             if not isinstance(retrieval_config["score"], float) or not (0 <= retrieval_config["score"] <= 1):
                 raise ValidateErrorException("最小匹配范围为0-1")
+            # 9.6 校验混合检索权重
+            if "alpha" in retrieval_config and (
+                    not isinstance(retrieval_config["alpha"], float) or not (0 <= retrieval_config["alpha"] <= 1)
+            ):
+                raise ValidateErrorException("混合检索权重范围为0-1")
+            # 9.7 校验重排配置
+            if "rerank" in retrieval_config:
+                rerank = retrieval_config["rerank"]
+                if (
+                        not isinstance(rerank, dict)
+                        or set(rerank.keys()) != {"enable", "candidates", "budget_ms"}
+                        or not isinstance(rerank["enable"], bool)
+                ):
+                    raise ValidateErrorException("重排配置格式错误")
+                if not isinstance(rerank["candidates"], int) or not (1 <= rerank["candidates"] <= 100):
+                    raise ValidateErrorException("重排候选数量范围为1-100")
+                if not isinstance(rerank["budget_ms"], int) or not (10 <= rerank["budget_ms"] <= 5000):
+                    raise ValidateErrorException("重排延迟预算范围为10-5000毫秒")
 
         # 10.校验long_term_memory长期记忆配置
         if "long_term_memory" in draft_app_config:
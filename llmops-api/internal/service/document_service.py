@@ -26,6 +26,8 @@ from internal.task.document_task import build_documents, update_document_enabled
 from pkg.paginator import Paginator
 from pkg.sqlalchemy import SQLAlchemy
 from .base_service import BaseService
+from .enabled_filter_service import EnabledFilterService
+from .retrieval_cache_service import RetrievalCacheService
 
 
 @inject
@@ -34,6 +36,8 @@ class DocumentService(BaseService):
     """文档服务"""
     db: SQLAlchemy
     redis_client: Redis
+    enabled_filter_service: EnabledFilterService
+    retrieval_cache_service: RetrievalCacheService
 
     def create_documents(self,
                          dataset_id: UUID,
@@ -166,6 +170,11 @@ class DocumentService(BaseService):
         self.update(document, enabled=enabled, disabled_at=None if enabled else datetime.now())
         self.redis_client.setex(cache_key, LOCK_EXPIRE_TIME, 1)
 
+        # 启用状态由 Redis 禁用集合过滤时 修改集合后立即生效 异步任务仅同步关键词表
+        if self.enabled_filter_service.active:
+            self.enabled_filter_service.set_document_enabled(dataset_id, document_id, enabled)
+            self.retrieval_cache_service.bump_dataset_version(dataset_id)
+
         # 启用异步任务完成 关键词 片段 向量等修改
         update_document_enabled.delay(document_id)
 
@@ -224,6 +233,9 @@ class DocumentService(BaseService):
                 "position": document.position,
                 "segment_count": segment_count,
                 "completed_segment_count": completed_segment_count,
+                "reused_segment_count": document.reused_segment_count,
+                "added_segment_count": document.added_segment_count,
+                "removed_segment_count": document.removed_segment_count,
                 "error": document.error,
                 "status": document.status,
                 "processing_started_at": datetime_to_timestamp(
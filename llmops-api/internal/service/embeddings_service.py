@@ -4,6 +4,9 @@
 @File   :   embeddings_service.py
 @Author :   s.qiu@foxmail.com
 """
+import gc
+import json
+import logging
 import os
 import threading
 from pathlib import Path
@@ -12,15 +15,31 @@ from typing import Optional
 import tiktoken
 import torch
 from injector import inject, singleton
-from langchain_classic.embeddings import CacheBackedEmbeddings
-from langchain_community.storage import RedisStore
 from langchain_core.embeddings import Embeddings
 from langchain_huggingface import HuggingFaceEmbeddings
 from redis import Redis
 
+from internal.core.embeddings_cache import EmbeddingsCache
+from internal.core.embeddings_executor import EmbeddingsExecutor
+from internal.core.embeddings_sidecar import SidecarEmbeddings
+from internal.core.onnx_embeddings import (
+    OnnxEmbeddings,
+    check_equivalence,
+    default_onnx_output_path,
+    export_onnx_model,
+)
+from internal.core.onnx_embeddings.benchmark import benchmark_embeddings
+
 # 全局加载一次 encoding，避免每次调用函数都重新加载模型配置
 _TIKTOKEN_ENCODING = tiktoken.encoding_for_model("gpt-3.5-turbo")
 
+# 支持的推理后端 torch: HuggingFaceEmbeddings onnx: ONNX Runtime onnx-int8: int8动态量化后的ONNX Runtime
+EMBEDDINGS_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+# 多进程共享模型的方式 none: 每个进程各自加载 preload: fork前在主进程加载 依靠写时复制共享权重
+# sidecar: 通过 Unix 套接字调用本机嵌入服务进程 所有工作进程共享同一份模型
+EMBEDDINGS_SHARE_MODES = ("none", "preload", "sidecar")
+
 
 @inject
 @singleton
@@ -29,9 +48,10 @@ class EmbeddingsService:
 
     def __init__(self, redis: Redis):
         """构造函数，初始化存储器，准备懒加载"""
-        self._store = RedisStore(client=redis)
+        self._redis = redis
         self._embeddings: Optional[Embeddings] = None
-        self._cache_backed_embeddings: Optional[CacheBackedEmbeddings] = None
+        self._cache_backed_embeddings: Optional[EmbeddingsCache] = None
+        self._embeddings_executor: Optional[EmbeddingsExecutor] = None
 
         # 线程锁，防止并发请求导致模型重复加载
         self._lock = threading.Lock()
@@ -86,38 +106,148 @@ class EmbeddingsService:
             print(f"⏳ [Embeddings] 正在首次加载模型 (Device: {self._get_device()})...")
 
             try:
-                # 基础模型
-                base_embeddings = HuggingFaceEmbeddings(
-                    model_name=self._model_path,
-                    cache_folder=str(self._base_cache_dir),
-                    model_kwargs={
-                        "trust_remote_code": True,
-                        "local_files_only": True,
-                        "device": self._get_device()
-                    }
-                )
+                # 基础模型 推理后端由配置选择
+                backend = os.getenv("EMBEDDINGS_BACKEND", "torch")
+                if self.share_mode == "sidecar":
+                    base_embeddings = SidecarEmbeddings(
+                        os.getenv("EMBEDDINGS_SIDECAR_SOCKET", "/tmp/llmops-embeddings.sock"),
+                    )
+                else:
+                    base_embeddings = self._create_embeddings(backend)
+                    # ONNX后端未通过等价性校验时已回退到torch 缓存按实际加载的后端区分 避免与ONNX向量混用
+                    if isinstance(base_embeddings, HuggingFaceEmbeddings):
+                        backend = "torch"
 
-                # 缓存层封装
+                # 批量执行器 汇总索引与检索请求按token预算组批
                 self._embeddings = base_embeddings  # 保留原始引用
-                self._cache_backed_embeddings = CacheBackedEmbeddings.from_bytes_store(
+                self._embeddings_executor = EmbeddingsExecutor(
                     base_embeddings,
-                    self._store,
-                    namespace="embeddings",
+                    token_counter=self.calculate_token_count,
+                    max_batch_tokens=int(os.getenv("EMBEDDINGS_MAX_BATCH_TOKENS", 8192)),
+                    max_batch_size=int(os.getenv("EMBEDDINGS_MAX_BATCH_SIZE", 64)),
+                    max_wait_ms=int(os.getenv("EMBEDDINGS_MAX_WAIT_MS", 5)),
+                )
+
+                # 缓存层封装 文档与query嵌入均先经过缓存 未命中时才提交给批量执行器
+                self._cache_backed_embeddings = EmbeddingsCache(
+                    self._embeddings_executor,
+                    self._redis,
+                    model_id=f"{self._model_repo_id}:{backend}",
+                    ttl=int(os.getenv("EMBEDDINGS_CACHE_TTL", 7 * 24 * 3600)),
+                    max_size=int(os.getenv("EMBEDDINGS_CACHE_MAX_SIZE", 1000000)),
+                    local_max_size=int(os.getenv("EMBEDDINGS_LOCAL_CACHE_SIZE", 1024)),
+                    dtype=os.getenv("EMBEDDINGS_CACHE_DTYPE", "float16"),
                 )
                 print("✅ [Embeddings] 模型加载完成")
             except Exception as e:
                 print(f"❌ [Embeddings] 模型加载失败: {e}")
                 raise e
 
+    def _create_embeddings(self, backend: str, fallback: bool = True) -> Embeddings:
+        """根据推理后端创建基础嵌入模型 ONNX后端未通过等价性校验时回退到torch后端 fallback 为 False 时不校验也不回退"""
+        if backend not in EMBEDDINGS_BACKENDS:
+            raise ValueError(f"不支持的嵌入推理后端: {backend}")
+
+        if backend == "torch":
+            # CPU 推理时限制 torch 线程数 所有请求由批量执行器在同一个模型实例上串行执行
+            if self._get_device() == "cpu":
+                torch.set_num_threads(int(os.getenv("EMBEDDINGS_TORCH_THREADS", os.cpu_count() or 1)))
+
+            return HuggingFaceEmbeddings(
+                model_name=self._model_path,
+                cache_folder=str(self._base_cache_dir),
+                model_kwargs={
+                    "trust_remote_code": True,
+                    "local_files_only": True,
+                    "device": self._get_device()
+                }
+            )
+
+        # 首次使用时导出ONNX模型(可选int8量化) 后续直接复用导出文件
+        output_path = default_onnx_output_path(self._base_cache_dir, self._model_repo_id)
+        model_file = export_onnx_model(self._model_path, output_path, quantize=backend == "onnx-int8")
+        onnx_embeddings = OnnxEmbeddings(
+            model_file,
+            max_length=int(os.getenv("EMBEDDINGS_ONNX_MAX_LENGTH", 8192)),
+            num_threads=int(os.getenv("EMBEDDINGS_ONNX_THREADS", 0)),
+        )
+
+        if fallback and os.getenv("EMBEDDINGS_ONNX_VERIFY", "true").lower() == "true" and not self._verify_onnx_model(
+                model_file, onnx_embeddings,
+        ):
+            return self._create_embeddings("torch")
+        return onnx_embeddings
+
+    def _verify_onnx_model(self, model_file: Path, onnx_embeddings: Embeddings) -> bool:
+        """在固定语料上与torch后端比较余弦相似度 校验结果按模型文件记录 每个导出文件只校验一次"""
+        threshold = float(os.getenv("EMBEDDINGS_ONNX_MIN_COSINE", 0.99))
+        record_file = model_file.parent / "verification.json"
+        records = json.loads(record_file.read_text()) if record_file.exists() else {}
+
+        if model_file.name not in records:
+            _, min_similarity = check_equivalence(self._create_embeddings("torch"), onnx_embeddings, threshold)
+            records[model_file.name] = min_similarity
+            record_file.write_text(json.dumps(records, indent=2))
+
+        if records[model_file.name] < threshold:
+            logging.error(
+                f"ONNX模型等价性校验未通过，回退torch后端，模型: {model_file.name}，"
+                f"最小余弦相似度: {records[model_file.name]:.4f}，阈值: {threshold}",
+            )
+            return False
+        return True
+
+    def benchmark(
+            self,
+            backends: list[str] = None,
+            texts: list[str] = None,
+            batch_size: int = 32,
+            rounds: int = 5,
+    ) -> dict[str, dict]:
+        """压测各推理后端 返回每个后端的 sentences/sec、p50/p99延迟以及相对torch后端的最小余弦相似度
+        ONNX后端不回退到torch 保证结果对应所标注的后端 等价性由最小余弦相似度体现
+        """
+        backends = backends or list(EMBEDDINGS_BACKENDS)
+        instances = {backend: self._create_embeddings(backend, fallback=False) for backend in backends}
+        reference = instances.get("torch") or self._create_embeddings("torch")
+
+        results = {}
+        for backend, embeddings in instances.items():
+            results[backend] = benchmark_embeddings(embeddings, texts, batch_size=batch_size, rounds=rounds)
+            results[backend]["min_cosine_vs_torch"] = check_equivalence(reference, embeddings)[1]
+        return results
+
+    @property
+    def share_mode(self) -> str:
+        """多进程共享模型的方式"""
+        share_mode = os.getenv("EMBEDDINGS_SHARE_MODE", "none")
+        if share_mode not in EMBEDDINGS_SHARE_MODES:
+            raise ValueError(f"不支持的模型共享方式: {share_mode}")
+        return share_mode
+
+    def preload(self) -> None:
+        """fork前在主进程加载模型权重 不执行推理(避免推理线程池在fork后失效)
+        随后冻结gc 防止子进程中的垃圾回收触碰已有对象导致共享页被复制
+        """
+        self._load_model()
+        gc.freeze()
+
+    def warm_up(self, batch_size: int = 8) -> None:
+        """预热 加载模型并执行一次虚拟批次 完成图编译与推理缓冲区分配 不经过向量缓存"""
+        self._load_model()
+        if self._embeddings_executor is not None:
+            self._embeddings_executor.embed_documents(["LLMOps embeddings warm up 模型预热"] * batch_size)
+
     @classmethod
     def calculate_token_count(cls, query: str) -> int:
         """计算传入文本的token数 (高性能版)"""
         # encode 是纯 CPU 计算，非常快，但 encoding 对象的加载很慢
         return len(_TIKTOKEN_ENCODING.encode(query))
 
-    @property
-    def store(self) -> RedisStore:
-        return self._store
+    @classmethod
+    def get_token_encoding(cls) -> tiktoken.Encoding:
+        """获取计算token数使用的编码器"""
+        return _TIKTOKEN_ENCODING
 
     @property
     def embeddings(self) -> Embeddings:
@@ -127,8 +257,15 @@ class EmbeddingsService:
         return self._embeddings
 
     @property
-    def cache_backed_embeddings(self) -> CacheBackedEmbeddings:
+    def cache_backed_embeddings(self) -> EmbeddingsCache:
         """获取带缓存的 embeddings，自动触发加载"""
         if self._cache_backed_embeddings is None:
             self._load_model()
         return self._cache_backed_embeddings
+
+    @property
+    def embeddings_executor(self) -> EmbeddingsExecutor:
+        """获取批量嵌入执行器，自动触发加载"""
+        if self._embeddings_executor is None:
+            self._load_model()
+        return self._embeddings_executor
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   enabled_filter_service
+@Time   :   2026/10/19 15:30
+@Author :   s.qiu@foxmail.com
+"""
+import os
+from dataclasses import dataclass
+from typing import Callable
+from uuid import UUID
+
+from injector import inject
+from langchain_core.documents import Document as LCDocument
+from redis import Redis
+
+from internal.entity.cache_entity import (
+    LOCK_EXPIRE_TIME,
+    ENABLED_FILTER_DISABLED_DOCUMENTS,
+    ENABLED_FILTER_DISABLED_SEGMENTS,
+    ENABLED_FILTER_LOADED,
+    LOCK_ENABLED_FILTER_UPDATE,
+)
+from internal.entity.dataset_entity import SegmentStatus
+from internal.model import Document, Segment
+from pkg.sqlalchemy import SQLAlchemy
+
+
+@inject
+@dataclass
+class EnabledFilterService:
+    """启用状态过滤服务
+    启用状态仅保存在 Postgres 在 Redis 中为每个知识库维护禁用的文档id集合与片段id集合
+    启用/禁用只需修改集合 无需改写向量数据库 检索时超量召回后按集合过滤
+    集合缺失时(首次检索/过期/失效)从 Postgres 重建 重建与变更持有同一把锁 保证集合不会被旧数据覆盖
+    """
+    db: SQLAlchemy
+    redis_client: Redis
+
+    @property
+    def active(self) -> bool:
+        """启用状态过滤方式 vector: 写入向量数据库属性并在检索时过滤 redis: 由本服务过滤
+        切换到 vector 方式前需重新同步向量数据库中的启用状态属性
+        """
+        return os.getenv("ENABLED_STATE_FILTER", "vector") == "redis"
+
+    @property
+    def overfetch_factor(self) -> int:
+        """首次召回数量为 k 的倍数"""
+        return max(1, int(os.getenv("ENABLED_FILTER_OVERFETCH_FACTOR", 2)))
+
+    @property
+    def max_fetch_k(self) -> int:
+        """过滤后数量不足时逐步扩大召回数量的上限"""
+        return int(os.getenv("ENABLED_FILTER_MAX_FETCH_K", 200))
+
+    def set_document_enabled(self, dataset_id: UUID, document_id: UUID, enabled: bool) -> None:
+        """更新文档启用状态 需在 Postgres 提交后调用"""
+        self._update_member(ENABLED_FILTER_DISABLED_DOCUMENTS, dataset_id, document_id, enabled)
+
+    def set_segment_enabled(self, dataset_id: UUID, segment_id: UUID, enabled: bool) -> None:
+        """更新片段启用状态 需在 Postgres 提交后调用"""
+        self._update_member(ENABLED_FILTER_DISABLED_SEGMENTS, dataset_id, segment_id, enabled)
+
+    def invalidate(self, dataset_id: UUID) -> None:
+        """删除知识库的禁用集合 下次检索时从 Postgres 重建"""
+        with self.redis_client.lock(LOCK_ENABLED_FILTER_UPDATE.format(dataset_id=dataset_id), LOCK_EXPIRE_TIME):
+            self.redis_client.delete(*self._keys(dataset_id))
+
+    def get_enabled_mask(self, lc_documents: list[LCDocument]) -> list[bool]:
+        """判断检索得到的文档是否可用 文档与片段均未被禁用时为 True"""
+        if not lc_documents:
+            return []
+
+        dataset_ids = list(dict.fromkeys(str(lc_document.metadata["dataset_id"]) for lc_document in lc_documents))
+        self._ensure_loaded(dataset_ids)
+
+        # 每个文档查询两次集合成员 通过管道一次往返完成
+        pipeline = self.redis_client.pipeline(transaction=False)
+        for lc_document in lc_documents:
+            dataset_id = lc_document.metadata["dataset_id"]
+            pipeline.sismember(
+                ENABLED_FILTER_DISABLED_DOCUMENTS.format(dataset_id=dataset_id), str(lc_document.metadata["document_id"])
+            )
+            pipeline.sismember(
+                ENABLED_FILTER_DISABLED_SEGMENTS.format(dataset_id=dataset_id), str(lc_document.metadata["segment_id"])
+            )
+        results = pipeline.execute()
+
+        return [
+            not results[2 * i] and not results[2 * i + 1]
+            for i in range(len(lc_documents))
+        ]
+
+    def filter_documents(self, lc_documents: list[LCDocument]) -> list[LCDocument]:
+        """过滤掉禁用的文档/片段"""
+        return [
+            lc_document for lc_document, enabled in zip(lc_documents, self.get_enabled_mask(lc_documents)) if enabled
+        ]
+
+    def overfetch(self, search: Callable[[int], list[LCDocument]], k: int) -> list[LCDocument]:
+        """超量召回后过滤 过滤后不足 k 条且可能存在更多结果时扩大召回数量重试 search 接收召回数量返回按得分排序的文档"""
+        fetch_k = k * self.overfetch_factor
+        while True:
+            candidates = search(fetch_k)
+            lc_documents = self.filter_documents(candidates)
+            if len(lc_documents) >= k or len(candidates) < fetch_k or fetch_k >= self.max_fetch_k:
+                return lc_documents[:k]
+            fetch_k = min(fetch_k * 2, self.max_fetch_k)
+
+    def _update_member(self, key: str, dataset_id: UUID, member_id: UUID, enabled: bool) -> None:
+        """更新禁用集合成员 集合未加载时无需处理 重建时会读取到最新状态"""
+        with self.redis_client.lock(LOCK_ENABLED_FILTER_UPDATE.format(dataset_id=dataset_id), LOCK_EXPIRE_TIME):
+            if not self.redis_client.exists(ENABLED_FILTER_LOADED.format(dataset_id=dataset_id)):
+                return
+            if enabled:
+                self.redis_client.srem(key.format(dataset_id=dataset_id), str(member_id))
+            else:
+                self.redis_client.sadd(key.format(dataset_id=dataset_id), str(member_id))
+
+    def _ensure_loaded(self, dataset_ids: list[str]) -> None:
+        """确保知识库的禁用集合已加载"""
+        pipeline = self.redis_client.pipeline(transaction=False)
+        for dataset_id in dataset_ids:
+            pipeline.exists(ENABLED_FILTER_LOADED.format(dataset_id=dataset_id))
+        for dataset_id, loaded in zip(dataset_ids, pipeline.execute()):
+            if not loaded:
+                self._rebuild(dataset_id)
+
+    def _rebuild(self, dataset_id: str) -> None:
+        """从 Postgres 重建知识库的禁用集合 仅已完成/错误状态的片段可能存在向量"""
+        with self.redis_client.lock(LOCK_ENABLED_FILTER_UPDATE.format(dataset_id=dataset_id), LOCK_EXPIRE_TIME):
+            if self.redis_client.exists(ENABLED_FILTER_LOADED.format(dataset_id=dataset_id)):
+                return
+
+            document_ids = [str(id) for id, in self.db.session.query(Document).with_entities(Document.id).filter(
+                Document.dataset_id == dataset_id,
+                Document.enabled.is_(False),
+            ).all()]
+            segment_ids = [str(id) for id, in self.db.session.query(Segment).with_entities(Segment.id).filter(
+                Segment.dataset_id == dataset_id,
+                Segment.enabled.is_(False),
+                Segment.status.in_([SegmentStatus.COMPLETED, SegmentStatus.ERROR]),
+            ).all()]
+
+            pipeline = self.redis_client.pipeline(transaction=True)
+            pipeline.delete(*self._keys(dataset_id))
+            if document_ids:
+                pipeline.sadd(ENABLED_FILTER_DISABLED_DOCUMENTS.format(dataset_id=dataset_id), *document_ids)
+            if segment_ids:
+                pipeline.sadd(ENABLED_FILTER_DISABLED_SEGMENTS.format(dataset_id=dataset_id), *segment_ids)
+            pipeline.set(ENABLED_FILTER_LOADED.format(dataset_id=dataset_id), 1)
+            pipeline.execute()
+
+    @classmethod
+    def _keys(cls, dataset_id) -> list[str]:
+        return [
+            ENABLED_FILTER_DISABLED_DOCUMENTS.format(dataset_id=dataset_id),
+            ENABLED_FILTER_DISABLED_SEGMENTS.format(dataset_id=dataset_id),
+            ENABLED_FILTER_LOADED.format(dataset_id=dataset_id),
+        ]
@@ -6,34 +6,50 @@
 @Author :   s.qiu@foxmail.com
 """
 import logging
-import re
+import os
+import time
 import uuid
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
+from queue import Queue, Full
+from threading import Event
+from typing import Iterable, Iterator, Optional
 from uuid import UUID
 
 from flask import Flask, current_app
 from injector import inject
 from langchain_core.documents import Document as LCDocument
 from redis import Redis
-from sqlalchemy import func
+from sqlalchemy import update, insert
 from weaviate.classes.query import Filter
 
 from internal.core.file_extractor import FileExtractor
+from internal.core.text_cleaner import EXTRA_TEXT_CLEANER
 from internal.entity.cache_entity import LOCK_DOCUMENT_UPDATE_ENABLED
 from internal.entity.dataset_entity import DocumentStatus, SegmentStatus
 from internal.exception import NotFoundException
 from internal.lib.helper import generate_text_hash
-from internal.model import Document, Segment, KeywordTable, DatasetQuery
+from internal.model import Document, Segment, DatasetQuery
 from pkg.sqlalchemy import SQLAlchemy
 from .base_service import BaseService
 from .embeddings_service import EmbeddingsService
+from .enabled_filter_service import EnabledFilterService
 from .jieba_service import JiebaService
 from .keyword_table_service import KeywordTableService
 from .process_rule_service import ProcessRuleService
+from .retrieval_cache_service import RetrievalCacheService
 from .vector_database_service import VectorDatabaseService
 
+# 解析结束标记
+_PARSE_END = object()
+
+# 页面/工作表之间的分隔符 与整个文件解析为单个文档时一致
+PAGE_DELIMITER = "\n\n"
+
 
 @inject
 @dataclass
@@ -47,38 +63,130 @@ class IndexingService(BaseService):
     keyword_table_service: KeywordTableService
     vector_database_service: VectorDatabaseService
     jieba_service: JiebaService
+    retrieval_cache_service: RetrievalCacheService
+    enabled_filter_service: EnabledFilterService
 
     def build_documents(self, document_ids: list[UUID]) -> None:
-        """根据文档id列表 构建知识库文档 涵盖加载、分割、索引构建、存储等"""
+        """根据文档id列表 构建知识库文档 涵盖加载、分割、索引构建、存储等
+        各阶段流水线执行: 解析线程池预先解析后续文档 存储线程池异步完成向量化 使第N+1个文档的解析与第N个文档的嵌入重叠
+        解析线程逐页/元素写入有界队列 分割阶段边解析边消费 文件只解析一次且内存中不保留完整的解析结果
+        """
+
+        # 获取所有文档id 按文档位置顺序处理
+        document_ids = [id for id, in self.db.session.query(Document).with_entities(Document.id).filter(
+            Document.id.in_(document_ids)).order_by(Document.position).all()]
+
+        flask_app = current_app._get_current_object()
+        parse_workers = max(1, int(os.getenv("INDEXING_PARSE_WORKERS", 2)))
+        store_workers = max(1, int(os.getenv("INDEXING_STORE_WORKERS", 1)))
+        parse_queue_size = max(1, int(os.getenv("INDEXING_PARSE_QUEUE_SIZE", 16)))
+
+        with ThreadPoolExecutor(max_workers=parse_workers) as parse_executor, \
+                ThreadPoolExecutor(max_workers=store_workers) as store_executor:
+            def start_parsing(parse_document_id: UUID) -> tuple[Queue, Event]:
+                """提交解析任务 返回解析结果队列与停止解析事件"""
+                parsed_queue, stop_event = Queue(maxsize=parse_queue_size), Event()
+                parse_executor.submit(self._parse_document, flask_app, parse_document_id, parsed_queue, stop_event)
+                return parsed_queue, stop_event
+
+            # 预先提交解析任务 解析窗口大小与解析并发数一致 避免一次性解析全部文档占用过多内存
+            parse_streams = deque(start_parsing(document_id) for document_id in document_ids[:parse_workers])
+            pending_document_ids = deque(document_ids[parse_workers:])
+
+            store_futures = []
+            for document_id in document_ids:
+                parsed_queue, stop_event = parse_streams.popleft()
+                if pending_document_ids:
+                    parse_streams.append(start_parsing(pending_document_ids.popleft()))
+
+                # 执行分割与索引构建 完成后提交到存储线程池 继续处理下一个文档
+                document = self.get(Document, document_id)
+                self.db.session.refresh(document)
+                try:
+                    # 边解析边分割，片段的信息，更新文档状态 仅返回需要处理的新片段与待删除的旧片段
+                    lc_segments, removed_segments = self._splitting(document, self._iter_parsed(parsed_queue))
+
+                    # 查找同知识库中内容相同的片段 复用其关键词与向量
+                    reusable_segments = self._get_reusable_segments(document, lc_segments)
+
+                    # 执行索引构建、关键词提取
+                    self._indexing(document, lc_segments, reusable_segments)
+                except Exception as e:
+                    # 更改状态为失败 并记录日志
+                    logging.exception(f"构建文档发生错误，错误信息为：{str(e)}")
+                    self.update(document, status=DocumentStatus.ERROR, error=str(e), stopped_at=datetime.now())
+                    continue
+                finally:
+                    # 分割失败时通知解析线程停止 避免阻塞在已满的队列上
+                    stop_event.set()
+
+                # 执行存储操作 更新文档状态 存储到向量数据库
+                store_futures.append(store_executor.submit(
+                    self._store_document, flask_app, document_id, lc_segments, reusable_segments, removed_segments,
+                ))
+
+            for future in store_futures:
+                future.result()
 
-        # 获取所有文档
-        documents = self.db.session.query(Document).filter(Document.id.in_(document_ids)).all()
+        return "根据文档id列表 构建文档"
 
-        # 遍历处理每一个文档
-        for document in documents:
+    def _parse_document(self, flask_app: Flask, document_id: UUID, parsed_queue: Queue, stop_event: Event) -> None:
+        """线程函数 在独立的应用上下文中流式解析文档 依次将页面/元素放入有界队列 结束时放入结束标记 出错时放入异常"""
+        with flask_app.app_context():
             try:
                 # 更改改状态为解析中
+                document = self.get(Document, document_id)
                 self.update(document, status=DocumentStatus.PARSING, processing_started_at=datetime.now())
 
-                # 执行文档加载步骤，并更新文档的状态与时间
-                lc_documents = self._parsing(document)
-
-                # 执行文档分割步骤，片段的信息，更新文档状态
-                lc_segments = self._splitting(document, lc_documents)
-
-                # 执行索引构建、关键词提取
-                self._indexing(document, lc_segments)
+                # 执行文档加载步骤 分割阶段停止消费时关闭生成器并清理临时文件
+                with closing(self._parsing(document)) as lc_documents:
+                    for lc_document in lc_documents:
+                        if not self._put_parsed(parsed_queue, lc_document, stop_event):
+                            return
+                item = _PARSE_END
+            except Exception as e:
+                item = e
+            self._put_parsed(parsed_queue, item, stop_event)
 
-                # 执行存储操作 更新文档状态 存储到向量数据库
-                self._completed(document, lc_segments)
+    @classmethod
+    def _put_parsed(cls, parsed_queue: Queue, item, stop_event: Event) -> bool:
+        """放入解析结果 队列已满时等待 分割阶段已停止消费时返回 False"""
+        while not stop_event.is_set():
+            try:
+                parsed_queue.put(item, timeout=0.5)
+                return True
+            except Full:
+                continue
+        return False
 
+    @classmethod
+    def _iter_parsed(cls, parsed_queue: Queue) -> Iterator[LCDocument]:
+        """依次读取解析结果 解析出错时抛出解析线程中的异常"""
+        while True:
+            item = parsed_queue.get()
+            if item is _PARSE_END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def _store_document(
+            self,
+            flask_app: Flask,
+            document_id: UUID,
+            lc_segments: list[LCDocument],
+            reusable_segments: dict[str, Segment],
+            removed_segments: list[tuple[UUID, UUID]],
+    ) -> None:
+        """线程函数 在独立的应用上下文中完成文档片段的向量存储"""
+        with flask_app.app_context():
+            document = self.get(Document, document_id)
+            try:
+                self._completed(document, lc_segments, reusable_segments, removed_segments)
             except Exception as e:
-                # 更改状态为失败 并记录日志
                 logging.exception(f"构建文档发生错误，错误信息为：{str(e)}")
                 self.update(document, status=DocumentStatus.ERROR, error=str(e), stopped_at=datetime.now())
 
-        return "根据文档id列表 构建文档"
-
     def update_document_enabled(self, document_id: UUID) -> None:
         """更新指定文档状态，同步关键词 片段 向量等修改"""
         cache_key = LOCK_DOCUMENT_UPDATE_ENABLED.format(document_id=document_id)
@@ -89,30 +197,35 @@ class IndexingService(BaseService):
         # 查询当前文档的所有片段
         segments = self.db.session.query(Segment).with_entities(Segment.id, Segment.node_id, Segment.enabled).filter(
             Segment.document_id == document_id, Segment.status == SegmentStatus.COMPLETED).all()
-        node_ids = [node_id for _, node_id, _ in segments]
+        node_ids = [str(node_id) for _, node_id, _ in segments]
 
-        # 遍历 node_ids 更新对应的向量数据库
+        # 批量更新向量数据库 更新失败的片段一次性标记为错误状态 由 Redis 禁用集合过滤时无需改写向量数据库
         try:
-            collection = self.vector_database_service.collection
-            for node_id in node_ids:
-                try:
-                    collection.data.update(uuid=node_id, properties={"document_enabled": document.enabled})
-                except Exception as e:
-                    with self.db.auto_commit():
-                        self.db.session.query(Segment).filter(Segment.node_id == node_id).update(
-                            {
-                                "error": str(e),
-                                "status": SegmentStatus.ERROR,
-                                "enabled": False,
-                                "disabled_at": datetime.now(),
-                                "stopped_at": datetime.now(),
-                            }
-                        )
-
-            # 更新关键词表中的数据
+            failed_node_ids = set()
+            if not self.enabled_filter_service.active:
+                failed_node_ids = set(self.vector_database_service.update_properties(
+                    document.dataset_id, node_ids, {"document_enabled": document.enabled},
+                ))
+            if failed_node_ids:
+                logging.error(f"批量更新向量数据库文档启用状态部分失败，文档ID{document_id}，失败数量：{len(failed_node_ids)}")
+                with self.db.auto_commit():
+                    self.db.session.query(Segment).filter(Segment.node_id.in_(failed_node_ids)).update(
+                        {
+                            "error": "更新向量数据库文档启用状态失败",
+                            "status": SegmentStatus.ERROR,
+                            "enabled": False,
+                            "disabled_at": datetime.now(),
+                            "stopped_at": datetime.now(),
+                        },
+                        synchronize_session=False,
+                    )
+
+            # 更新关键词表中的数据 更新失败的片段已被禁用 不再写入关键词
             if document.enabled is True:
                 # 从禁用改为启用需要 新增关键词
-                enabled_segment_ids = [id for id, _, enabled in segments if enabled is True]
+                enabled_segment_ids = [
+                    id for id, node_id, enabled in segments if enabled is True and str(node_id) not in failed_node_ids
+                ]
                 self.keyword_table_service.add_keyword_table_from_ids(dataset_id=document.dataset_id,
                                                                       segment_ids=enabled_segment_ids)
             else:
@@ -126,17 +239,18 @@ class IndexingService(BaseService):
             origin_enabled = not document.enabled
             self.update(document, enabled=origin_enabled, disabled_at=None if origin_enabled else datetime.now())
         finally:
-            # 任务完成后清空缓存键
+            # 任务完成后清空缓存键 并使该知识库的检索缓存失效
             self.redis_client.delete(cache_key)
+            self.retrieval_cache_service.bump_dataset_version(document.dataset_id)
 
     def delete_document(self, dataset_id: UUID, document_id: UUID) -> None:
         """删除指定文档，同步关键词 片段 向量等修改"""
         # 查找文档下的所有片段 ID 列表
-        segment_ids = self.db.session.query(Segment).with_entities(Segment.id).filter(
-            Segment.document_id == document_id).all()
+        segment_ids = [id for id, in self.db.session.query(Segment).with_entities(Segment.id).filter(
+            Segment.document_id == document_id).all()]
 
         # 删除向量数据库中对应的数据
-        collection = self.vector_database_service.collection
+        collection = self.vector_database_service.get_collection(dataset_id)
         collection.data.delete_many(where=Filter.by_property("document_id").equal(document_id))
 
         # 删除Postgres数据库的 segment 记录
@@ -145,6 +259,7 @@ class IndexingService(BaseService):
 
         # 更新片段对应的关键词表记录
         self.keyword_table_service.delete_keyword_table_from_ids(dataset_id, segment_ids)
+        self.retrieval_cache_service.bump_dataset_version(dataset_id)
 
     def delete_dataset(self, dataset_id: UUID) -> None:
         """删除指定知识库 包含知识库下所有 文档、片段、关键词表、相关向量数据"""
@@ -155,179 +270,376 @@ class IndexingService(BaseService):
                 self.db.session.query(Document).filter(Document.dataset_id == dataset_id).delete()
                 # 删除关联的片段
                 self.db.session.query(Segment).filter(Segment.dataset_id == dataset_id).delete()
-                # 删除关联的关键词
-                self.db.session.query(KeywordTable).filter(KeywordTable.dataset_id == dataset_id).delete()
                 # 删除最近查询记录
                 self.db.session.query(DatasetQuery).filter(DatasetQuery.dataset_id == dataset_id).delete()
 
-            # 删除向量数据库中关联的数据
-            self.vector_database_service.collection.data.delete_many(
-                where=Filter.by_property("dataset_id").equal(str(dataset_id))
-            )
+            # 删除关联的关键词倒排记录
+            self.keyword_table_service.delete_keyword_table_from_dataset_id(dataset_id)
+
+            # 删除向量数据库中关联的数据 多租户模式下直接删除知识库对应的租户
+            self.vector_database_service.delete_dataset_vectors(dataset_id)
+            self.enabled_filter_service.invalidate(dataset_id)
+            self.retrieval_cache_service.bump_dataset_version(dataset_id)
 
         except Exception as e:
             logging.exception(f"知识库删除异步任务出错，dataset_id: {dataset_id}，错误信息：{str(e)}")
 
-    def _parsing(self, document: Document) -> list[LCDocument]:
-        """解析传递的文档为LangChain文档列表"""
-        upload_file = document.upload_file
-        lc_documents = self.file_extractor.load(upload_file)
-        # 删除多余的空白字符串
-        for lc_document in lc_documents:
+    def _parsing(self, document: Document) -> Iterator[LCDocument]:
+        """流式解析传递的文档 逐个返回LangChain文档(页面/元素) 解析完成后更新文档状态"""
+        character_count = 0
+        for lc_document in self.file_extractor.lazy_load(document.upload_file):
+            # 删除多余的空白字符串
             lc_document.page_content = self._clean_extra_text(lc_document.page_content)
+            character_count += len(lc_document.page_content)
+            yield lc_document
 
         # 更新文档状态并记录时间
         self.update(
             document,
-            character_count=sum([len(lc_document.page_content) for lc_document in lc_documents]),
+            character_count=character_count,
             status=DocumentStatus.SPLITTING,
             parsing_completed_at=datetime.now(),
         )
 
-        return lc_documents
-
-    def _splitting(self, document: Document, lc_documents: list[LCDocument]) -> list[LCDocument]:
-        """文档分割 拆分为小块片段"""
+    def _splitting(
+            self,
+            document: Document,
+            lc_documents: Iterable[LCDocument],
+    ) -> tuple[list[LCDocument], list[tuple[UUID, UUID]]]:
+        """文档分割 逐个消费解析得到的文档并拆分为小块片段
+        返回需要处理的新片段 以及内容已不存在于新文档中的旧片段(id, node_id) 旧片段在新片段向量写入后再删除
+        """
 
         process_rule = document.process_rule
 
-        # 根据 process_rule 规则清除多余的字符串
+        # 分割过程中缓存每个文本的token数 后续计算片段token数时直接复用
+        calculate_token_count = lru_cache(maxsize=None)(self.embeddings_service.calculate_token_count)
+
+        # 根据process_rule获取文本分割器 每个文本只编码一次 按token下标切分
+        text_splitter = self.process_rule_service.get_text_splitter_by_process_rule(
+            process_rule,
+            calculate_token_count,
+            encoding=self.embeddings_service.get_token_encoding(),
+        )
+
+        # 根据 process_rule 规则清除多余的字符串 并逐个分割为片段列表
+        # PDF按页、表格按工作表解析 每页分割后的最后一个片段暂不输出 与下一页文本拼接后再分割
+        # 片段可跨越页面边界 与整个文件拼接为一个文本后分割的结果基本一致 页面末尾不会产生零碎的短片段
+        lc_segments = []
+        tail: Optional[LCDocument] = None
         for lc_document in lc_documents:
             lc_document.page_content = self.process_rule_service.clean_text_by_process_rule(
                 lc_document.page_content,
                 process_rule,
             )
+            if tail is not None:
+                lc_document.page_content = f"{tail.page_content}{PAGE_DELIMITER}{lc_document.page_content}"
+            page_segments = text_splitter.split_documents([lc_document])
+            if not page_segments:
+                continue
+            lc_segments.extend(page_segments[:-1])
+            tail = page_segments[-1]
+        if tail is not None:
+            lc_segments.append(tail)
+
+        # 一次计算所有片段的 hash 与 token 数
+        segment_rows = []
+        for position, lc_segment in enumerate(lc_segments, start=1):
+            content = lc_segment.page_content
+            segment_rows.append({
+                "account_id": document.account_id,
+                "dataset_id": document.dataset_id,
+                "document_id": document.id,
+                "position": position,
+                "content": content,
+                "character_count": len(content),
+                "token_count": calculate_token_count(content),
+                "status": SegmentStatus.WAITING,
+                "hash": generate_text_hash(content),
+            })
+        calculate_token_count.cache_clear()
+
+        # 文档重建时 当前文档下 hash 未变化的已完成片段直接复用 向量与关键词均保持不变
+        old_segments = self.db.session.query(Segment).with_entities(
+            Segment.id, Segment.node_id, Segment.hash, Segment.status,
+        ).filter(Segment.document_id == document.id).all()
+        reusable_segments = {}
+        for id, node_id, hash, status in old_segments:
+            if status == SegmentStatus.COMPLETED and hash not in reusable_segments:
+                reusable_segments[hash] = id
+
+        reused_rows, new_rows, new_lc_segments = [], [], []
+        for lc_segment, segment_row in zip(lc_segments, segment_rows):
+            reused_id = reusable_segments.pop(segment_row["hash"], None)
+            if reused_id is not None:
+                reused_rows.append({"id": reused_id, "position": segment_row["position"]})
+            else:
+                segment_row["node_id"] = uuid.uuid4()
+                new_rows.append(segment_row)
+                new_lc_segments.append(lc_segment)
 
-        # 根据process_rule获取文本分割器
-        text_splitter = self.process_rule_service.get_text_splitter_by_process_rule(
-            process_rule,
-            self.embeddings_service.calculate_token_count
-        )
+        # 内容已不存在于新文档中的旧片段 保留至新片段向量写入完成 避免重建期间文档无可检索的片段
+        reused_ids = {segment_row["id"] for segment_row in reused_rows}
+        removed_segments = [(id, node_id) for id, node_id, _, _ in old_segments if id not in reused_ids]
 
-        # 分割文档列表为片段列表
-        lc_segments = text_splitter.split_documents(lc_documents)
+        # 复用的片段仅更新位置
+        if reused_rows:
+            with self.db.auto_commit():
+                self.db.session.execute(update(Segment), reused_rows)
 
-        # 定位到当前文档下的最大片段位置
-        position = self.db.session.query((func.coalesce(func.max(Segment.position), 0))).filter(
-            Segment.document_id == document.id
-        ).scalar()
+        # 单条 INSERT ... RETURNING 批量存入新片段数据 返回的id顺序与传入数据一致
+        segment_ids = []
+        if new_rows:
+            with self.db.auto_commit():
+                segment_ids = self.db.session.scalars(
+                    insert(Segment).returning(Segment.id, sort_by_parameter_order=True),
+                    new_rows,
+                ).all()
 
-        # 遍历分割文档  存入片段数据
-        segments = []
-        for lc_segment in lc_segments:
-            position += 1
-            content = lc_segment.page_content
-            segment = self.create(
-                Segment,
-                account_id=document.account_id,
-                dataset_id=document.dataset_id,
-                document_id=document.id,
-                node_id=uuid.uuid4(),
-                position=position,
-                content=content,
-                character_count=len(content),
-                token_count=self.embeddings_service.calculate_token_count(content),
-                status=SegmentStatus.WAITING,
-                hash=generate_text_hash(content),
-            )
-            # 添加元数据
+        # 添加元数据 携带已计算的 hash 查找可复用片段时不再重复计算
+        for lc_segment, segment_row, segment_id in zip(new_lc_segments, new_rows, segment_ids):
             lc_segment.metadata = {
                 "account_id": str(document.account_id),
                 "dataset_id": str(document.dataset_id),
                 "document_id": str(document.id),
-                "segment_id": str(segment.id),
-                "node_id": str(segment.node_id),
+                "segment_id": str(segment_id),
+                "node_id": str(segment_row["node_id"]),
+                "hash": segment_row["hash"],
                 "document_enabled": False,
                 "segment_enabled": False,
             }
-            segments.append(segment)
 
-        # 更新文档的数据，涵盖状态、token数等内容
+        # 更新文档的数据，涵盖状态、token数、片段复用统计等内容
         self.update(
             document,
             status=DocumentStatus.INDEXING,
             splitting_completed_at=datetime.now(),
-            token_count=sum([segment.token_count for segment in segments]),
+            token_count=sum([segment_row["token_count"] for segment_row in segment_rows]),
+            reused_segment_count=len(reused_rows),
+            added_segment_count=len(new_rows),
+            removed_segment_count=len(removed_segments),
         )
 
-        return lc_segments
-
-    def _indexing(self, document: Document, lc_segments: list[LCDocument]) -> None:
-        """构建文档索引 提取关键词、词表构建"""
-
-        for lc_segment in lc_segments:
-            keywords = self.jieba_service.extract_keywords(lc_segment.page_content, 10)
-            # 更新文档片段keywords
-            self.db.session.query(Segment).filter(Segment.id == lc_segment.metadata["segment_id"]).update({
-                "keywords": keywords,
-                "status": SegmentStatus.INDEXING,
-                "indexing_completed_at": datetime.now(),
-            })
+        return new_lc_segments, removed_segments
+
+    def _get_reusable_segments(self, document: Document, lc_segments: list[LCDocument]) -> dict[str, Segment]:
+        """查找同知识库其他文档中 hash 相同的已完成片段 返回 新片段id->可复用片段 字典"""
+        segment_hashes = {
+            lc_segment.metadata["segment_id"]: lc_segment.metadata["hash"]
+            for lc_segment in lc_segments
+        }
+        if not segment_hashes:
+            return {}
+
+        segments = self.db.session.query(Segment).with_entities(
+            Segment.hash, Segment.node_id, Segment.keywords,
+        ).filter(
+            Segment.dataset_id == document.dataset_id,
+            Segment.document_id != document.id,
+            Segment.status == SegmentStatus.COMPLETED,
+            Segment.hash.in_(set(segment_hashes.values())),
+        ).all()
+        segments_by_hash = {}
+        for segment in segments:
+            segments_by_hash.setdefault(segment.hash, segment)
+
+        return {
+            segment_id: segments_by_hash[hash]
+            for segment_id, hash in segment_hashes.items()
+            if hash in segments_by_hash
+        }
+
+    def _delete_segments(self, dataset_id: UUID, segments: list[tuple[UUID, UUID]]) -> None:
+        """批量删除片段 同步删除关键词倒排记录与向量数据"""
+        if not segments:
+            return
+
+        segment_ids = [id for id, _ in segments]
+        node_ids = [str(node_id) for _, node_id in segments]
+        self.vector_database_service.get_collection(dataset_id).data.delete_many(
+            where=Filter.by_id().contains_any(node_ids)
+        )
+        with self.db.auto_commit():
+            self.db.session.query(Segment).filter(Segment.id.in_(segment_ids)).delete(synchronize_session=False)
+        self.keyword_table_service.delete_keyword_table_from_ids(dataset_id, segment_ids)
 
-            # 当前知识库的关键词表更新
-            keyword_table_record = self.keyword_table_service.get_keyword_table_from_dataset_id(document.dataset_id)
-            keyword_table = {field: set(value) for field, value in keyword_table_record.keyword_table.items()}
-            for keyword in keywords:
-                if keyword not in keyword_table:
-                    keyword_table[keyword] = set()
-                keyword_table[keyword].add(lc_segment.metadata["segment_id"])
-            self.update(keyword_table_record,
-                        keyword_table={field: list(value) for field, value in keyword_table.items()})
+    def _indexing(
+            self,
+            document: Document,
+            lc_segments: list[LCDocument],
+            reusable_segments: dict[str, Segment] = None,
+    ) -> None:
+        """构建文档索引 提取关键词、词表构建 可复用片段直接使用已有关键词"""
+        reusable_segments = reusable_segments or {}
+
+        # 批量提取所有片段的关键词
+        start_at = time.perf_counter()
+        extract_lc_segments = [
+            lc_segment for lc_segment in lc_segments if lc_segment.metadata["segment_id"] not in reusable_segments
+        ]
+        extracted_keywords = dict(zip(
+            [lc_segment.metadata["segment_id"] for lc_segment in extract_lc_segments],
+            self.jieba_service.batch_extract_keywords(
+                [lc_segment.page_content for lc_segment in extract_lc_segments], 10),
+        ))
+        keywords_list = [
+            reusable_segments[lc_segment.metadata["segment_id"]].keywords
+            if lc_segment.metadata["segment_id"] in reusable_segments
+            else extracted_keywords[lc_segment.metadata["segment_id"]]
+            for lc_segment in lc_segments
+        ]
+        extract_elapsed = time.perf_counter() - start_at
+
+        # 一次批量更新所有片段的keywords
+        start_at = time.perf_counter()
+        indexing_completed_at = datetime.now()
+        segment_keywords = {
+            lc_segment.metadata["segment_id"]: keywords for lc_segment, keywords in zip(lc_segments, keywords_list)
+        }
+        if segment_keywords:
+            with self.db.auto_commit():
+                self.db.session.execute(update(Segment), [
+                    {
+                        "id": segment_id,
+                        "keywords": keywords,
+                        "status": SegmentStatus.INDEXING,
+                        "indexing_completed_at": indexing_completed_at,
+                    }
+                    for segment_id, keywords in segment_keywords.items()
+                ])
+        update_elapsed = time.perf_counter() - start_at
+
+        # 当前知识库的关键词倒排索引 在锁内一次性合并写入
+        start_at = time.perf_counter()
+        self.keyword_table_service.add_keywords(document.dataset_id, segment_keywords)
+        merge_elapsed = time.perf_counter() - start_at
+
+        logging.info(
+            f"文档索引构建完成，document_id: {document.id}，片段数: {len(lc_segments)}，"
+            f"关键词提取耗时: {extract_elapsed:.3f}s，片段更新耗时: {update_elapsed:.3f}s，"
+            f"关键词表合并耗时: {merge_elapsed:.3f}s"
+        )
 
         # 更新文档状态
         self.update(document, indexing_completed_at=datetime.now())
 
-    def _completed(self, document: Document, lc_segments: list[LCDocument]) -> None:
-        """文档片段存储到向量数据库，文档状态已完成"""
+    def _completed(
+            self,
+            document: Document,
+            lc_segments: list[LCDocument],
+            reusable_segments: dict[str, Segment] = None,
+            removed_segments: list[tuple[UUID, UUID]] = None,
+    ) -> None:
+        """文档片段存储到向量数据库，文档状态已完成 可复用片段直接拷贝已有向量 新向量写入后删除已移除的旧片段"""
+        reusable_segments = reusable_segments or {}
         for lc_segment in lc_segments:
             lc_segment.metadata["document_enabled"] = True
             lc_segment.metadata["segment_enabled"] = True
 
-        # 向量存储 每次10条
-        def thread_func(flask_app: Flask, chunks: list[LCDocument], ids: list[UUID]) -> list[UUID]:
-            """线程函数 执行 postgress 与向量存储"""
-            try:
-                with flask_app.app_context():
-                    self.vector_database_service.vector_store.add_documents(chunks, ids=ids)
-                    with self.db.auto_commit():
-                        self.db.session.query(Segment).filter(Segment.node_id.in_(ids)).update({
+        # 拷贝可复用片段的向量 拷贝失败的片段回退为重新嵌入
+        copied_node_ids = self._copy_reusable_vectors(lc_segments, reusable_segments)
+        lc_segments = [
+            lc_segment for lc_segment in lc_segments if lc_segment.metadata["node_id"] not in copied_node_ids
+        ]
+
+        # 向量存储 按配置的批大小与并发数提交 实际嵌入批次由批量嵌入执行器按token预算统一组装
+        embed_workers = max(1, int(os.getenv("INDEXING_EMBED_WORKERS", 5)))
+        embed_batch_size = max(1, int(os.getenv("INDEXING_EMBED_BATCH_SIZE", 32)))
+
+        def thread_func(flask_app: Flask, chunks: list[LCDocument], ids: list[UUID]) -> None:
+            """线程函数 经向量缓存提交到批量嵌入执行器 通过批量接口写入向量数据库并更新 postgres 片段状态"""
+            with flask_app.app_context():
+                failed_ids = set(ids)
+                try:
+                    vectors = self.embeddings_service.cache_backed_embeddings.embed_documents(
+                        [chunk.page_content for chunk in chunks])
+                    failed_ids = set(self.vector_database_service.add_documents_with_vectors(chunks, vectors))
+                    if failed_ids:
+                        logging.error(f"构建文档片段索引部分写入失败，node_ids: {failed_ids}")
+                except Exception as e:
+                    logging.exception(f"构建文档片段索引发生异常，错误信息 {str(e)}")
+
+                completed_ids = [id for id in ids if id not in failed_ids]
+                with self.db.auto_commit():
+                    if completed_ids:
+                        self.db.session.query(Segment).filter(Segment.node_id.in_(completed_ids)).update({
                             "status": SegmentStatus.COMPLETED,
                             "completed_at": datetime.now(),
                             "enabled": True,
-                        })
-            except Exception as e:
-                logging.exception(f"构建文档片段索引发生异常，错误信息 {str(e)}")
-                with self.db.auto_commit():
-                    self.db.session.query(Segment).filter(Segment.node_id.in_(ids)).update({
-                        "status": SegmentStatus.ERROR,
-                        "completed_at": None,
-                        "stopped_at": datetime.now(),
-                        "enabled": False,
-                    })
-
-        with ThreadPoolExecutor(max_workers=5) as executor:
+                        }, synchronize_session=False)
+                    if failed_ids:
+                        self.db.session.query(Segment).filter(Segment.node_id.in_(failed_ids)).update({
+                            "status": SegmentStatus.ERROR,
+                            "completed_at": None,
+                            "stopped_at": datetime.now(),
+                            "enabled": False,
+                        }, synchronize_session=False)
+
+        with ThreadPoolExecutor(max_workers=embed_workers) as executor:
             futures = []
-            for i in range(0, len(lc_segments), 10):
-                chunks = lc_segments[i: i + 10]
+            for i in range(0, len(lc_segments), embed_batch_size):
+                chunks = lc_segments[i: i + embed_batch_size]
                 ids = [chunk.metadata["node_id"] for chunk in chunks]
                 futures.append(executor.submit(thread_func, current_app._get_current_object(), chunks, ids))
 
             for future in futures:
                 future.result()
 
-        # 更新文档状态
+        # 新片段向量已写入 删除内容已不存在于新文档中的旧片段及其向量
+        self._delete_segments(document.dataset_id, removed_segments or [])
+
+        # 更新文档状态 拷贝向量的片段计入复用统计
         self.update(
             document,
             status=DocumentStatus.COMPLETED,
             completed_at=datetime.now(),
             enabled=True,
+            reused_segment_count=document.reused_segment_count + len(copied_node_ids),
+            added_segment_count=document.added_segment_count - len(copied_node_ids),
         )
+        self.enabled_filter_service.invalidate(document.dataset_id)
+        self.retrieval_cache_service.bump_dataset_version(document.dataset_id)
+
+    def _copy_reusable_vectors(self, lc_segments: list[LCDocument], reusable_segments: dict[str, Segment]) -> set[str]:
+        """将可复用片段的已有向量拷贝给新片段 返回拷贝成功的 node_id 集合"""
+        copy_lc_segments = [
+            lc_segment for lc_segment in lc_segments if lc_segment.metadata["segment_id"] in reusable_segments
+        ]
+        if not copy_lc_segments:
+            return set()
+
+        try:
+            vectors = self.vector_database_service.get_vectors(copy_lc_segments[0].metadata["dataset_id"], list({
+                str(reusable_segments[lc_segment.metadata["segment_id"]].node_id) for lc_segment in copy_lc_segments
+            }))
+            copy_lc_segments = [
+                lc_segment for lc_segment in copy_lc_segments
+                if str(reusable_segments[lc_segment.metadata["segment_id"]].node_id) in vectors
+            ]
+            failed_node_ids = set(self.vector_database_service.add_documents_with_vectors(
+                copy_lc_segments,
+                [vectors[str(reusable_segments[lc_segment.metadata["segment_id"]].node_id)]
+                 for lc_segment in copy_lc_segments],
+            ))
+        except Exception as e:
+            logging.exception(f"拷贝可复用片段向量失败，回退为重新嵌入，错误信息：{str(e)}")
+            return set()
+
+        copied_node_ids = {
+            lc_segment.metadata["node_id"] for lc_segment in copy_lc_segments
+            if lc_segment.metadata["node_id"] not in failed_node_ids
+        }
+        if copied_node_ids:
+            with self.db.auto_commit():
+                self.db.session.query(Segment).filter(Segment.node_id.in_(copied_node_ids)).update({
+                    "status": SegmentStatus.COMPLETED,
+                    "completed_at": datetime.now(),
+                    "enabled": True,
+                }, synchronize_session=False)
+
+        return copied_node_ids
 
     @classmethod
     def _clean_extra_text(cls, text: str) -> str:
-        """清除过滤传递的多余空白字符串"""
-        text = re.sub(r'<\|', '<', text)
-        text = re.sub(r'\|>', '>', text)
-        text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F\xEF\xBF\xBE]', '', text)
-        text = re.sub('\uFFFE', '', text)  # 删除零宽非标记字符
-        return text
+        """清除过滤传递的多余空白字符串 替换特殊标记中的竖线、删除控制字符与零宽非标记字符"""
+        return EXTRA_TEXT_CLEANER.clean(text)
@@ -5,14 +5,31 @@
 @Time   :   2025/12/22 12:04
 @Author :   s.qiu@foxmail.com
 """
+import logging
+import os
 from dataclasses import dataclass
+from functools import lru_cache
 
 import jieba
 from injector import inject
 from jieba.analyse import default_tfidf
 
+from internal.core.keyword_extractor import extract_keywords, init_extract_worker
+from internal.core.process_pool import ProcessPool
 from internal.entity.jieba_entity import STOPWORD_SET
 
+# 文本数量达到该阈值时才启用多进程提取 避免小文档承担进程间传输开销
+PARALLEL_EXTRACT_THRESHOLD = 200
+
+
+@lru_cache(maxsize=None)
+def _get_extract_pool() -> ProcessPool:
+    """进程内复用的关键词提取进程池"""
+    return ProcessPool(
+        max_workers=int(os.getenv("JIEBA_EXTRACT_WORKERS", os.cpu_count() or 1)),
+        initializer=init_extract_worker,
+    )
+
 
 @inject
 @dataclass
@@ -30,3 +47,31 @@ class JiebaService:
             sentence=text,
             topK=max_keyword_pre_chunk,
         )
+
+    @classmethod
+    def warm_up(cls) -> None:
+        """预热 加载jieba词典 避免首次分词时才加载"""
+        jieba.initialize()
+        cls.extract_keywords("LLMOps 关键词提取预热")
+
+    @classmethod
+    def batch_extract_keywords(cls, texts: list[str], max_keyword_pre_chunk: int = 10) -> list[list[str]]:
+        """批量提取文本列表的关键词 jieba为CPU密集型且持有GIL 文本较多时使用进程池并行提取
+        进程池以 spawn 方式启动 在 Celery prefork 子进程(守护进程)中同样可用
+        """
+        pool = _get_extract_pool()
+        if len(texts) < PARALLEL_EXTRACT_THRESHOLD or pool.max_workers <= 1:
+            return [cls.extract_keywords(text, max_keyword_pre_chunk) for text in texts]
+
+        try:
+            return list(pool.map(
+                extract_keywords,
+                texts,
+                [max_keyword_pre_chunk] * len(texts),
+                chunksize=max(1, len(texts) // (pool.max_workers * 4)),
+            ))
+        except (OSError, RuntimeError) as e:
+            # 进程池子进程异常退出后不可再用 丢弃后下次重新创建
+            pool.reset()
+            logging.warning(f"进程池提取关键词失败，降级为串行提取，错误信息：{str(e)}")
+            return [cls.extract_keywords(text, max_keyword_pre_chunk) for text in texts]
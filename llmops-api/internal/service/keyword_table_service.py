@@ -5,78 +5,101 @@
 @Time   :   2025/12/25 09:58
 @Author :   s.qiu@foxmail.com
 """
-
 from dataclasses import dataclass
 from uuid import UUID
 
 from injector import inject
 from redis import Redis
+from sqlalchemy.dialects.postgresql import insert
 
 from internal.entity.cache_entity import LOCK_KEYWORD_TABLE_UPDATE_KEYWORD_TABLE, LOCK_EXPIRE_TIME
-from internal.model import KeywordTable, Segment
-from internal.service import BaseService
+from internal.model import KeywordIndex, Segment
+from internal.service.base_service import BaseService
+from internal.service.retrieval_cache_service import RetrievalCacheService
 from pkg.sqlalchemy import SQLAlchemy
 
+# 倒排记录中关键词的最大长度 与数据表字段长度保持一致
+MAX_KEYWORD_LENGTH = 255
+
+# 单条 INSERT 语句写入的倒排记录数 避免超出 Postgres 单语句参数上限
+POSTING_INSERT_BATCH_SIZE = 5000
+
 
 @inject
 @dataclass
 class KeywordTableService(BaseService):
-    """关键词服务"""
+    """关键词服务 基于 keyword_index 倒排索引表维护 关键词->片段 的映射"""
     db: SQLAlchemy
     redis_client: Redis
+    retrieval_cache_service: RetrievalCacheService
 
-    def get_keyword_table_from_dataset_id(self, dataset_id) -> KeywordTable:
-        """获取知识库的 关键词表"""
-        keyword_table = self.db.session.query(KeywordTable).filter(KeywordTable.dataset_id == dataset_id).one_or_none()
-        if keyword_table is None:
-            keyword_table = self.create(KeywordTable, dataset_id=dataset_id, keyword_table={})
+    def add_keywords(self, dataset_id: UUID, segment_keywords: dict[str, list[str]]) -> None:
+        """将 片段id->关键词列表 批量追加到指定知识库的倒排索引中"""
+        postings = self._build_postings(dataset_id, segment_keywords)
+        if not postings:
+            return
+
+        # 知识库新增关键词 上锁避免与删除操作交叉执行
+        cache_key = LOCK_KEYWORD_TABLE_UPDATE_KEYWORD_TABLE.format(dataset_id=dataset_id)
+        with self.redis_client.lock(cache_key, timeout=LOCK_EXPIRE_TIME):
+            with self.db.auto_commit():
+                # 已存在的倒排记录直接忽略 保证重复追加幂等
+                for i in range(0, len(postings), POSTING_INSERT_BATCH_SIZE):
+                    self.db.session.execute(
+                        insert(KeywordIndex).values(postings[i: i + POSTING_INSERT_BATCH_SIZE]).on_conflict_do_nothing(
+                            index_elements=["dataset_id", "keyword", "segment_id"],
+                        )
+                    )
+        self.retrieval_cache_service.bump_dataset_version(dataset_id)
 
-        return keyword_table
+    def delete_keyword_table_from_ids(self, dataset_id: UUID, segment_ids: list[UUID]) -> None:
+        """删除指定知识库下片段对应的倒排记录"""
+        if not segment_ids:
+            return
 
-    def delete_keyword_table_from_ids(self, dataset_id, segment_ids: list[UUID]) -> None:
-        """删除指定知识库下关键词表多余的数据"""
         # 上锁避免并发时拿到错误数据
         cache_key = LOCK_KEYWORD_TABLE_UPDATE_KEYWORD_TABLE.format(dataset_id=dataset_id)
         with self.redis_client.lock(cache_key, timeout=LOCK_EXPIRE_TIME):
-            keyword_table_record = self.get_keyword_table_from_dataset_id(dataset_id)
-            keyword_table = keyword_table_record.keyword_table.copy()
+            with self.db.auto_commit():
+                self.db.session.query(KeywordIndex).filter(
+                    KeywordIndex.dataset_id == dataset_id,
+                    KeywordIndex.segment_id.in_([str(segment_id) for segment_id in segment_ids]),
+                ).delete(synchronize_session=False)
+        self.retrieval_cache_service.bump_dataset_version(dataset_id)
 
-            segment_ids_to_delete = set([str(segment_id) for segment_id in segment_ids])
-            keywords_to_delete = set()
-
-            # 遍历关键词判断更新
-            for keyword, ids in keyword_table.items():
-                ids_set = set(ids)
-                if segment_ids_to_delete.intersection(ids_set):
-                    keyword_table[keyword] = list(ids_set.difference(segment_ids_to_delete))
-                    if not keyword_table[keyword]:
-                        keywords_to_delete.add(keyword)
+    def add_keyword_table_from_ids(self, dataset_id: UUID, segment_ids: list[UUID]) -> None:
+        """根据片段记录中的关键词 在指定知识库的倒排索引中添加关键词"""
+        if not segment_ids:
+            return
 
-            # 检测空关键词数据并删除（关键词并没有映射任何字段id的数据）
-            for keyword in keywords_to_delete:
-                del keyword_table[keyword]
+        # 查找片段的关键词信息
+        segments = self.db.session.query(Segment).with_entities(Segment.id, Segment.keywords).filter(
+            Segment.id.in_(segment_ids)).all()
 
-            self.update(keyword_table_record, keyword_table=keyword_table)
+        self.add_keywords(dataset_id, {str(id): keywords for id, keywords in segments})
 
-    def add_keyword_table_from_ids(self, dataset_id: UUID, segment_ids: list[UUID]) -> None:
-        """在指定知识库的关键词表中添加关键词"""
-        # 知识库新增关键词 上锁避免并发时拿到错误数据
+    def delete_keyword_table_from_dataset_id(self, dataset_id: UUID) -> None:
+        """删除指定知识库下的全部倒排记录"""
+        # 与其他关键词表变更使用同一把锁 避免删除时仍有并发追加的倒排记录残留
         cache_key = LOCK_KEYWORD_TABLE_UPDATE_KEYWORD_TABLE.format(dataset_id=dataset_id)
         with self.redis_client.lock(cache_key, timeout=LOCK_EXPIRE_TIME):
-            # 获取指定关键词表
-            keyword_table_record = self.get_keyword_table_from_dataset_id(dataset_id)
-            keyword_table = {field: set(value) for field, value in keyword_table_record.keyword_table.items()}
-            # 查找片段的关键词信息
-            segments = self.db.session.query(Segment).with_entities(Segment.id, Segment.keywords).filter(
-                Segment.id.in_(segment_ids)).all()
-
-            # 将新的关键词添加到关键词表中
-            for id, keywords in segments:
-                for keyword in keywords:
-                    if keyword not in keyword_table:
-                        keyword_table[keyword] = set()
-                    keyword_table[keyword].add(str(id))
-
-            # 更新关键词表
-            self.update(keyword_table_record,
-                        keyword_table={field: list(value) for field, value in keyword_table.items()})
+            with self.db.auto_commit():
+                self.db.session.query(KeywordIndex).filter(
+                    KeywordIndex.dataset_id == dataset_id,
+                ).delete(synchronize_session=False)
+        self.retrieval_cache_service.bump_dataset_version(dataset_id)
+
+    @classmethod
+    def _build_postings(cls, dataset_id: UUID, segment_keywords: dict[str, list[str]]) -> list[dict]:
+        """将 片段id->关键词列表 展开为去重后的倒排记录"""
+        postings = dict.fromkeys(
+            (keyword[:MAX_KEYWORD_LENGTH], str(segment_id))
+            for segment_id, keywords in segment_keywords.items()
+            for keyword in keywords
+            if keyword
+        )
+
+        return [
+            {"dataset_id": str(dataset_id), "keyword": keyword, "segment_id": segment_id}
+            for keyword, segment_id in postings
+        ]
@@ -6,24 +6,25 @@
 @Author :   s.qiu@foxmail.com
 """
 
-import json
+import uuid
 from dataclasses import dataclass
 from threading import Thread
 from typing import Generator
+from uuid import UUID
 
 from flask import current_app
 from injector import inject
 from langchain_core.messages import HumanMessage
 from langchain_openai import ChatOpenAI
 
-from internal.core.agent.agents import FunctionCallAgent
+from internal.core.agent.agents import FunctionCallAgent, AgentQueueManager
 from internal.core.agent.entities import AgentConfig
 from internal.core.agent.entities.queue_entity import QueueEvent
 from internal.core.memory import TokenBufferMemory
 from internal.entity.app_entity import AppStatus
 from internal.entity.conversation_entity import InvokeFrom, MessageStatus
 from internal.entity.dataset_entity import RetrievalSource
-from internal.exception import NotFoundException, ForbiddenException
+from internal.exception import NotFoundException, ForbiddenException, FailException
 from internal.model import Account, EndUser, Conversation, Message
 from internal.schema.openapi_schema import OpenAPIChatReq
 from pkg.response import Response
@@ -45,6 +46,22 @@ class OpenApiService(BaseService):
     retrieval_service: RetrievalService
     conversation_service: ConversationService
 
+    def resume_chat(self, task_id: UUID, last_event_id: str, account: Account) -> Generator:
+        """断线后继续读取开放API指定任务的流式对话事件 从 last_event_id 之后开始 未传递时从头读取"""
+        agent_queue_manager = AgentQueueManager(user_id=account.id, invoke_from=InvokeFrom.DEBUGGER)
+        if not agent_queue_manager.event_bus.resumable:
+            raise FailException("当前事件总线不支持断线续读")
+
+        task_meta = AgentQueueManager.get_task_meta(task_id, InvokeFrom.DEBUGGER, account.id)
+        if task_meta is None:
+            raise NotFoundException("该对话任务不存在或已过期")
+
+        def handle_stream() -> Generator:
+            for agent_thought in agent_queue_manager.listen(task_id, last_event_id or None):
+                yield self.app_service.build_sse_event(agent_thought, **task_meta)
+
+        return handle_stream()
+
     def chat(self, req: OpenAPIChatReq, account: Account):
         """开放API 发起对话，返回块内容或生成器"""
 
@@ -126,6 +143,7 @@ class OpenApiService(BaseService):
             "messages": [HumanMessage(req.query.data)],
             "long_term_memory": conversation.summary,
             "history": history,
+            "task_id": uuid.uuid4(),
         }
 
         # 判断传递的 stream 流式响应/块响应
@@ -140,6 +158,10 @@ class OpenApiService(BaseService):
                     account_id: str,
                     app_id: str) -> Generator:
                 """函数返回 yield 作为生成器"""
+                # 事件总线支持断线续读时记录任务元数据 客户端断线后可携带最后收到的事件id继续读取
+                task_meta = {"end_user_id": end_user_id, "conversation_id": conversation_id, "message_id": message_id}
+                if agent.agent_queue_manager.event_bus.resumable:
+                    agent.agent_queue_manager.set_task_meta(agent_state["task_id"], task_meta)
 
                 for agent_thought in agent.stream(agent_state):
                     event_id = str(agent_thought.id)
@@ -156,17 +178,7 @@ class OpenApiService(BaseService):
                                 })
                         else:
                             agent_thoughts[event_id] = agent_thought
-                    data = {
-                        **agent_thought.model_dump(include={
-                            "event", "thought", "observation", "tool", "tool_input", "answer", "latency",
-                        }),
-                        "id": event_id,
-                        "end_user_id": end_user_id,
-                        "conversation_id": conversation_id,
-                        "message_id": message_id,
-                        "task_id": str(agent_thought.task_id),
-                    }
-                    yield f"event: {agent_thought.event}\ndata: {json.dumps(data)}\n\n"
+                    yield self.app_service.build_sse_event(agent_thought, **task_meta)
 
                 # 将消息以及推理过程添加到数据库记录
                 thread = Thread(target=self.conversation_service.save_agent_thoughts, kwargs={
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   rerank_service
+@Time   :   2026/10/19 09:20
+@Author :   s.qiu@foxmail.com
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import wait
+from pathlib import Path
+from typing import Optional
+
+from injector import inject, singleton
+from langchain_core.documents import Document as LCDocument
+
+from internal.core.embeddings_executor import EmbeddingsExecutor
+from internal.core.embeddings_executor.embeddings_executor import QUERY_PRIORITY
+from internal.core.reranker import CrossEncoderScorer, encode_pair
+from .embeddings_service import EmbeddingsService
+
+
+@inject
+@singleton
+class RerankService:
+    """交叉编码器重排服务 模型在后台线程懒加载 加载完成前检索结果保持原有排序"""
+
+    def __init__(self, embeddings_service: EmbeddingsService):
+        self.embeddings_service = embeddings_service
+        self._executor: Optional[EmbeddingsExecutor] = None
+        self._loading = False
+        self._lock = threading.Lock()
+
+        self._base_cache_dir = Path(os.getcwd()) / "internal" / "core" / "embeddings"
+        self._model_repo_id = os.getenv("RERANK_MODEL", "Alibaba-NLP/gte-multilingual-reranker-base")
+
+    def rerank(
+            self, query: str, documents: list[LCDocument], top_k: int, budget_ms: int,
+    ) -> tuple[list[LCDocument], bool]:
+        """在延迟预算内对候选文档重排并返回前 top_k 条及是否完成重排
+        模型未加载、超出预算或执行失败时返回原有排序 调用方据此判断结果能否按重排结果缓存
+        """
+        if len(documents) <= 1:
+            return documents[:top_k], True
+
+        executor = self._get_executor()
+        if executor is None:
+            return documents[:top_k], False
+
+        # 根据历史吞吐量预估耗时 明显超出预算时直接跳过
+        budget = budget_ms / 1000
+        chunks_per_second = executor.metrics["busy_chunks_per_second"]
+        if chunks_per_second and len(documents) / chunks_per_second > budget:
+            logging.warning(f"重排预估耗时超出预算，跳过重排，候选数量: {len(documents)}，预算: {budget_ms}ms")
+            return documents[:top_k], False
+
+        start_at = time.perf_counter()
+        futures = executor.submit_documents(
+            [encode_pair(query, document.page_content) for document in documents],
+            priority=QUERY_PRIORITY,
+        )
+        _, not_done = wait(futures, timeout=budget)
+        if not_done:
+            for future in futures:
+                future.cancel()
+            logging.warning(f"重排超出延迟预算，返回原有排序，候选数量: {len(documents)}，预算: {budget_ms}ms")
+            return documents[:top_k], False
+
+        try:
+            scores = [future.result()[0] for future in futures]
+        except Exception as e:
+            logging.exception(f"重排执行失败，返回原有排序，错误信息：{str(e)}")
+            return documents[:top_k], False
+
+        for document, score in zip(documents, scores):
+            document.metadata["rerank_score"] = score
+        reranked = [document for _, document in sorted(zip(scores, documents), key=lambda item: item[0], reverse=True)]
+        logging.debug(f"重排完成，候选数量: {len(documents)}，耗时: {(time.perf_counter() - start_at) * 1000:.1f}ms")
+        return reranked[:top_k], True
+
+    def _get_executor(self) -> Optional[EmbeddingsExecutor]:
+        """获取重排执行器 未加载时在后台线程加载模型 避免首个请求承担加载耗时"""
+        if self._executor is not None:
+            return self._executor
+        with self._lock:
+            if not self._loading:
+                self._loading = True
+                threading.Thread(target=self._load_model, name="rerank-loader", daemon=True).start()
+        return None
+
+    def _load_model(self) -> None:
+        """加载交叉编码器 通过批量执行器统一组批推理"""
+        try:
+            from sentence_transformers import CrossEncoder
+
+            cross_encoder = CrossEncoder(
+                self._resolve_model_path(),
+                device="cpu",
+                max_length=int(os.getenv("RERANK_MAX_LENGTH", 512)),
+                trust_remote_code=True,
+                local_files_only=True,
+                cache_folder=str(self._base_cache_dir),
+            )
+            self._executor = EmbeddingsExecutor(
+                CrossEncoderScorer(cross_encoder),
+                token_counter=self.embeddings_service.calculate_token_count,
+                max_batch_tokens=int(os.getenv("RERANK_MAX_BATCH_TOKENS", 8192)),
+                max_batch_size=int(os.getenv("RERANK_MAX_BATCH_SIZE", 32)),
+                max_wait_ms=int(os.getenv("RERANK_MAX_WAIT_MS", 2)),
+            )
+        except Exception as e:
+            logging.exception(f"重排模型加载失败，错误信息：{str(e)}")
+            with self._lock:
+                self._loading = False
+
+    def _resolve_model_path(self) -> str:
+        """解析本地模型路径 如果存在 snapshot 则使用具体路径"""
+        snapshots_path = self._base_cache_dir / f"models--{self._model_repo_id.replace('/', '--')}" / "snapshots"
+        if snapshots_path.exists():
+            subdirs = [d for d in snapshots_path.iterdir() if d.is_dir()]
+            if subdirs:
+                return str(subdirs[0])
+        return self._model_repo_id
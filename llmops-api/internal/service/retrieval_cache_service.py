@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   retrieval_cache_service
+@Time   :   2026/10/18 22:40
+@Author :   s.qiu@foxmail.com
+"""
+import json
+import os
+import re
+from dataclasses import dataclass
+from hashlib import sha256
+from typing import Any, Optional
+from uuid import UUID
+
+from injector import inject
+from redis import Redis
+
+from internal.entity.cache_entity import (
+    RETRIEVAL_CACHE_KEY,
+    RETRIEVAL_CACHE_METRICS,
+    RETRIEVAL_DATASET_VERSION,
+)
+
+
+@inject
+@dataclass
+class RetrievalCacheService:
+    """检索结果缓存服务
+    缓存键包含各知识库的版本号 知识库下的片段、启用状态、关键词发生变化时递增版本号 旧缓存自然失效并随TTL过期
+    """
+    redis_client: Redis
+
+    @property
+    def enabled(self) -> bool:
+        return os.getenv("RETRIEVAL_CACHE_ENABLED", "true").lower() == "true"
+
+    def bump_dataset_version(self, dataset_id: UUID) -> None:
+        """递增知识库版本号 使该知识库相关的检索缓存失效"""
+        self.redis_client.incr(RETRIEVAL_DATASET_VERSION.format(dataset_id=dataset_id))
+
+    def build_key(self, dataset_ids: list[UUID], query: str, **kwargs: Any) -> str:
+        """根据 知识库id+版本号、归一化后的query、检索参数 生成缓存键 需在检索执行前生成"""
+        sorted_ids = sorted(str(dataset_id) for dataset_id in dataset_ids)
+        versions = self.redis_client.mget(
+            [RETRIEVAL_DATASET_VERSION.format(dataset_id=dataset_id) for dataset_id in sorted_ids]
+        )
+        payload = json.dumps({
+            "datasets": [[dataset_id, int(version or 0)] for dataset_id, version in zip(sorted_ids, versions)],
+            "query": self.normalize_query(query),
+            **kwargs,
+        }, sort_keys=True, ensure_ascii=False, default=str)
+        return RETRIEVAL_CACHE_KEY.format(hash=sha256(payload.encode()).hexdigest())
+
+    def get(self, cache_key: str) -> Optional[list[tuple[str, float]]]:
+        """读取缓存的检索结果 按排名返回 (片段id, 得分) 列表"""
+        value = self.redis_client.get(cache_key)
+        self.redis_client.hincrby(RETRIEVAL_CACHE_METRICS, "misses" if value is None else "hits", 1)
+        if value is None:
+            return None
+        return [(segment_id, score) for segment_id, score in json.loads(value)]
+
+    def set(self, cache_key: str, results: list[tuple[str, float]]) -> None:
+        """写入检索结果"""
+        self.redis_client.set(
+            cache_key,
+            json.dumps(results),
+            ex=int(os.getenv("RETRIEVAL_CACHE_TTL", 3600)),
+        )
+
+    def metrics(self) -> dict:
+        """缓存命中统计"""
+        values = self.redis_client.hgetall(RETRIEVAL_CACHE_METRICS)
+        hits = int(values.get(b"hits", 0))
+        misses = int(values.get(b"misses", 0))
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0,
+        }
+
+    @classmethod
+    def normalize_query(cls, query: str) -> str:
+        """归一化query 去除首尾空白、合并连续空白、统一小写"""
+        return re.sub(r"\s+", " ", query).strip().lower()
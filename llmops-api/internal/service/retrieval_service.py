@@ -5,34 +5,55 @@
 @Time   :   2026/1/16
 @Author :   s.qiu@foxmail.com
 """
+import json
+import os
 from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
 from uuid import UUID
 
-from flask import Flask
+from flask import Flask, current_app
 from injector import inject
-from langchain_classic.retrievers import EnsembleRetriever
 from langchain_core.documents import Document as LCDocument
 from langchain_core.tools import tool
 from pydantic import BaseModel, Field
-from sqlalchemy import update
+from redis import Redis
+from redis.exceptions import ResponseError
+from sqlalchemy import update, insert, values, column, cast, Integer
 
 from internal.core.agent.entities.agent_entity import DATASET_RETRIEVAL_TOOL_NAME
-from internal.entity.dataset_entity import RetrievalStrategy, RetrievalSource
+from internal.entity.cache_entity import (
+    LOCK_EXPIRE_TIME,
+    LOCK_RETRIEVAL_FLUSH_RECORDS,
+    RETRIEVAL_QUERY_BUFFER,
+    RETRIEVAL_HIT_COUNT_BUFFER,
+)
+from internal.entity.dataset_entity import RetrievalStrategy, RetrievalSource, DEFAULT_HYBRID_ALPHA
 from internal.exception import NotFoundException
 from internal.lib.helper import combine_documents
 from internal.model import Dataset, DatasetQuery, Segment
 from internal.service.base_service import BaseService
+from internal.service.enabled_filter_service import EnabledFilterService
 from internal.service.jieba_service import JiebaService
+from internal.service.rerank_service import RerankService
+from internal.service.retrieval_cache_service import RetrievalCacheService
 from internal.service.vector_database_service import VectorDatabaseService
 from pkg.sqlalchemy import SQLAlchemy
 
+# 每批刷写的查询记录数量
+FLUSH_BATCH_SIZE = 1000
+
 
 @inject
 @dataclass
 class RetrievalService(BaseService):
     """检索服务"""
     db: SQLAlchemy
+    redis_client: Redis
     jieba_service: JiebaService
+    retrieval_cache_service: RetrievalCacheService
+    rerank_service: RerankService
+    enabled_filter_service: EnabledFilterService
     vector_database_service: VectorDatabaseService
 
     def search_in_datasets(
@@ -44,6 +65,9 @@ class RetrievalService(BaseService):
             k: int = 4,
             score: float = 0,
             retrival_source: str = RetrievalSource.HIT_TESTING,
+            alpha: float = None,
+            rerank: dict = None,
+            use_cache: bool = True,
     ) -> list[LCDocument]:
         """知识库检索 返回检索文档+得分 全文检索则得分为0"""
 
@@ -56,12 +80,68 @@ class RetrievalService(BaseService):
             raise NotFoundException("当前无知识库可进行检索")
         dataset_ids = [datasets.id for datasets in datasets]
 
+        # 相同知识库版本下的相同检索直接读取缓存结果
+        use_cache = use_cache and self.retrieval_cache_service.enabled
+        cache_key = None
+        cached_results = None
+        if use_cache:
+            cache_key = self.retrieval_cache_service.build_key(
+                dataset_ids, query, retrieval_strategy=retrieval_strategy, k=k, score=score, alpha=alpha, rerank=rerank,
+            )
+            cached_results = self.retrieval_cache_service.get(cache_key)
+
+        if cached_results is not None:
+            lc_documents = self._load_cached_documents(cached_results)
+        else:
+            if rerank and rerank.get("enable"):
+                # 先低成本召回较多候选 再由交叉编码器在延迟预算内重排出前 k 条
+                candidates, degraded = self._retrieve(
+                    dataset_ids, query, retrieval_strategy, max(rerank["candidates"], k), score, alpha,
+                )
+                lc_documents, reranked = self.rerank_service.rerank(query, candidates, k, rerank["budget_ms"])
+                # 未完成重排时为原有排序 不能按重排结果缓存
+                use_cache = use_cache and reranked
+            else:
+                lc_documents, degraded = self._retrieve(dataset_ids, query, retrieval_strategy, k, score, alpha)
+            # 混合检索丢弃了部分分支/租户时结果不完整 不写入缓存 避免在缓存有效期内持续返回降级结果
+            use_cache = use_cache and not degraded
+            if use_cache:
+                self.retrieval_cache_service.set(cache_key, [
+                    (str(lc_document.metadata["segment_id"]), lc_document.metadata.get("score", 0))
+                    for lc_document in lc_documents
+                ])
+
+        # 查询记录与命中次数写入缓冲 由定时任务批量刷写到数据库 检索耗时不再依赖数据库写入
+        self._buffer_retrieval_records(lc_documents, query, retrival_source, account_id)
+
+        return lc_documents
+
+    def _retrieve(
+            self,
+            dataset_ids: list[UUID],
+            query: str,
+            retrieval_strategy: str,
+            k: int,
+            score: float,
+            alpha: Optional[float],
+    ) -> tuple[list[LCDocument], bool]:
+        """按检索策略执行检索 返回检索文档与结果是否降级(混合检索丢弃了部分分支/租户)"""
         # 构建不同种类检索器
-        from internal.core.retrievers import SemanticRetriever, FullTextRetriever
+        from internal.core.retrievers import SemanticRetriever, FullTextRetriever, HybridRetriever, NativeHybridRetriever
+        # 多租户模式下直接定位各知识库租户 尚未写入过向量的知识库没有租户
+        tenants = None
+        if self.vector_database_service.use_tenants:
+            tenants = self.vector_database_service.get_existing_tenants(dataset_ids)
+
+        # 启用状态由 Redis 禁用集合过滤时 向量检索超量召回后过滤
+        enabled_filter = self.enabled_filter_service if self.enabled_filter_service.active else None
+
         # 相似性/向量 检索器
         semantic_retriever = SemanticRetriever(
             dataset_ids=dataset_ids,
             vector_store=self.vector_database_service.vector_store,
+            tenants=tenants,
+            enabled_filter=enabled_filter,
             search_kwargs={"k": k, "score_threshold": score},
         )
         # 全文检索器
@@ -71,40 +151,142 @@ class RetrievalService(BaseService):
             jieba_services=self.jieba_service,
             search_kwargs={"k": k},
         )
-        # 混合检索器
-        hybrid_retriever = EnsembleRetriever(retrievers=[semantic_retriever, full_text_retriever], weights=[0.5, 0.5])
+        # 混合检索器 两个分支并发执行 单个分支超时则退化为另一分支的结果
+        hybrid_retriever = HybridRetriever(
+            flask_app=current_app._get_current_object(),
+            retrievers=[semantic_retriever, full_text_retriever],
+            weights=[0.5, 0.5],
+            timeout=float(os.getenv("HYBRID_RETRIEVAL_TIMEOUT", 3)),
+        )
+
+        # Weaviate 原生混合检索器 单次请求完成 BM25+向量 检索
+        native_hybrid_retriever = NativeHybridRetriever(
+            dataset_ids=dataset_ids,
+            collection=self.vector_database_service.collection,
+            embeddings=self.vector_database_service.embeddings_service.cache_backed_embeddings,
+            tenants=tenants,
+            enabled_filter=enabled_filter,
+            search_kwargs={"k": k, "score_threshold": score, "alpha": DEFAULT_HYBRID_ALPHA if alpha is None else alpha},
+        )
 
         # 执行不同检索策略
         if retrieval_strategy == RetrievalStrategy.SEMANTIC:
-            lc_documents = semantic_retriever.invoke(query)[:k]
+            return semantic_retriever.invoke(query)[:k], False
         elif retrieval_strategy == RetrievalStrategy.FULL_TEXT:
-            lc_documents = full_text_retriever.invoke(query)[:k]
+            return full_text_retriever.invoke(query)[:k], False
+        elif retrieval_strategy == RetrievalStrategy.NATIVE_HYBRID:
+            return native_hybrid_retriever.invoke(query)[:k], native_hybrid_retriever.degraded
         else:
-            lc_documents = hybrid_retriever.invoke(query)[:k]
-
-        # 知识库查询记录 存储唯一记录
-        unique_dataset_ids = list(set(str(lc_document.metadata["dataset_id"]) for lc_document in lc_documents))
-        for dataset_id in unique_dataset_ids:
-            self.create(
-                DatasetQuery,
-                dataset_id=dataset_id,
-                query=query,
-                source=retrival_source,
-                # todo:等待APP配置模块完成后进行调整
-                source_app_id=None,
-                created_by=account_id,
-            )
+            return hybrid_retriever.invoke(query)[:k], hybrid_retriever.degraded
+
+    def _load_cached_documents(self, cached_results: list[tuple[str, float]]) -> list[LCDocument]:
+        """根据缓存的 (片段id, 得分) 列表加载片段 按缓存中的排名构建 langchain 文档"""
+        segments = self.db.session.query(Segment).filter(
+            Segment.id.in_([segment_id for segment_id, _ in cached_results])
+        ).all()
+        segment_dict = {str(segment.id): segment for segment in segments}
 
-        # 更新片段的命中次数 召回次数
-        with self.db.auto_commit():
-            stmt = (
-                update(Segment)
-                .where(Segment.id.in_([lc_document.metadata["segment_id"] for lc_document in lc_documents]))
-                .values(hit_count=Segment.hit_count + 1)
+        return [
+            LCDocument(
+                page_content=segment_dict[segment_id].content,
+                metadata={
+                    "account_id": str(segment_dict[segment_id].account_id),
+                    "dataset_id": str(segment_dict[segment_id].dataset_id),
+                    "document_id": str(segment_dict[segment_id].document_id),
+                    "segment_id": segment_id,
+                    "node_id": str(segment_dict[segment_id].node_id),
+                    "document_enabled": True,
+                    "segment_enabled": True,
+                    "score": score,
+                },
             )
-            self.db.session.execute(stmt)
+            for segment_id, score in cached_results
+            if segment_id in segment_dict
+        ]
 
-        return lc_documents
+    def _buffer_retrieval_records(
+            self,
+            lc_documents: list[LCDocument],
+            query: str,
+            retrival_source: str,
+            account_id: UUID,
+    ) -> None:
+        """将知识库查询记录(每个命中知识库一条)与片段命中次数增量写入 Redis 缓冲"""
+        if not lc_documents:
+            return
+
+        created_at = datetime.now().isoformat()
+        unique_dataset_ids = list(dict.fromkeys(str(lc_document.metadata["dataset_id"]) for lc_document in lc_documents))
+
+        pipeline = self.redis_client.pipeline(transaction=False)
+        pipeline.rpush(RETRIEVAL_QUERY_BUFFER, *[
+            json.dumps({
+                "dataset_id": dataset_id,
+                "query": query,
+                "source": retrival_source,
+                # todo:等待APP配置模块完成后进行调整
+                "source_app_id": None,
+                "created_by": str(account_id),
+                "created_at": created_at,
+            })
+            for dataset_id in unique_dataset_ids
+        ])
+        for lc_document in lc_documents:
+            pipeline.hincrby(RETRIEVAL_HIT_COUNT_BUFFER, str(lc_document.metadata["segment_id"]), 1)
+        pipeline.execute()
+
+    def flush_retrieval_records(self) -> None:
+        """将缓冲中的查询记录批量插入 命中次数按片段聚合后一次性累加"""
+        lock = self.redis_client.lock(LOCK_RETRIEVAL_FLUSH_RECORDS, timeout=LOCK_EXPIRE_TIME)
+        if not lock.acquire(blocking=False):
+            return
+
+        try:
+            # 查询记录
+            query_buffer = self._claim_buffer(RETRIEVAL_QUERY_BUFFER)
+            if query_buffer is not None:
+                total = self.redis_client.llen(query_buffer)
+                with self.db.auto_commit():
+                    for i in range(0, total, FLUSH_BATCH_SIZE):
+                        records = self.redis_client.lrange(query_buffer, i, i + FLUSH_BATCH_SIZE - 1)
+                        rows = [json.loads(record) for record in records]
+                        for row in rows:
+                            row["created_at"] = datetime.fromisoformat(row["created_at"])
+                        self.db.session.execute(insert(DatasetQuery), rows)
+                self.redis_client.delete(query_buffer)
+
+            # 片段命中次数
+            hit_count_buffer = self._claim_buffer(RETRIEVAL_HIT_COUNT_BUFFER)
+            if hit_count_buffer is not None:
+                increments = self.redis_client.hgetall(hit_count_buffer)
+                if increments:
+                    increments_table = values(
+                        column("id", Segment.id.type),
+                        column("count", Integer),
+                        name="increments",
+                    ).data([(UUID(segment_id.decode()), int(count)) for segment_id, count in increments.items()])
+                    with self.db.auto_commit():
+                        # VALUES 中的参数没有类型 Postgres 推断为 text 需显式转换为 uuid 才能与片段id比较
+                        self.db.session.execute(
+                            update(Segment)
+                            .where(Segment.id == cast(increments_table.c.id, Segment.id.type))
+                            .values(hit_count=Segment.hit_count + increments_table.c.count)
+                        )
+                self.redis_client.delete(hit_count_buffer)
+        finally:
+            lock.release()
+
+    def _claim_buffer(self, key: str) -> Optional[str]:
+        """将写缓冲原子地重命名为待刷写键 新的检索记录写入新的缓冲 上次刷写失败遗留的待刷写键优先处理"""
+        processing_key = f"{key}:flushing"
+        if self.redis_client.exists(processing_key):
+            return processing_key
+        try:
+            self.redis_client.rename(key, processing_key)
+        except ResponseError:
+            # 缓冲为空(键不存在)
+            return None
+        return processing_key
 
     def create_langchain_tool_from_search(
             self,
@@ -115,6 +297,8 @@ class RetrievalService(BaseService):
             k: int = 4,
             score: float = 0,
             retrival_source: str = RetrievalSource.HIT_TESTING,
+            alpha: float = None,
+            rerank: dict = None,
     ):
         """构建一个 LangChain知识库检索工具"""
 
@@ -135,6 +319,8 @@ class RetrievalService(BaseService):
                     k=k,
                     score=score,
                     retrival_source=retrival_source,
+                    alpha=alpha,
+                    rerank=rerank,
                 )
 
             # 将LangChain文档列表转换成字符串后返回
@@ -25,8 +25,10 @@ from pkg.paginator import Paginator
 from pkg.sqlalchemy import SQLAlchemy
 from .base_service import BaseService
 from .embeddings_service import EmbeddingsService
+from .enabled_filter_service import EnabledFilterService
 from .jieba_service import JiebaService
 from .keyword_table_service import KeywordTableService
+from .retrieval_cache_service import RetrievalCacheService
 from .vector_database_service import VectorDatabaseService
 from ..entity.cache_entity import LOCK_SEGMENT_UPDATE_ENABLED, LOCK_EXPIRE_TIME
 
@@ -41,6 +43,8 @@ class SegmentService(BaseService):
     embeddings_service: EmbeddingsService
     vector_database_service: VectorDatabaseService
     keyword_table_service: KeywordTableService
+    retrieval_cache_service: RetrievalCacheService
+    enabled_filter_service: EnabledFilterService
 
     def get_segments_with_page(self, dataset_id: UUID, document_id: UUID, req: CreateSegmentReq, account: Account
                                ) -> tuple[list[Segment], Paginator]:
@@ -115,19 +119,22 @@ class SegmentService(BaseService):
                                   completed_at=datetime.now(),
                                   status=SegmentStatus.COMPLETED)
 
-            # 向量数据库新增数据
-            self.vector_database_service.vector_store.add_documents([
-                LCDocument(page_content=req.content.data,
-                           metadata={
-                               "account_id": str(document.account_id),
-                               "dataset_id": str(document.dataset_id),
-                               "document_id": str(document.id),
-                               "segment_id": str(segment.id),
-                               "node_id": str(segment.node_id),
-                               "document_enabled": document.enabled,
-                               "segment_enabled": True,
-                           })],
-                ids=[str(segment.node_id)])
+            # 向量数据库新增数据 多租户模式下写入知识库对应的租户
+            failed_node_ids = self.vector_database_service.add_documents_with_vectors(
+                [LCDocument(page_content=req.content.data,
+                            metadata={
+                                "account_id": str(document.account_id),
+                                "dataset_id": str(document.dataset_id),
+                                "document_id": str(document.id),
+                                "segment_id": str(segment.id),
+                                "node_id": str(segment.node_id),
+                                "document_enabled": document.enabled,
+                                "segment_enabled": True,
+                            })],
+                self.embeddings_service.cache_backed_embeddings.embed_documents([req.content.data]),
+            )
+            if failed_node_ids:
+                raise FailException("向量数据库写入失败")
 
             # 更新文档的 字符总数 以及 token 数
             document_character_count, document_token_count = self.db.session.query(
@@ -150,6 +157,8 @@ class SegmentService(BaseService):
                     disabled_at=datetime.now(),
                     stopped_at=datetime.now(),
                 )
+                if self.enabled_filter_service.active:
+                    self.enabled_filter_service.set_segment_enabled(dataset_id, segment.id, False)
             raise FailException("新增文档片段失败")
 
     def update_segment(self, dataset_id: UUID, document_id: UUID, segment_id: UUID, req: UpdateSegmentReq,
@@ -197,11 +206,12 @@ class SegmentService(BaseService):
                     func.coalesce(func.sum(Segment.token_count), 0),
                 ).first()
                 self.update(document, character_count=document_character_count, token_count=document_token_count)
-                self.vector_database_service.collection.data.update(
+                self.vector_database_service.get_collection(dataset_id).data.update(
                     uuid=str(segment.node_id),
                     properties={"text": req.content.data},
-                    vector=self.embeddings_service.embeddings.embed_query(req.content.data)
+                    vector=self.embeddings_service.cache_backed_embeddings.embed_documents([req.content.data])[0]
                 )
+                self.retrieval_cache_service.bump_dataset_version(dataset_id)
         except Exception as e:
             logging.exception(f"更新文档片段失败，segment_id={segment.id}，错误信息{str(e)}")
             raise FailException("更新文档片段失败")
@@ -241,9 +251,13 @@ class SegmentService(BaseService):
                     self.keyword_table_service.add_keyword_table_from_ids(dataset_id, [segment_id])
                 else:
                     self.keyword_table_service.delete_keyword_table_from_ids(dataset_id, [segment_id])
-                # 更新向量数据库该条数据状态
-                self.vector_database_service.collection.data.update(
-                    uuid=segment.node_id, properties={"segment_enabled": enabled})
+                # 更新向量数据库该条数据状态 由 Redis 禁用集合过滤时无需改写向量数据库
+                if self.enabled_filter_service.active:
+                    self.enabled_filter_service.set_segment_enabled(dataset_id, segment_id, enabled)
+                else:
+                    self.vector_database_service.get_collection(dataset_id).data.update(
+                        uuid=segment.node_id, properties={"segment_enabled": enabled})
+                self.retrieval_cache_service.bump_dataset_version(dataset_id)
             except Exception as e:
                 logging.exception(f"更改片段启用状态失败，segment_id:{segment_id}，错误信息：{str(e)}")
                 self.update(segment,
@@ -252,6 +266,8 @@ class SegmentService(BaseService):
                             status=SegmentStatus.ERROR,
                             disabled_at=datetime.now(),
                             stopped_at=datetime.now())
+                if self.enabled_filter_service.active:
+                    self.enabled_filter_service.set_segment_enabled(dataset_id, segment_id, False)
                 raise FailException("更新文档片段状态失败")
 
         return segment
@@ -274,9 +290,10 @@ class SegmentService(BaseService):
         self.delete(segment)
         self.keyword_table_service.delete_keyword_table_from_ids(dataset_id, [segment_id])
         try:
-            self.vector_database_service.collection.data.delete_by_id(str(segment.node_id))
+            self.vector_database_service.get_collection(dataset_id).data.delete_by_id(str(segment.node_id))
         except Exception as e:
             logging.exception(f"删除片段失败，segment_id:{segment_id}，错误信息：{str(e)}")
+        self.retrieval_cache_service.bump_dataset_version(dataset_id)
 
         # 更新文档、重新计算 字符数、token数
         document_character_count, document_token_count = self.db.session.query(
@@ -6,6 +6,8 @@
 @Author :   s.qiu@foxmail.com
 """
 import os
+from typing import Optional
+from uuid import UUID
 
 import weaviate
 from injector import inject
@@ -13,18 +15,26 @@ from langchain_core.documents import Document
 from langchain_core.vectorstores import VectorStoreRetriever
 from langchain_weaviate import WeaviateVectorStore
 from weaviate import WeaviateClient
+from weaviate.classes.config import Configure
+from weaviate.classes.query import Filter
+from weaviate.classes.tenants import Tenant
 from weaviate.collections import Collection
 
 from .embeddings_service import EmbeddingsService
 
 COLLECTION_NAME = "Dataset"
 
+# 多租户集合 每个知识库对应一个租户(租户名为知识库id) 检索时直接定位租户 无需按 dataset_id 过滤
+TENANT_COLLECTION_NAME = "DatasetTenant"
+
+# 按id批量读取/写入向量时的单批数量
+VECTOR_BATCH_SIZE = 500
+
 
 @inject
 class VectorDatabaseService:
     """向量数据库服务"""
     client: WeaviateClient
-    vector_store: WeaviateVectorStore
     embeddings_service: EmbeddingsService
 
     def __init__(self, embeddings_service: EmbeddingsService):
@@ -36,21 +46,196 @@ class VectorDatabaseService:
             grpc_port=os.getenv("WEAVIATE_PORT"),
         )
 
-        self.vector_store = WeaviateVectorStore(
-            client=self.client,
-            index_name=COLLECTION_NAME,
-            text_key="text",
-            embedding=self.embeddings_service.embeddings
-        )
+        # 向量存储在首次使用时创建 避免依赖注入阶段触发模型加载 模型由进程启动时的预热阶段加载
+        self._vector_store: Optional[WeaviateVectorStore] = None
+
+        # 已确认存在的租户
+        self._tenants: set[str] = set()
+        self._tenant_collection_ready = False
+
+    @property
+    def use_tenants(self) -> bool:
+        """是否按知识库划分租户存储向量 shared: 所有知识库共用一个集合 dataset: 每个知识库一个租户"""
+        return os.getenv("VECTOR_STORE_TENANCY", "shared") == "dataset"
+
+    @property
+    def collection_name(self) -> str:
+        return TENANT_COLLECTION_NAME if self.use_tenants else COLLECTION_NAME
+
+    @property
+    def vector_store(self) -> WeaviateVectorStore:
+        """langChain 向量存储 多租户模式下检索/写入时需传递 tenant 参数"""
+        if self._vector_store is None:
+            self._vector_store = WeaviateVectorStore(
+                client=self.client,
+                index_name=self.collection_name,
+                text_key="text",
+                embedding=self.embeddings_service.cache_backed_embeddings,
+                use_multi_tenancy=self.use_tenants,
+            )
+        return self._vector_store
+
+    def get_collection(self, dataset_id: UUID) -> Collection:
+        """获取指定知识库所在的集合 多租户模式下返回该知识库租户的集合(不存在则创建)"""
+        if not self.use_tenants:
+            return self.collection
+        self.ensure_tenants([str(dataset_id)])
+        return self.collection.with_tenant(str(dataset_id))
+
+    def ensure_tenants(self, tenants: list[str]) -> None:
+        """确保租户存在"""
+        missing = [tenant for tenant in tenants if tenant not in self._tenants]
+        if not missing:
+            return
+        collection = self._get_tenant_collection()
+        existing = collection.tenants.get_by_names(missing)
+        to_create = [tenant for tenant in missing if tenant not in existing]
+        if to_create:
+            collection.tenants.create([Tenant(name=tenant) for tenant in to_create])
+        self._tenants.update(missing)
+
+    def get_existing_tenants(self, dataset_ids: list[UUID]) -> list[str]:
+        """获取知识库列表中已创建租户的知识库id 未写入过向量的知识库没有租户"""
+        names = [str(dataset_id) for dataset_id in dataset_ids]
+        existing = self._get_tenant_collection().tenants.get_by_names(names)
+        self._tenants.update(existing)
+        return [name for name in names if name in existing]
+
+    def delete_dataset_vectors(self, dataset_id: UUID) -> None:
+        """删除知识库下的全部向量 多租户模式下直接删除租户"""
+        if self.use_tenants:
+            self.collection.tenants.remove([str(dataset_id)])
+            self._tenants.discard(str(dataset_id))
+        else:
+            self.collection.data.delete_many(where=Filter.by_property("dataset_id").equal(str(dataset_id)))
 
     def get_retriever(self) -> VectorStoreRetriever:
         """获取检索器"""
         return self.vector_store.as_retriever()
 
+    def get_vectors(self, dataset_id: UUID, node_ids: list[str]) -> dict[str, list[float]]:
+        """批量获取指定知识库下 node_id 对应的向量 返回 node_id->向量 字典"""
+        collection = self.get_collection(dataset_id)
+        vectors = {}
+        for i in range(0, len(node_ids), VECTOR_BATCH_SIZE):
+            response = collection.query.fetch_objects(
+                filters=Filter.by_id().contains_any(node_ids[i: i + VECTOR_BATCH_SIZE]),
+                include_vector=True,
+                limit=VECTOR_BATCH_SIZE,
+            )
+            for obj in response.objects:
+                vector = obj.vector.get("default") if isinstance(obj.vector, dict) else obj.vector
+                if vector:
+                    vectors[str(obj.uuid)] = vector
+        return vectors
+
+    def update_properties(self, dataset_id: UUID, node_ids: list[str], properties: dict) -> list[str]:
+        """批量更新指定知识库下 node_id 对应对象的属性 返回更新失败的 node_id 列表
+        Weaviate 不支持按条件批量更新 按批读取对象(含向量)合并属性后通过批量(gRPC)接口整体写回
+        """
+        collection = self.get_collection(dataset_id)
+        failed_node_ids = []
+        for i in range(0, len(node_ids), VECTOR_BATCH_SIZE):
+            batch_node_ids = node_ids[i: i + VECTOR_BATCH_SIZE]
+            response = collection.query.fetch_objects(
+                filters=Filter.by_id().contains_any(batch_node_ids),
+                include_vector=True,
+                limit=VECTOR_BATCH_SIZE,
+            )
+            fetched_node_ids = {str(obj.uuid) for obj in response.objects}
+            failed_node_ids.extend(node_id for node_id in batch_node_ids if node_id not in fetched_node_ids)
+
+            # 读取与写回使用同一个(租户)集合 失败对象记录在该集合的批量写入器上
+            with collection.batch.fixed_size(batch_size=VECTOR_BATCH_SIZE) as batch:
+                for obj in response.objects:
+                    batch.add_object(
+                        properties={**obj.properties, **properties},
+                        uuid=obj.uuid,
+                        vector=obj.vector.get("default") if isinstance(obj.vector, dict) else obj.vector,
+                    )
+            failed_node_ids.extend(
+                str(failed_object.object_.uuid) for failed_object in collection.batch.failed_objects
+            )
+
+        return failed_node_ids
+
+    def add_documents_with_vectors(self, documents: list[Document], vectors: list[list[float]]) -> list[str]:
+        """使用已计算的向量通过批量(gRPC)接口写入文档 跳过嵌入计算 返回写入失败的 node_id 列表
+        多个存储线程会并发调用 客户端级别的批量写入器在线程间共享 失败对象会相互覆盖
+        因此按知识库分组 每组通过本次调用获取的(租户)集合的批量写入器写入并读取失败对象
+        """
+        groups: dict[Optional[str], list[int]] = {}
+        for i, document in enumerate(documents):
+            dataset_id = str(document.metadata["dataset_id"]) if self.use_tenants else None
+            groups.setdefault(dataset_id, []).append(i)
+
+        failed_node_ids = []
+        for dataset_id, indexes in groups.items():
+            collection = self.get_collection(UUID(dataset_id)) if dataset_id else self.collection
+            with collection.batch.fixed_size(batch_size=VECTOR_BATCH_SIZE) as batch:
+                for i in indexes:
+                    batch.add_object(
+                        properties={**documents[i].metadata, "text": documents[i].page_content},
+                        uuid=documents[i].metadata["node_id"],
+                        vector=vectors[i],
+                    )
+            failed_node_ids.extend(
+                str(failed_object.object_.uuid) for failed_object in collection.batch.failed_objects
+            )
+        return failed_node_ids
+
+    def migrate_to_tenants(self, drop_source: bool = False, source_name: str = COLLECTION_NAME) -> dict[str, int]:
+        """将共享集合中的向量按 dataset_id 迁移到多租户集合 保留原有 uuid 与向量 返回每个知识库迁移的数量
+        源集合按顺序流式读取 对象所属租户交替出现 使用客户端级别的批量写入逐个对象指定租户 迁移为单线程执行
+        """
+        source = self.client.collections.get(source_name)
+        self._get_tenant_collection()
+
+        counts: dict[str, int] = {}
+        with self.client.batch.fixed_size(batch_size=VECTOR_BATCH_SIZE) as batch:
+            for obj in source.iterator(include_vector=True):
+                dataset_id = str(obj.properties["dataset_id"])
+                if dataset_id not in counts:
+                    self.ensure_tenants([dataset_id])
+                    counts[dataset_id] = 0
+                vector = obj.vector.get("default") if isinstance(obj.vector, dict) else obj.vector
+                batch.add_object(
+                    collection=TENANT_COLLECTION_NAME,
+                    properties=obj.properties,
+                    uuid=obj.uuid,
+                    vector=vector,
+                    tenant=dataset_id,
+                )
+                counts[dataset_id] += 1
+
+        failed_objects = self.client.batch.failed_objects
+        if failed_objects:
+            raise RuntimeError(f"向量迁移部分写入失败，失败数量: {len(failed_objects)}")
+
+        if drop_source:
+            self.client.collections.delete(source_name)
+        return counts
+
     @classmethod
     def combine_documents(cls, documents: list[Document]) -> str:
         return "\n\n".join([document.page_content for document in documents])
 
     @property
     def collection(self) -> Collection:
+        """当前模式下的集合 多租户模式下为未指定租户的集合"""
+        if self.use_tenants:
+            return self._get_tenant_collection()
         return self.client.collections.get(COLLECTION_NAME)
+
+    def _get_tenant_collection(self) -> Collection:
+        """获取多租户集合 不存在时创建"""
+        if not self._tenant_collection_ready:
+            if not self.client.collections.exists(TENANT_COLLECTION_NAME):
+                self.client.collections.create(
+                    TENANT_COLLECTION_NAME,
+                    # 其他进程删除租户后本进程的租户缓存可能过期 写入时自动创建租户
+                    multi_tenancy_config=Configure.multi_tenancy(enabled=True, auto_tenant_creation=True),
+                    vectorizer_config=Configure.Vectorizer.none(),
+                )
+            self._tenant_collection_ready = True
+        return self.client.collections.get(TENANT_COLLECTION_NAME)
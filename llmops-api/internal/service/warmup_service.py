@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   warmup_service
+@Time   :   2026/10/18 14:20
+@Author :   s.qiu@foxmail.com
+"""
+import logging
+import threading
+import time
+from typing import Optional
+
+from injector import inject, singleton
+
+from .embeddings_service import EmbeddingsService
+from .jieba_service import JiebaService
+
+
+@inject
+@singleton
+class WarmupService:
+    """进程预热服务 在 Celery 子进程/WSGI 工作进程启动时加载模型与词典 并记录就绪状态"""
+
+    def __init__(self, embeddings_service: EmbeddingsService, jieba_service: JiebaService):
+        self.embeddings_service = embeddings_service
+        self.jieba_service = jieba_service
+
+        self._lock = threading.Lock()
+        self._ready = False
+        self._warming_up = False
+        self._duration: Optional[float] = None
+        self._error: Optional[str] = None
+
+    def warm_up(self) -> None:
+        """同步执行预热 加载tiktoken编码、jieba词典与嵌入模型 并执行一次虚拟批次"""
+        with self._lock:
+            if self._ready or self._warming_up:
+                return
+            self._warming_up = True
+            self._error = None
+
+        start_at = time.perf_counter()
+        try:
+            self.embeddings_service.calculate_token_count("LLMOps warm up")
+            self.jieba_service.warm_up()
+            self.embeddings_service.warm_up()
+            self._ready = True
+        except Exception as e:
+            logging.exception(f"进程预热失败，错误信息：{str(e)}")
+            self._error = str(e)
+        finally:
+            self._duration = time.perf_counter() - start_at
+            self._warming_up = False
+
+        logging.info(f"进程预热结束，就绪状态: {self._ready}，耗时: {self._duration:.2f}s")
+
+    def warm_up_in_background(self) -> threading.Thread:
+        """在后台线程中执行预热 进程可先行启动 由就绪接口告知预热进度"""
+        thread = threading.Thread(target=self.warm_up, name="warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ready
+
+    @property
+    def status(self) -> dict:
+        """预热状态"""
+        return {
+            "ready": self._ready,
+            "warming_up": self._warming_up,
+            "duration": self._duration,
+            "error": self._error,
+        }
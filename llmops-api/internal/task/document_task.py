@@ -5,20 +5,34 @@
 @Time   :   2025/12/22 22:20
 @Author :   s.qiu@foxmail.com
 """
+import os
 from uuid import UUID
 
-from celery import shared_task
+from celery import shared_task, group
 
 
 @shared_task
 def build_documents(document_ids: list[UUID]) -> None:
-    """根据传递额文档id列表 构建文档"""
+    """根据传递额文档id列表 构建文档 开启扇出时将批次拆分为单文档子任务并行构建"""
+    if len(document_ids) > 1 and os.getenv("INDEXING_FAN_OUT", "False").lower() == "true":
+        group(build_document.s(document_id) for document_id in document_ids).apply_async()
+        return
+
     from app.http.module import injector
     from internal.service import IndexingService
     indexing_service = injector.get(IndexingService)
     indexing_service.build_documents(document_ids)
 
 
+@shared_task
+def build_document(document_id: UUID) -> None:
+    """根据传递的文档id 构建单个文档"""
+    from app.http.module import injector
+    from internal.service import IndexingService
+    indexing_service = injector.get(IndexingService)
+    indexing_service.build_documents([document_id])
+
+
 @shared_task
 def update_document_enabled(document_id: UUID) -> None:
     """根据传递的文档id修改文档的状态"""
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   test_agent_event_bus
+@Time   :   2026/10/21 09:30
+@Author :   s.qiu@foxmail.com
+"""
+import time
+import uuid
+
+from redis import Redis
+
+from app.http.module import injector
+from internal.core.agent.agents.agent_event_bus import LocalAgentEventBus, RedisStreamAgentEventBus
+from internal.core.agent.entities.queue_entity import AgentThought, QueueEvent
+from internal.entity.cache_entity import AGENT_TASK_EVENTS
+
+
+class TestAgentEventBus:
+    """智能体事件总线 测试类"""
+
+    @classmethod
+    def _agent_message(cls, task_id: uuid.UUID, answer: str) -> AgentThought:
+        return AgentThought(id=uuid.uuid4(), task_id=task_id, event=QueueEvent.AGENT_MESSAGE, answer=answer)
+
+    def test_local_stop_is_pushed(self, app):
+        event_bus = LocalAgentEventBus(injector.get(Redis))
+        task_id = uuid.uuid4()
+        channel = event_bus.open(task_id)
+        channel.publish(self._agent_message(task_id, "LLMOps"))
+        assert channel.get(timeout=1).answer == "LLMOps"
+
+        # 等待订阅线程完成订阅后推送停止信号
+        time.sleep(0.5)
+        event_bus.publish_stop(task_id)
+        assert channel.get(timeout=5).event == QueueEvent.STOP
+
+    def test_stream_resume(self, app):
+        count = 3
+        event_bus = RedisStreamAgentEventBus(injector.get(Redis))
+        task_id = uuid.uuid4()
+        publisher = event_bus.open(task_id)
+        for i in range(count):
+            publisher.publish(self._agent_message(task_id, str(i)))
+        event_bus.publish_stop(task_id)
+
+        # 任意消费者均可从头读取全部事件
+        consumer = event_bus.open(task_id)
+        events = [consumer.get(timeout=1) for _ in range(count + 1)]
+        assert [event.answer for event in events[:count]] == [str(i) for i in range(count)]
+        assert events[-1].event == QueueEvent.STOP
+
+        # 携带最后收到的事件id重新打开通道 从该事件之后继续读取
+        resumed = event_bus.open(task_id, events[0].event_id)
+        assert resumed.get(timeout=1).answer == "1"
+        injector.get(Redis).delete(AGENT_TASK_EVENTS.format(task_id=task_id))
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   test_embeddings_cache
+@Time   :   2026/10/22 15:00
+@Author :   s.qiu@foxmail.com
+"""
+import uuid
+
+import pytest
+from langchain_core.embeddings import Embeddings
+from redis import Redis
+
+from app.http.module import injector
+from internal.core.embeddings_cache import EmbeddingsCache
+
+
+class _FakeEmbeddings(Embeddings):
+    """按文本长度生成向量的嵌入模型"""
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+
+class TestEmbeddingsCache:
+    """向量缓存 测试类"""
+
+    @pytest.fixture()
+    def embeddings_cache(self, app):
+        redis_client = injector.get(Redis)
+        namespace = f"embeddings-test-{uuid.uuid4()}"
+        embeddings_cache = EmbeddingsCache(_FakeEmbeddings(), redis_client, "fake", namespace=namespace, ttl=600)
+        try:
+            yield embeddings_cache
+        finally:
+            keys = list(redis_client.scan_iter(f"{namespace}:*"))
+            if keys:
+                redis_client.delete(*keys)
+
+    def test_touch_refreshes_ttl(self, embeddings_cache):
+        redis_client = embeddings_cache._redis_client
+        embeddings_cache.embed_documents(["LLMOps"])
+        key = embeddings_cache._key("LLMOps")
+        redis_client.expire(key, 10)
+
+        # 命中后条目的TTL随访问时间延长
+        embeddings_cache.embed_documents(["LLMOps"])
+        assert redis_client.ttl(key) > 10
+        assert embeddings_cache.metrics["redis_hits"] == 1
+
+    def test_trim_removes_missing_keys(self, embeddings_cache):
+        redis_client = embeddings_cache._redis_client
+        embeddings_cache.embed_documents(["LLMOps", "LLM"])
+        redis_client.delete(embeddings_cache._key("LLM"))
+
+        # 键已不存在的访问记录在检查容量时清理
+        embeddings_cache._trim()
+        members = redis_client.zrange(embeddings_cache._lru_key, 0, -1)
+        assert members == [embeddings_cache._key("LLMOps").encode()]
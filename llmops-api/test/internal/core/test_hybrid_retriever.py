@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   test_hybrid_retriever
+@Time   :   2026/10/22 14:10
+@Author :   s.qiu@foxmail.com
+"""
+import time
+
+from flask import Flask
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document as LCDocument
+from langchain_core.retrievers import BaseRetriever
+
+from internal.core.retrievers.hybrid_retriever import HybridRetriever, reciprocal_rank_fusion
+
+
+class _StaticRetriever(BaseRetriever):
+    """延迟 delay 秒后返回固定片段的检索器"""
+    segment_ids: list[str]
+    delay: float = 0
+
+    def _get_relevant_documents(
+            self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> list[LCDocument]:
+        time.sleep(self.delay)
+        return [LCDocument(page_content=segment_id, metadata={"segment_id": segment_id})
+                for segment_id in self.segment_ids]
+
+
+class TestHybridRetriever:
+    """混合检索器 测试类"""
+
+    def test_fuse_all_branches(self):
+        hybrid_retriever = HybridRetriever(
+            flask_app=Flask(__name__),
+            retrievers=[_StaticRetriever(segment_ids=["a", "b"]), _StaticRetriever(segment_ids=["b", "c"])],
+        )
+        lc_documents = hybrid_retriever.invoke("LLMOps")
+        assert [lc_document.page_content for lc_document in lc_documents] == ["b", "a", "c"]
+        assert hybrid_retriever.degraded is False
+
+    def test_degraded_when_branch_timeout(self):
+        hybrid_retriever = HybridRetriever(
+            flask_app=Flask(__name__),
+            retrievers=[_StaticRetriever(segment_ids=["a", "b"]), _StaticRetriever(segment_ids=["c"], delay=1)],
+            timeout=0.2,
+        )
+        lc_documents = hybrid_retriever.invoke("LLMOps")
+
+        # 超时分支被丢弃 结果仅来自其余分支 并标记为降级
+        assert [lc_document.page_content for lc_document in lc_documents] == ["a", "b"]
+        assert hybrid_retriever.degraded is True
+
+    def test_reciprocal_rank_fusion_ignores_raw_scores(self):
+        # 各租户内的相对融合得分不可比较 按各自的排名交替合并
+        results = [
+            [LCDocument(page_content=segment_id, metadata={"segment_id": segment_id, "score": score})
+             for segment_id, score in documents]
+            for documents in [[("a", 1.0), ("b", 0.9), ("c", 0.8)], [("d", 0.3), ("e", 0.1)]]
+        ]
+        lc_documents = reciprocal_rank_fusion(results)
+        assert [lc_document.page_content for lc_document in lc_documents] == ["a", "d", "b", "e", "c"]
+        assert lc_documents[1].metadata["score"] == 0.3
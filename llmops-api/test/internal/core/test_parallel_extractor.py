@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   test_parallel_extractor
+@Time   :   2026/10/21 17:30
+@Author :   s.qiu@foxmail.com
+"""
+import os
+
+import billiard
+from langchain_core.documents import Document as LCDocument
+
+from internal.core.parallel_extractor import parallel_extractor
+
+
+def _load_pages(file_path: str, start: int, end: int) -> list[LCDocument]:
+    """进程池子进程中执行 返回页码范围与子进程id"""
+    return [LCDocument(page_content=f"{start}-{end}", metadata={"pid": os.getpid()})]
+
+
+def _load_in_daemon(result_queue) -> None:
+    """billiard 守护子进程中并行解析 模拟 Celery prefork 子进程"""
+    parallel_extractor._get_pdf_page_count = lambda file_path: 50
+    parallel_extractor._load_pdf_pages = _load_pages
+    try:
+        lc_documents = list(parallel_extractor.parallel_lazy_load(
+            "large.pdf", lambda: iter([LCDocument(page_content="serial", metadata={"pid": os.getpid()})]),
+        ))
+        result_queue.put((
+            [lc_document.page_content for lc_document in lc_documents],
+            all(lc_document.metadata["pid"] != os.getpid() for lc_document in lc_documents),
+        ))
+    except Exception as e:
+        result_queue.put(repr(e))
+
+
+class _UnavailablePool:
+    """无法创建子进程的进程池"""
+    max_workers = 2
+
+    def __init__(self):
+        self.reset_count = 0
+
+    def submit(self, fn, *args):
+        raise OSError("进程池不可用")
+
+    def reset(self):
+        self.reset_count += 1
+
+
+class TestParallelExtractor:
+    """并行解析 测试类"""
+
+    def test_parallel_in_daemon_process(self, monkeypatch):
+        """守护进程内同样使用进程池并行解析"""
+        monkeypatch.setenv("PARALLEL_EXTRACTION_WORKERS", "2")
+        monkeypatch.setenv("PARALLEL_EXTRACTION_PDF_PAGES", "20")
+        result_queue = billiard.Queue()
+        process = billiard.Process(target=_load_in_daemon, args=(result_queue,), daemon=True)
+        process.start()
+        result = result_queue.get(timeout=60)
+        process.join(timeout=30)
+        assert result == (["0-20", "20-40", "40-50"], True)
+        assert process.exitcode == 0
+
+    def test_fallback_when_pool_unavailable(self, monkeypatch):
+        pool = _UnavailablePool()
+        monkeypatch.setattr(parallel_extractor, "_get_pool", lambda: pool)
+        monkeypatch.setattr(parallel_extractor, "_get_pdf_page_count", lambda file_path: 50)
+        lc_documents = parallel_extractor.parallel_lazy_load(
+            "large.pdf", lambda: iter([LCDocument(page_content="serial")]),
+        )
+        assert [lc_document.page_content for lc_document in lc_documents] == ["serial"]
+        assert pool.reset_count == 1
+
+    def test_should_parallel_extract(self, tmp_path, monkeypatch):
+        file_path = tmp_path / "large.pdf"
+        file_path.write_bytes(b"0" * 1024)
+        monkeypatch.setenv("PARALLEL_EXTRACTION_MIN_SIZE", "1")
+        assert parallel_extractor.should_parallel_extract(str(file_path)) is True
+
+        monkeypatch.setenv("PARALLEL_EXTRACTION_MIN_SIZE", "2048")
+        assert parallel_extractor.should_parallel_extract(str(file_path)) is False
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   test_parse_cache
+@Time   :   2026/10/21 18:10
+@Author :   s.qiu@foxmail.com
+"""
+import os
+import time
+
+from langchain_core.documents import Document as LCDocument
+
+from internal.core.file_extractor import ParseCache
+
+
+class TestParseCache:
+    """解析缓存 测试类"""
+
+    @classmethod
+    def _write(cls, parse_cache: ParseCache, key: str) -> list[LCDocument]:
+        lc_documents = [LCDocument(page_content=f"page {i}", metadata={"page_number": i + 1}) for i in range(3)]
+        return list(parse_cache.write_through(key, iter(lc_documents)))
+
+    def test_write_and_get(self, tmp_path):
+        parse_cache = ParseCache(str(tmp_path), 1024 ** 2)
+        lc_documents = self._write(parse_cache, "key")
+        cached = list(parse_cache.get("key"))
+        assert [lc_document.page_content for lc_document in cached] == [
+            lc_document.page_content for lc_document in lc_documents
+        ]
+        assert cached[-1].metadata == {"page_number": 3}
+
+    def test_corrupt_entry_is_removed(self, tmp_path):
+        parse_cache = ParseCache(str(tmp_path), 1024 ** 2)
+        self._write(parse_cache, "key")
+        path = tmp_path / "key.cache"
+
+        # 截断的缓存文件视为未命中并被删除 调用方重新解析
+        path.write_bytes(path.read_bytes()[:-3])
+        assert parse_cache.get("key") is None
+        assert not path.exists()
+
+        path.write_bytes(b"LLMOps")
+        assert parse_cache.get("key") is None
+        assert not path.exists()
+
+    def test_stale_temp_files_are_swept(self, tmp_path):
+        parse_cache = ParseCache(str(tmp_path), 1024 ** 2)
+        stale, fresh = tmp_path / "stale.tmp", tmp_path / "fresh.tmp"
+        stale.write_bytes(b"0")
+        fresh.write_bytes(b"0")
+        stale_at = time.time() - 7 * 3600
+        os.utime(stale, (stale_at, stale_at))
+
+        self._write(parse_cache, "key")
+        assert not stale.exists()
+        assert fresh.exists()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   test_process_pool
+@Time   :   2026/10/22 11:40
+@Author :   s.qiu@foxmail.com
+"""
+import multiprocessing
+import operator
+
+import billiard
+
+from internal.core.process_pool import ProcessPool, allow_child_processes
+
+
+def _map_in_daemon(result_queue) -> None:
+    """billiard 守护子进程中使用进程池 模拟 Celery prefork 子进程"""
+    pool = ProcessPool(max_workers=2)
+    try:
+        results = list(pool.map(operator.mul, range(10), range(10)))
+        result_queue.put((results, multiprocessing.current_process().daemon))
+    except Exception as e:
+        result_queue.put(repr(e))
+
+
+class TestProcessPool:
+    """进程池 测试类"""
+
+    def test_map_in_daemon_process(self):
+        result_queue = billiard.Queue()
+        process = billiard.Process(target=_map_in_daemon, args=(result_queue,), daemon=True)
+        process.start()
+        result = result_queue.get(timeout=60)
+
+        # 子进程退出前关闭进程池 不会一直等待进程池子进程
+        process.join(timeout=30)
+        assert result == ([i * i for i in range(10)], True)
+        assert process.exitcode == 0
+
+    def test_allow_child_processes(self, monkeypatch):
+        config = multiprocessing.current_process()._config
+        monkeypatch.setitem(config, "daemon", True)
+        with allow_child_processes():
+            assert multiprocessing.current_process().daemon is False
+        assert multiprocessing.current_process().daemon is True
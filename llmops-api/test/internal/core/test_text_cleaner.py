@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   test_text_cleaner
+@Time   :   2026/10/20 10:15
+@Author :   s.qiu@foxmail.com
+"""
+import pytest
+
+from internal.core.text_cleaner import EXTRA_TEXT_CLEANER, get_process_rule_cleaner
+from internal.core.text_cleaner.benchmark import _legacy_clean, generate_text
+
+PRE_PROCESS_RULES = [
+    {"id": "remove_extra_space", "enabled": True},
+    {"id": "remove_url_and_email", "enabled": True},
+]
+
+
+class TestTextCleaner:
+    """文本清洗器 测试类"""
+
+    @pytest.mark.parametrize("text", [
+        "",
+        "<|endoftext|>\x00正文\x1f",
+        "a\n\n\n\nb    c\t\t\u3000d",
+        "联系 me@example.com 或访问 https://example.com/docs?id=1 获取",
+        "http://a@x.com",
+        "a.b@c-d.e.f@g.h @x.com a@ a@b",
+    ])
+    def test_same_as_legacy(self, text):
+        cleaner = get_process_rule_cleaner("test", PRE_PROCESS_RULES)
+        assert cleaner.clean(EXTRA_TEXT_CLEANER.clean(text)) == _legacy_clean(text)
+
+    def test_generated_text(self):
+        text = generate_text(0.1)
+        cleaner = get_process_rule_cleaner("test", PRE_PROCESS_RULES)
+        assert cleaner.clean(EXTRA_TEXT_CLEANER.clean(text)) == _legacy_clean(text)
+
+    def test_disabled_rules(self):
+        cleaner = get_process_rule_cleaner("test-disabled", [
+            {"id": "remove_extra_space", "enabled": False},
+            {"id": "remove_url_and_email", "enabled": False},
+        ])
+        assert cleaner.clean("a   b me@example.com") == "a   b me@example.com"
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   test_timer_wheel
+@Time   :   2026/10/21 15:20
+@Author :   s.qiu@foxmail.com
+"""
+import gc
+import time
+import weakref
+from queue import Queue
+
+from internal.core.agent.agents.timer_wheel import TimerWheel
+
+
+class TestTimerWheel:
+    """时间轮 测试类"""
+
+    def test_schedule_and_cancel(self):
+        timer_wheel = TimerWheel(tick=0.05, slot_count=8)
+        q = Queue()
+        timer_wheel.schedule(0.1, lambda: q.put("once"))
+        periodic = timer_wheel.schedule(0.1, lambda: q.put("periodic"), interval=0.1)
+        cancelled = timer_wheel.schedule(0.1, lambda: q.put("cancelled"))
+        cancelled.cancel()
+
+        # 超过一圈(8 * 0.05秒)的任务在对应圈数后执行
+        timer_wheel.schedule(0.6, lambda: q.put("late"))
+
+        time.sleep(0.8)
+        periodic.cancel()
+        events = []
+        while not q.empty():
+            events.append(q.get())
+
+        assert events.count("once") == 1
+        assert events.count("periodic") >= 5
+        assert events.count("late") == 1
+        assert "cancelled" not in events
+
+    def test_cancel_releases_callback(self):
+        timer_wheel = TimerWheel(tick=0.05, slot_count=8)
+        q = Queue()
+        ref = weakref.ref(q)
+        timer = timer_wheel.schedule(600, lambda: q.put("timeout"))
+        assert len(timer_wheel) == 1
+
+        # 取消后立即从槽位移除 回调引用的对象可被回收 无需等待时间轮转到所在槽位
+        timer.cancel()
+        del timer, q
+        gc.collect()
+        assert len(timer_wheel) == 0
+        assert ref() is None
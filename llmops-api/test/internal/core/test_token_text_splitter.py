@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   test_token_text_splitter
+@Time   :   2026/10/20 15:40
+@Author :   s.qiu@foxmail.com
+"""
+import pytest
+import tiktoken
+
+from internal.core.text_cleaner import EXTRA_TEXT_CLEANER
+from internal.core.text_cleaner.benchmark import generate_text
+from internal.core.text_splitter import TokenRecursiveTextSplitter
+from internal.core.text_splitter.benchmark import benchmark_text_splitter
+from internal.entity.dataset_entity import DEFAULT_PROCESS_RULE
+
+
+class TestTokenRecursiveTextSplitter:
+    """基于token下标的递归文本分割器 测试类"""
+
+    @pytest.fixture(scope="class")
+    def encoding(self):
+        return tiktoken.encoding_for_model("gpt-3.5-turbo")
+
+    def test_same_as_legacy(self, encoding):
+        result = benchmark_text_splitter([EXTRA_TEXT_CLEANER.clean(generate_text(0.2))], encoding)
+        assert abs(result["token_chunks"] - result["legacy_chunks"]) <= result["legacy_chunks"] * 0.05
+        assert result["identical_ratio"] >= 0.9
+        assert result["max_chunk_tokens"] <= DEFAULT_PROCESS_RULE["rule"]["segment"]["chunk_size"] + 5
+
+    def test_chunk_overlap(self, encoding):
+        text_splitter = TokenRecursiveTextSplitter(
+            encoding,
+            chunk_size=20,
+            chunk_overlap=10,
+            separators=[" ", ""],
+            is_separator_regex=True,
+        )
+        chunks = text_splitter.split_text(" ".join(f"word{i}" for i in range(100)))
+        assert len(chunks) > 1
+        for previous, current in zip(chunks, chunks[1:]):
+            assert current.split(" ")[0] in previous.split(" ")
+
+    def test_short_text(self, encoding):
+        text_splitter = TokenRecursiveTextSplitter(encoding, chunk_size=500, chunk_overlap=50)
+        assert text_splitter.split_text("LLMOps 知识库") == ["LLMOps 知识库"]
+        assert text_splitter.split_text("") == []
@@ -5,10 +5,25 @@
 @Time   :   2025/9/12 10:03
 @Author :   s.qiu@foxmail.com
 """
+import json
+import threading
+import time
+import uuid
+
 import pytest
+from redis import Redis
 
+from app.http.module import injector
+from internal.core.agent.agents import AgentQueueManager, agent_queue_manager
+from internal.core.agent.agents.agent_event_bus import RedisStreamAgentEventBus
+from internal.core.agent.entities.queue_entity import AgentThought, QueueEvent
+from internal.entity.cache_entity import AGENT_TASK_EVENTS, AGENT_TASK_META
+from internal.entity.conversation_entity import InvokeFrom
 from pkg.response import HttpCode
 
+# 测试令牌对应的账号
+ACCOUNT_ID = "46db30d1-3199-4e79-a0cd-abf12fa6858f"
+
 
 class TestAppHandler:
     """App控制器测试类"""
@@ -48,3 +63,49 @@ class TestAppHandler:
             assert resp.json.get("code") == HttpCode.SUCCESS
         elif id.endswith("3"):
             assert resp.json.get("code") == HttpCode.NOT_FOUND
+
+    def test_resume_debug_chat(self, client, db, monkeypatch):
+        redis_client = injector.get(Redis)
+        monkeypatch.setattr(agent_queue_manager, "get_agent_event_bus", lambda: RedisStreamAgentEventBus(redis_client))
+
+        # 智能体执行中已发布三个事件
+        task_id = uuid.uuid4()
+        publisher = AgentQueueManager(user_id=uuid.UUID(ACCOUNT_ID), invoke_from=InvokeFrom.DEBUGGER)
+        publisher.set_task_meta(task_id, {"conversation_id": "conversation", "message_id": "message"})
+
+        def publish(event: QueueEvent, answer: str = "") -> None:
+            publisher.publish(task_id, AgentThought(id=uuid.uuid4(), task_id=task_id, event=event, answer=answer))
+
+        for i in range(3):
+            publish(QueueEvent.AGENT_MESSAGE, str(i))
+
+        # 首次连接收到第一个事件后断开
+        listener = AgentQueueManager(user_id=uuid.UUID(ACCOUNT_ID), invoke_from=InvokeFrom.DEBUGGER).listen(task_id)
+        last_event_id = next(listener).event_id
+        listener.close()
+
+        # 重新连接期间智能体继续执行并发布剩余事件
+        def finish() -> None:
+            time.sleep(0.5)
+            publish(QueueEvent.AGENT_MESSAGE, "3")
+            publish(QueueEvent.AGENT_END)
+
+        threading.Thread(target=finish).start()
+        try:
+            resp = client.get(
+                f"/apps/2f0433a3-58ee-4c71-bff0-c96372fd3c55/conversations/tasks/{task_id}/events",
+                headers={"Last-Event-ID": last_event_id},
+            )
+            events = [
+                dict(line.split(": ", 1) for line in block.split("\n"))
+                for block in resp.get_data(as_text=True).split("\n\n") if block
+            ]
+        finally:
+            redis_client.delete(AGENT_TASK_EVENTS.format(task_id=task_id), AGENT_TASK_META.format(task_id=task_id))
+
+        # 从断开处之后继续读取 每个事件均携带事件id与任务元数据
+        data = [json.loads(event["data"]) for event in events]
+        assert [event["event"] for event in events] == ["agent_message"] * 3 + ["agent_end"]
+        assert [item["answer"] for item in data[:3]] == ["1", "2", "3"]
+        assert all(event["id"] for event in events)
+        assert all(item["message_id"] == "message" for item in data)
@@ -42,6 +42,9 @@ class TestDocumentHandle:
         assert resp.status_code == 200
         if document_id.endswith("0"):
             assert resp.json.get("code") == HttpCode.SUCCESS
+            assert "reused_segment_count" in resp.json.get("data")
+            assert "added_segment_count" in resp.json.get("data")
+            assert "removed_segment_count" in resp.json.get("data")
         elif document_id.endswith("1"):
             assert resp.json.get("code") == HttpCode.NOT_FOUND
 
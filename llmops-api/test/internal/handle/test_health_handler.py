@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   test_health_handler
+@Time   :   2026/10/18 14:20
+@Author :   s.qiu@foxmail.com
+"""
+from pkg.response import HttpCode
+
+
+class TestHealthHandler:
+    """健康检查处理器 测试类"""
+
+    def test_ready(self, client):
+        resp = client.get("/ready")
+        if resp.status_code == 200:
+            assert resp.json.get("code") == HttpCode.SUCCESS
+            assert resp.json.get("data").get("ready") is True
+        else:
+            assert resp.status_code == 503
+            assert resp.json.get("code") == HttpCode.FAIL
+            assert resp.json.get("data").get("ready") is False
+
+    def test_ready_after_warm_up(self, client):
+        from app.http.module import injector
+        from internal.service import WarmupService
+
+        injector.get(WarmupService).warm_up()
+        resp = client.get("/ready")
+        assert resp.status_code == 200
+        assert resp.json.get("data").get("ready") is True
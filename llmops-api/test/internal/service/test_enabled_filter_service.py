@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   test_enabled_filter_service
+@Time   :   2026/10/19 15:30
+@Author :   s.qiu@foxmail.com
+"""
+import pytest
+from langchain_core.documents import Document as LCDocument
+
+from app.http.module import injector
+from internal.entity.dataset_entity import SegmentStatus
+from internal.model import Document, Segment
+from internal.service import EnabledFilterService
+
+DATASET_ID = "d9baab72-9e23-449a-8513-5acd9e235f33"
+DOCUMENT_ID = "c632a35c-1638-400b-982e-db960e14b430"
+
+
+class TestEnabledFilterService:
+    """启用状态过滤服务 测试类"""
+
+    @pytest.fixture()
+    def enabled_filter_service(self, db):
+        service = injector.get(EnabledFilterService)
+        service.invalidate(DATASET_ID)
+        yield service
+        service.invalidate(DATASET_ID)
+
+    @pytest.fixture()
+    def segments(self, db):
+        segments = db.session.query(Segment).filter(
+            Segment.document_id == DOCUMENT_ID,
+            Segment.status == SegmentStatus.COMPLETED,
+            Segment.enabled.is_(True),
+        ).limit(3).all()
+        segment_ids = [segment.id for segment in segments]
+        try:
+            yield segments
+        finally:
+            # 测试中禁用的片段恢复为启用 避免影响后续测试
+            with db.auto_commit():
+                db.session.query(Segment).filter(Segment.id.in_(segment_ids)).update(
+                    {"enabled": True}, synchronize_session=False,
+                )
+
+    @classmethod
+    def _to_lc_documents(cls, segments: list[Segment]) -> list[LCDocument]:
+        return [LCDocument(page_content=segment.content, metadata={
+            "dataset_id": str(segment.dataset_id),
+            "document_id": str(segment.document_id),
+            "segment_id": str(segment.id),
+        }) for segment in segments]
+
+    def test_enabled_segments(self, enabled_filter_service, segments):
+        lc_documents = self._to_lc_documents(segments)
+        assert enabled_filter_service.get_enabled_mask(lc_documents) == [True] * len(lc_documents)
+
+    def test_toggle_document(self, enabled_filter_service, segments, db):
+        lc_documents = self._to_lc_documents(segments)
+        enabled_filter_service.get_enabled_mask(lc_documents)
+
+        with db.auto_commit():
+            db.session.query(Document).filter(Document.id == DOCUMENT_ID).update({"enabled": False})
+        enabled_filter_service.set_document_enabled(DATASET_ID, DOCUMENT_ID, False)
+        assert enabled_filter_service.filter_documents(lc_documents) == []
+
+        with db.auto_commit():
+            db.session.query(Document).filter(Document.id == DOCUMENT_ID).update({"enabled": True})
+        enabled_filter_service.set_document_enabled(DATASET_ID, DOCUMENT_ID, True)
+        assert enabled_filter_service.filter_documents(lc_documents) == lc_documents
+
+    def test_toggle_segment(self, enabled_filter_service, segments, db):
+        lc_documents = self._to_lc_documents(segments)
+        enabled_filter_service.get_enabled_mask(lc_documents)
+        segment_id = segments[0].id
+
+        with db.auto_commit():
+            db.session.query(Segment).filter(Segment.id == segment_id).update({"enabled": False})
+        enabled_filter_service.set_segment_enabled(DATASET_ID, segment_id, False)
+        assert enabled_filter_service.get_enabled_mask(lc_documents) == [False] + [True] * (len(lc_documents) - 1)
+
+        with db.auto_commit():
+            db.session.query(Segment).filter(Segment.id == segment_id).update({"enabled": True})
+        enabled_filter_service.set_segment_enabled(DATASET_ID, segment_id, True)
+        assert enabled_filter_service.get_enabled_mask(lc_documents) == [True] * len(lc_documents)
+
+    def test_rebuild_from_database(self, enabled_filter_service, segments, db):
+        lc_documents = self._to_lc_documents(segments)
+        with db.auto_commit():
+            db.session.query(Segment).filter(Segment.id == segments[-1].id).update({"enabled": False})
+
+        # 集合未加载时从数据库重建
+        assert enabled_filter_service.get_enabled_mask(lc_documents) == [True] * (len(lc_documents) - 1) + [False]
+
+    def test_overfetch(self, enabled_filter_service, segments, db):
+        if len(segments) < 3:
+            pytest.skip("文档片段数量不足")
+        lc_documents = self._to_lc_documents(segments)
+        with db.auto_commit():
+            db.session.query(Segment).filter(Segment.id.in_([segments[0].id, segments[1].id])).update(
+                {"enabled": False}, synchronize_session=False,
+            )
+
+        fetch_ks = []
+
+        def search(fetch_k: int) -> list[LCDocument]:
+            fetch_ks.append(fetch_k)
+            return lc_documents[:fetch_k]
+
+        # 首次召回的候选全部被禁用时扩大召回数量
+        result = enabled_filter_service.overfetch(search, 1)
+        assert result == lc_documents[2:3]
+        assert len(fetch_ks) == 2 and fetch_ks[1] > fetch_ks[0]
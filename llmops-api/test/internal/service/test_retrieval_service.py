@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   test_retrieval_service
+@Time   :   2026/10/21 17:50
+@Author :   s.qiu@foxmail.com
+"""
+import pytest
+
+from app.http.module import injector
+from internal.entity.cache_entity import RETRIEVAL_HIT_COUNT_BUFFER
+from internal.model import Segment
+from internal.service import RetrievalService
+
+DOCUMENT_ID = "c632a35c-1638-400b-982e-db960e14b430"
+
+
+class TestRetrievalService:
+    """检索服务 测试类"""
+
+    @pytest.fixture()
+    def retrieval_service(self, db):
+        return injector.get(RetrievalService)
+
+    def test_flush_hit_counts(self, retrieval_service, db):
+        segments = db.session.query(Segment).filter(Segment.document_id == DOCUMENT_ID).limit(2).all()
+        hit_counts = {segment.id: segment.hit_count for segment in segments}
+
+        # 命中次数写入缓冲后刷写到数据库 按片段累加
+        redis_client = retrieval_service.redis_client
+        for i, segment in enumerate(segments):
+            redis_client.hincrby(RETRIEVAL_HIT_COUNT_BUFFER, str(segment.id), i + 1)
+        retrieval_service.flush_retrieval_records()
+
+        for i, segment in enumerate(segments):
+            db.session.refresh(segment)
+            assert segment.hit_count == hit_counts[segment.id] + i + 1
+        assert not redis_client.exists(f"{RETRIEVAL_HIT_COUNT_BUFFER}:flushing")
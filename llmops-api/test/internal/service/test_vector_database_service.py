@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+@File   :   test_vector_database_service
+@Time   :   2026/10/22 10:20
+@Author :   s.qiu@foxmail.com
+"""
+import uuid
+
+import pytest
+from langchain_core.documents import Document
+from weaviate.classes.config import Configure
+from weaviate.classes.data import DataObject
+
+from app.http.module import injector
+from internal.service import VectorDatabaseService
+from internal.service.vector_database_service import TENANT_COLLECTION_NAME
+
+# 迁移测试使用的临时源集合 与线上共享集合隔离
+SOURCE_COLLECTION_NAME = "DatasetMigrationTest"
+
+DIMENSION = 8
+
+
+class TestVectorDatabaseService:
+    """向量数据库服务 测试类"""
+
+    @pytest.fixture()
+    def vector_database_service(self, monkeypatch):
+        monkeypatch.setenv("VECTOR_STORE_TENANCY", "dataset")
+        return injector.get(VectorDatabaseService)
+
+    @pytest.fixture()
+    def dataset_ids(self, vector_database_service):
+        dataset_ids = [str(uuid.uuid4()), str(uuid.uuid4())]
+        try:
+            yield dataset_ids
+        finally:
+            vector_database_service.client.collections.delete(SOURCE_COLLECTION_NAME)
+            for dataset_id in dataset_ids:
+                vector_database_service.delete_dataset_vectors(uuid.UUID(dataset_id))
+
+    @classmethod
+    def _vector(cls, i: int) -> list[float]:
+        return [float(i + 1)] + [0.0] * (DIMENSION - 1)
+
+    def test_migrate_to_tenants(self, vector_database_service, dataset_ids):
+        # 源集合中两个知识库的对象交替出现
+        source = vector_database_service.client.collections.create(
+            SOURCE_COLLECTION_NAME, vectorizer_config=Configure.Vectorizer.none(),
+        )
+        objects = [
+            DataObject(
+                properties={"dataset_id": dataset_ids[i % 2], "node_id": str(node_id), "text": f"LLMOps {i}"},
+                uuid=node_id,
+                vector=self._vector(i),
+            )
+            for i, node_id in enumerate(uuid.uuid4() for _ in range(5))
+        ]
+        assert not source.data.insert_many(objects).has_errors
+
+        counts = vector_database_service.migrate_to_tenants(drop_source=True, source_name=SOURCE_COLLECTION_NAME)
+        assert counts == {dataset_ids[0]: 3, dataset_ids[1]: 2}
+        assert not vector_database_service.client.collections.exists(SOURCE_COLLECTION_NAME)
+
+        # 对象写入所属知识库的租户 保留 uuid 与向量
+        collection = vector_database_service.client.collections.get(TENANT_COLLECTION_NAME)
+        for i, obj in enumerate(objects):
+            migrated = collection.with_tenant(dataset_ids[i % 2]).query.fetch_object_by_id(
+                obj.uuid, include_vector=True,
+            )
+            vector = migrated.vector.get("default") if isinstance(migrated.vector, dict) else migrated.vector
+            assert migrated.properties["text"] == f"LLMOps {i}"
+            assert vector == pytest.approx(self._vector(i))
+
+    def test_add_documents_with_vectors(self, vector_database_service, dataset_ids):
+        documents = [
+            Document(page_content=f"LLMOps {i}", metadata={
+                "dataset_id": dataset_ids[i % 2], "node_id": str(uuid.uuid4()),
+            })
+            for i in range(4)
+        ]
+        failed_node_ids = vector_database_service.add_documents_with_vectors(
+            documents, [self._vector(i) for i in range(len(documents))],
+        )
+        assert failed_node_ids == []
+
+        for i, document in enumerate(documents):
+            vectors = vector_database_service.get_vectors(uuid.UUID(dataset_ids[i % 2]), [document.metadata["node_id"]])
+            assert vectors[document.metadata["node_id"]] == pytest.approx(self._vector(i))